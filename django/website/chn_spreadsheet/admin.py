@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import SheetProfile
+from .models import ImportJob, SheetProfile
 
 # Register your models here.
 admin.site.register(SheetProfile, admin.ModelAdmin)
+admin.site.register(ImportJob, admin.ModelAdmin)
@@ -1,11 +1,15 @@
+import codecs
+import csv
 import dateutil.parser
 from decimal import Decimal
 import datetime
+from itertools import islice
 import pytz
+import re
 import sys
 
 from django.utils.timezone import is_naive
-from django.utils.translation import ugettext as _
+from django.utils.translation import ugettext as _, ungettext
 from openpyxl import load_workbook
 
 import transport
@@ -17,7 +21,102 @@ class SheetImportException(Exception):
     pass
 
 
+# The default delimiter of each delimited text format
+DELIMITERS = {
+    'csv': ',',
+    'tsv': '\t',
+}
+
+QUOTING = {
+    'minimal': csv.QUOTE_MINIMAL,
+    'all': csv.QUOTE_ALL,
+    'nonnumeric': csv.QUOTE_NONNUMERIC,
+    'none': csv.QUOTE_NONE,
+}
+
+# Size of the chunks delimited text files are read and decoded in
+TEXT_CHUNK_SIZE = 64 * 1024
+
+# A line and its ending. A carriage return at the end of a chunk may be
+# followed by a line feed in the next, so it's left until then.
+LINE_RE = re.compile(r'[^\r\n]*(?:\r\n|\r(?!\Z)|\n)')
+
+
+def _decoded_lines(fobject, encoding):
+    """ Generate the lines of a file, decoded, reading it in chunks """
+    chunks = codecs.iterdecode(
+        iter(lambda: fobject.read(TEXT_CHUNK_SIZE), b''), encoding)
+
+    pending = u''
+    for chunk in chunks:
+        pending += chunk
+        end = 0
+        for match in LINE_RE.finditer(pending):
+            yield match.group()
+            end = match.end()
+        pending = pending[end:]
+
+    if pending:
+        yield pending
+
+
+def _delimited_rows(fobject, file_format, encoding, **fmtparams):
+    """ Generate the rows of a delimited text file as lists of unicode
+    strings, reading the file as the rows are used.
+
+    Python 2's csv module only reads byte strings, so the lines are decoded
+    from the file's encoding, and recoded to UTF-8 for it.
+    """
+    lines = (line.encode('utf-8')
+             for line in _decoded_lines(fobject, encoding))
+    try:
+        for row in csv.reader(lines, **fmtparams):
+            yield [value.decode('utf-8') if isinstance(value, str) else value
+                   for value in row]
+    except (csv.Error, UnicodeError) as e:
+        error_msg = _('Could not read %(format)s file: %(error)s ') % {
+            'format': file_format, 'error': e}
+        raise SheetImportException(error_msg), None, sys.exc_info()[2]
+
+
 class Importer(object):
+    """ Import the rows of a spreadsheet as items.
+
+    The import is a pipeline of generators: rows are read, converted to
+    items and given their terms one at a time, and saved in chunks of
+    save_batch_size items, each committed in its own transaction. Only one
+    chunk is held in memory, however long the spreadsheet is.
+    """
+    # Number of items sent to transport.items.bulk_create at a time
+    save_batch_size = 500
+    # Number of rows processed between reports of progress
+    progress_interval = 500
+
+    def __init__(self, progress=None):
+        # Called with the numbers of rows processed and failed, of items
+        # saved, and of dates parsed by guessing their format, as the
+        # import goes on; see chn_spreadsheet.jobs
+        self.progress = progress
+        self.rows_processed = 0
+        # The import stops at the first row that fails, so this is 0 or 1
+        self.rows_failed = 0
+        self.items_saved = 0
+        self.chunks_committed = 0
+        self.date_parsers = []
+        # Each term is resolved to its id once per import
+        self.term_resolver = transport.terms.TermResolver()
+
+    @property
+    def date_fallbacks(self):
+        """ The number of dates that matched no format, and were parsed by
+        guessing their format, which is much slower; see DateParser
+        """
+        return sum(parser.fallbacks for parser in self.date_parsers)
+
+    def report_progress(self):
+        if self.progress is not None:
+            self.progress(self.rows_processed, self.rows_failed,
+                          self.items_saved, self.date_fallbacks)
 
     def get_profile(self, label):
         try:
@@ -34,7 +133,21 @@ class Importer(object):
 
         return {column['name']: column for column in col_list}
 
-    def get_rows_iterator(self, spreadsheet, file_format):
+    def get_rows_iterator(self, spreadsheet, file_format, encoding=None,
+                          delimiter=None, quoting=None, quotechar=None):
+        """ Return an iterator over the rows of a spreadsheet file.
+
+        Excel files are read with openpyxl. Delimited text files, of the
+        'csv' and 'tsv' formats, are streamed from the file as the rows
+        are used, and take these options, as set in the profile:
+            encoding: The file's encoding; by default UTF-8, with or
+                without a byte order mark
+            delimiter: The character between values, by default ',' for
+                csv and a tab for tsv
+            quoting: How values are quoted, 'minimal' (the default), 'all',
+                'nonnumeric' or 'none', as in the csv module
+            quotechar: The character values are quoted with, by default '"'
+        """
         if file_format == 'excel':
             try:
                 wb = load_workbook(spreadsheet, read_only=True)
@@ -43,6 +156,35 @@ class Importer(object):
                 error_msg = _('Expected excel file. Received file in an unrecognized format.')
                 raise SheetImportException(error_msg)
             rows = ws.rows
+        elif file_format in DELIMITERS:
+            if quoting is None:
+                quoting = 'minimal'
+            if quoting not in QUOTING:
+                error_msg = _('Unsupported quoting: %s') % quoting
+                raise SheetImportException(error_msg)
+
+            encoding = encoding or 'utf-8-sig'
+            try:
+                codecs.lookup(encoding)
+            except LookupError:
+                error_msg = _('Unknown encoding: %s') % encoding
+                raise SheetImportException(error_msg)
+
+            try:
+                fmtparams = {
+                    # The csv module only takes byte strings
+                    'delimiter': str(delimiter or DELIMITERS[file_format]),
+                    'quotechar': str(quotechar or '"'),
+                    'quoting': QUOTING[quoting],
+                }
+                csv.reader([], **fmtparams)
+            except (TypeError, UnicodeError) as e:
+                error_msg = _('Invalid %(format)s options: %(error)s') % {
+                    'format': file_format, 'error': e}
+                raise SheetImportException(error_msg)
+
+            rows = _delimited_rows(spreadsheet, file_format, encoding,
+                                   **fmtparams)
         else:
             error_msg = _('Unsupported file format: %s') % file_format
             raise SheetImportException(error_msg)
@@ -76,42 +218,58 @@ class Importer(object):
         return [getattr(v, 'value', v) for v in raw_row]
 
     def process_rows(self, rows, profile_columns, meta_data, skip_header=False):
+        """ Return a generator of the item of each non-empty row, which
+        converts the rows as they are read.
+
+        The header is checked at once, rather than when the first item is
+        generated.
+        """
         # If there is no header (skip_header=False), then use profile's order of
         # columns, otherwise use header line to check mapping and define order
         first_row = self.normalize_row(rows.next()) if skip_header else None
         columns = self.order_columns(profile_columns, first_row)
         # columns = [{'field': "...", 'type': "..."}, ...]
 
-        objects = []
-        for i, row in enumerate(rows, 2 if first_row else 1):
+        plan = compile_columns(columns, self.date_parsers)
+        return self._generate_items(rows, plan, meta_data,
+                                    2 if first_row else 1)
+
+    def _generate_items(self, rows, plan, meta_data, first_row_number):
+        meta_terms = meta_data.items()
+        process_row = self.process_row
+        normalize_row = self.normalize_row
+
+        for i, row in enumerate(rows, first_row_number):
             try:
-                values = self.normalize_row(row)
+                values = normalize_row(row)
 
                 if any(values):
-                    item = self.process_row(values, columns)
+                    item = process_row(values, plan)
 
-                    for taxonomy, term in meta_data.iteritems():
+                    for taxonomy, term in meta_terms:
                         self._append_term_to_item(item, taxonomy, term)
 
-                    objects.append(item)
+                    yield item
+
+                self.rows_processed += 1
+                if self.rows_processed % self.progress_interval == 0:
+                    self.report_progress()
 
             except SheetImportException as e:
+                self.rows_failed += 1
+                self.report_progress()
                 raise type(e), type(e)(e.message +
                                        'in row %d ' % i), sys.exc_info()[2]
 
-        return objects
-
-    def process_row(self, values, columns):
+    def process_row(self, values, plan):
+        """ Convert the values of a row to an item, following the plan
+        compiled from the columns; see compile_columns.
+        """
         item = {}
 
-        for val, col in zip(values, columns):
-            converter = CellConverter(val, col)
-
-            if col['type'] == 'taxonomy':
-                self._append_term_to_item(
-                    item, col['taxonomy'], converter.convert_value())
-            else:
-                converter.add_to(item)
+        for value, add in zip(values, plan):
+            if add is not None:
+                add(item, value)
 
         return item
 
@@ -122,15 +280,60 @@ class Importer(object):
     def _get_term_dict(self, taxonomy, name):
         return {'taxonomy': taxonomy, 'name': name}
 
+    def resolve_terms(self, objects):
+        """ Replace the terms of items, given by taxonomy and name, by their
+        ids, so that they are linked by id when the items are saved.
+
+        Only the terms not seen before in this import are looked up, and
+        the missing terms of open taxonomies are created together.
+        """
+        ids = self.term_resolver.resolve(
+            (t['taxonomy'], t['name'])
+            for item in objects for t in item.get('terms', [])
+        )
+
+        for item in objects:
+            terms = item.pop('terms', [])
+            if terms:
+                item['term_ids'] = [ids[(t['taxonomy'], t['name'])]
+                                    for t in terms]
+
+        return objects
+
     def save_rows(self, objects):
-        for obj in objects:
-            terms = obj.pop('terms')
-            item = transport.items.create(obj)
-            for term in terms:
-                transport.items.add_terms(
-                    item['id'], term['taxonomy'], term['name'])
+        """ Save the items of an iterable in chunks of save_batch_size, each
+        committed in its own transaction by transport.items.bulk_create.
+
+        If an item cannot be converted, the chunks before it stay committed,
+        and the error says how many there were.
+        """
+        objects = iter(objects)
+        saved = 0
+        while True:
+            try:
+                batch = list(islice(objects, self.save_batch_size))
+            except SheetImportException as e:
+                message = ungettext(
+                    "(%(chunks)d chunk, of %(items)d entries, was committed "
+                    "before the error) ",
+                    "(%(chunks)d chunks, of %(items)d entries, were "
+                    "committed before the error) ",
+                    self.chunks_committed
+                ) % {'chunks': self.chunks_committed, 'items': saved}
+                raise type(e), type(e)(e.message + message), sys.exc_info()[2]
+
+            if not batch:
+                break
+
+            self.resolve_terms(batch)
+            count = transport.items.bulk_create(batch)['count']
+            saved += count
+
+            self.chunks_committed += 1
+            self.items_saved += count
+            self.report_progress()
 
-        return len(objects)
+        return saved
 
     def store_spreadsheet(self, label, fobject):
         profile = self.get_profile(label)
@@ -139,7 +342,13 @@ class Importer(object):
         skip_header = profile.get('skip_header', False)
         meta_data = profile.get('taxonomies')
 
-        rows = self.get_rows_iterator(fobject, file_format)
+        rows = self.get_rows_iterator(
+            fobject, file_format,
+            encoding=profile.get('encoding'),
+            delimiter=profile.get('delimiter'),
+            quoting=profile.get('quoting'),
+            quotechar=profile.get('quotechar'),
+        )
 
         items = self.process_rows(rows, profile['columns'], meta_data,
                                   skip_header)
@@ -147,59 +356,240 @@ class Importer(object):
         return self.save_rows(items)
 
 
-class CellConverter(object):
-    def __init__(self, value, col_spec):
-        self.value = value
-        self.type = col_spec['type']
+# Formats tried as well as a date column's own when sampling its values.
+# Only year first formats are tried, as they can't swap days and months.
+ISO_DATE_FORMATS = (
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%dT%H:%M:%S',
+    '%Y-%m-%d %H:%M:%S.%f',
+    '%Y-%m-%dT%H:%M:%S.%f',
+    '%Y-%m-%d %H:%M',
+    '%Y-%m-%d',
+)
+
+# Times that may follow the date of a column's format
+TIME_FORMATS = ('', ' %H:%M:%S', ' %H:%M', 'T%H:%M:%S', ' %H:%M:%S.%f')
+
+DATE_SEPARATORS = ('/', '-', '.')
+
+
+def _date_format_variants(date_format):
+    """ Return the variants of a date format with other separators and
+    times, keeping the order of its day, month and year.
+    """
+    date_part = re.split(r'[ T]%[HIM]', date_format, 1)[0]
+    separators = [sep for sep in DATE_SEPARATORS if sep in date_part]
+
+    dates = [date_part]
+    if len(separators) == 1:
+        dates.extend(date_part.replace(separators[0], other)
+                     for other in DATE_SEPARATORS if other != separators[0])
+
+    return [date + time for date in dates for time in TIME_FORMATS]
+
+
+class DateParser(object):
+    """ Convert the values of a date column, adapting to the format they
+    are actually in.
+
+    Parsing with a known format is many times faster than guessing it with
+    dateutil, so the first string values of the column are parsed with
+    each candidate format: the column's own, variants of it with other
+    separators and times, and ISO 8601 formats. The parser then settles on
+    the format that matched most of them, preferring the column's own,
+    and only tries that and the column's own format. Values that match
+    neither are parsed by dateutil, and counted in `fallbacks`.
+
+    Parsed values are remembered, as exports often repeat timestamps.
+    """
+    # Number of string values sampled before settling on a format
+    sample_size = 20
+    # Number of parsed values remembered; the cache is cleared when full
+    cache_size = 10000
+
+    def __init__(self, col_spec):
         self.field = col_spec['field']
         self.date_format = col_spec.get('date_format', None)
 
-    def add_to(self, object_dict):
-        if self.type != 'ignore':
-            object_dict[self.field] = self.convert_value()
-        return object_dict
-
-    def convert_value(self):
-        converters = {
-            'date': lambda x: self.convert_date(),
-            'text': lambda x: x,
-            'integer': lambda x: int(x),
-            'number': lambda x: Decimal(x),
-            'taxonomy': lambda x: x,
-        }
-        if self.type not in converters:
-            raise SheetImportException(
-                _(u"Unknown data type '%s' ") % (self.type))
+        self.candidates = []
+        if self.date_format is not None:
+            for date_format in ([self.date_format] +
+                                _date_format_variants(self.date_format) +
+                                list(ISO_DATE_FORMATS)):
+                if date_format not in self.candidates:
+                    self.candidates.append(date_format)
+
+        self.formats = None
+        self.matches = dict((f, 0) for f in self.candidates)
+        self.sampled = 0
+        self.cache = {}
+        self.fallbacks = 0
+
+    def __call__(self, value):
+        if value is None:
+            return None
+
+        if isinstance(value, basestring):
+            try:
+                return self.cache[value]
+            except KeyError:
+                pass
+
         try:
-            return converters[self.type](self.value)
+            if not isinstance(value, basestring):
+                return self._make_aware(value)
+
+            if self.date_format is None:
+                raise SheetImportException(
+                    _(u"Date format not specified for '%s' ") % (self.field))
+
+            date_time = self._make_aware(self._parse(value))
         except Exception as e:
-            message = _("%s\nCan not process value '%s' of type '%s' ") % (e.message, self.value, self.type)
+            message = _("%s\nCan not process value '%s' of type '%s' ") % (e.message, value, 'date')
             raise SheetImportException(message), None, sys.exc_info()[2]
 
-    def convert_date(self):
-        if self.value is None:
-            return None
+        if len(self.cache) >= self.cache_size:
+            self.cache.clear()
+        self.cache[value] = date_time
 
-        if isinstance(self.value, basestring):
-            date_time = self.parse_date()
-        else:
-            date_time = self.value
+        return date_time
 
+    def _make_aware(self, date_time):
         if is_naive(date_time):
             date_time = pytz.utc.localize(date_time)
 
         return date_time
 
-    def parse_date(self):
-        if self.date_format is None:
+    def _parse(self, value):
+        if self.formats is None:
+            return self._sample(value)
+
+        for date_format in self.formats:
+            try:
+                return datetime.datetime.strptime(value, date_format)
+            except ValueError:
+                pass
+
+        return self._parse_fallback(value)
+
+    def _sample(self, value):
+        parsed = None
+        for date_format in self.candidates:
+            try:
+                date_time = datetime.datetime.strptime(value, date_format)
+            except ValueError:
+                continue
+
+            self.matches[date_format] += 1
+            if parsed is None:
+                parsed = date_time
+
+        self.sampled += 1
+        if self.sampled >= self.sample_size:
+            self._settle()
+
+        if parsed is None:
+            parsed = self._parse_fallback(value)
+
+        return parsed
+
+    def _settle(self):
+        # max keeps the first of equals, so the column's own format wins
+        best = max(self.candidates, key=lambda f: self.matches[f])
+        self.formats = [best]
+        if best != self.date_format:
+            self.formats.append(self.date_format)
+
+    def _parse_fallback(self, value):
+        self.fallbacks += 1
+        return dateutil.parser.parse(value)
+
+
+# Functions returning the converter of a column of each type, given its spec
+CONVERTER_FACTORIES = {
+    'date': DateParser,
+    'text': lambda col_spec: None,
+    'integer': lambda col_spec: int,
+    'number': lambda col_spec: Decimal,
+    'taxonomy': lambda col_spec: None,
+}
+
+
+def make_converter(col_spec):
+    """ Return a function that converts a value of a column to its type,
+    or None if its values are used as they are.
+
+    Conversion errors raise SheetImportException, which says which value
+    failed. So do the values of columns of an unknown type.
+    """
+    col_type = col_spec['type']
+    if col_type not in CONVERTER_FACTORIES:
+        def unknown(value):
             raise SheetImportException(
-                _(u"Date format not specified for '%s' ") %
-                (self.field))
+                _(u"Unknown data type '%s' ") % (col_type))
+        return unknown
+
+    convert = CONVERTER_FACTORIES[col_type](col_spec)
+    if convert is None or isinstance(convert, DateParser):
+        # DateParsers check their own values
+        return convert
 
+    def checked(value):
         try:
-            date_time = datetime.datetime.strptime(self.value,
-                                                   self.date_format)
-        except:
-            date_time = dateutil.parser.parse(self.value)
+            return convert(value)
+        except Exception as e:
+            message = _("%s\nCan not process value '%s' of type '%s' ") % (e.message, value, col_type)
+            raise SheetImportException(message), None, sys.exc_info()[2]
 
-        return date_time
+    return checked
+
+
+def _field_adder(field, convert):
+    if convert is None:
+        def add(item, value):
+            item[field] = value
+    else:
+        def add(item, value):
+            item[field] = convert(value)
+    return add
+
+
+def _term_adder(taxonomy, convert):
+    def add(item, value):
+        if convert is not None:
+            value = convert(value)
+        item.setdefault('terms', []).append(
+            {'taxonomy': taxonomy, 'name': value})
+    return add
+
+
+def compile_columns(columns, date_parsers=None):
+    """ Compile the columns of a profile, in the order of the spreadsheet's
+    values, into a plan for converting its rows, once per import.
+
+    args:
+        columns: The columns of the profile
+        date_parsers: If given, a list the DateParsers of the date columns
+            are added to, eg. to count their fallback parses
+
+    returns:
+        A tuple with, for each column, a function that adds a value of the
+        column to an item, converted to the column's type, or None if the
+        column is ignored
+    """
+    plan = []
+    for col in columns:
+        if col['type'] == 'ignore':
+            plan.append(None)
+            continue
+
+        convert = make_converter(col)
+        if isinstance(convert, DateParser) and date_parsers is not None:
+            date_parsers.append(convert)
+
+        if col['type'] == 'taxonomy':
+            plan.append(_term_adder(col['taxonomy'], convert))
+        else:
+            plan.append(_field_adder(col['field'], convert))
+
+    return tuple(plan)
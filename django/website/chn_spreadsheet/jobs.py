@@ -0,0 +1,130 @@
+""" Import spreadsheets in the background, outside the web request that
+uploaded them.
+
+Uploads are queued as ImportJobs in the database, and run by a worker
+process, the run_import_worker command, which polls for queued jobs. As
+the import goes on, the job records its progress, which the upload page
+polls for.
+"""
+import logging
+import time
+
+from django.utils import timezone
+
+from .importer import Importer, SheetImportException
+from .models import ImportJob
+
+
+logger = logging.getLogger(__name__)
+
+
+def queue_import(source, uploaded_file):
+    """ Queue a spreadsheet for import by the worker
+
+    Args:
+        source: The label of the spreadsheet's SheetProfile
+        uploaded_file: The spreadsheet file, saved with the job
+
+    Returns:
+        The queued ImportJob
+    """
+    job = ImportJob(source=source)
+    job.file.save(uploaded_file.name, uploaded_file, save=False)
+    job.save()
+
+    return job
+
+
+def _record_progress(job_id):
+    def record(rows_processed, rows_failed, items_saved, date_fallbacks):
+        ImportJob.objects.filter(id=job_id, status=ImportJob.RUNNING).update(
+            rows_processed=rows_processed,
+            rows_failed=rows_failed,
+            items_saved=items_saved,
+            date_fallbacks=date_fallbacks,
+            progressed=timezone.now(),
+        )
+    return record
+
+
+def run_job(job):
+    """ Import the spreadsheet of a claimed job, recording its progress and
+    outcome, and delete the file once done.
+
+    The outcome is only recorded if the job is still running, and not
+    failed as stale meanwhile; see ImportJobManager.fail_stale.
+    """
+    importer = Importer(progress=_record_progress(job.id))
+
+    try:
+        job.file.open('rb')
+        try:
+            importer.store_spreadsheet(job.source, job.file)
+        finally:
+            job.file.close()
+        job.status = ImportJob.SUCCEEDED
+    except SheetImportException as e:
+        job.status = ImportJob.FAILED
+        job.error = e.message
+    except Exception as e:
+        logger.exception('Import job %s failed', job.id)
+        job.status = ImportJob.FAILED
+        job.error = unicode(e)
+
+    job.rows_processed = importer.rows_processed
+    job.rows_failed = importer.rows_failed
+    job.items_saved = importer.items_saved
+    job.date_fallbacks = importer.date_fallbacks
+    job.finished = timezone.now()
+
+    if job.date_fallbacks:
+        logger.warning(
+            'Import job %s: %d dates did not match the date formats of '
+            'the %s source', job.id, job.date_fallbacks, job.source)
+
+    recorded = ImportJob.objects.filter(
+        id=job.id, status=ImportJob.RUNNING).update(
+        status=job.status,
+        error=job.error,
+        rows_processed=job.rows_processed,
+        rows_failed=job.rows_failed,
+        items_saved=job.items_saved,
+        date_fallbacks=job.date_fallbacks,
+        finished=job.finished,
+        progressed=job.finished,
+        file='',
+    )
+    if not recorded:
+        logger.warning('Import job %s was failed as stale while it ran',
+                       job.id)
+        return ImportJob.objects.get(id=job.id)
+
+    job.file.delete(save=False)
+    job.progressed = job.finished
+
+    return job
+
+
+def run_queued_jobs():
+    """ Run queued jobs until none are left
+
+    Returns:
+        The number of jobs run
+    """
+    count = 0
+    job = ImportJob.objects.claim_next()
+    while job is not None:
+        run_job(job)
+        count += 1
+        job = ImportJob.objects.claim_next()
+
+    return count
+
+
+def run_worker(poll_interval=5):
+    """ Run queued jobs forever, polling for new ones every poll_interval
+    seconds when there are none.
+    """
+    while True:
+        if not run_queued_jobs():
+            time.sleep(poll_interval)
@@ -0,0 +1,121 @@
+from __future__ import unicode_literals, absolute_import
+
+import csv
+import datetime
+import io
+import time
+
+from django.core.management.base import BaseCommand
+from openpyxl import Workbook
+
+from chn_spreadsheet.importer import Importer
+
+COLUMNS = [
+    {'name': 'Province', 'type': 'text', 'field': 'location'},
+    {'name': 'Message', 'type': 'text', 'field': 'body'},
+    {'name': 'Date', 'type': 'date', 'field': 'timestamp',
+     'date_format': '%Y-%m-%d %H:%M:%S'},
+    {'name': 'Age', 'type': 'integer', 'field': 'age'},
+]
+
+META_DATA = {'item-types': 'question'}
+
+
+class Command(BaseCommand):
+    help = """Compares the speed of reading and converting the rows of the
+    same data as an Excel file and as a CSV file, in rows per second. Items
+    are not saved, so only the reading and converting are timed."""
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000,
+                            help='Number of rows in the files')
+        parser.add_argument('--repeat', type=int, default=3,
+                            help='Number of times each file is read')
+        parser.add_argument('--date-format', default=None,
+                            help='Date format of the profile, if not the '
+                            'one the dates are written in; eg. to time '
+                            'sheets with a mis-specified format')
+
+    def handle(self, *args, **options):
+        self.columns = [c.copy() for c in COLUMNS]
+        if options['date_format']:
+            self.columns[2]['date_format'] = options['date_format']
+
+        rows = self._create_rows(options['rows'])
+        files = (
+            ('excel', self._write_excel(rows)),
+            ('csv', self._write_csv(rows)),
+        )
+
+        self.stdout.write('%d rows, best of %d runs' % (
+            len(rows), options['repeat']))
+        self.stdout.write('%-8s%12s%12s' % ('format', 'seconds', 'rows/sec'))
+
+        timings = {}
+        for file_format, content in files:
+            timings[file_format] = self._time(
+                options['repeat'], self._read, file_format, content)
+            self.stdout.write('%-8s%12.4f%12.0f' % (
+                file_format, timings[file_format],
+                len(rows) / timings[file_format]))
+
+        if self.date_fallbacks:
+            self.stdout.write('%d csv dates did not match the date format' % (
+                self.date_fallbacks))
+
+        self.stdout.write('csv is %.1fx faster' % (
+            timings['excel'] / timings['csv']))
+
+    def _create_rows(self, count):
+        start = datetime.datetime(2015, 5, 1)
+        return [
+            ['Province %d' % (i % 15),
+             'Benchmark message %d, is the water safe to drink?' % i,
+             start + datetime.timedelta(minutes=i),
+             20 + i % 50]
+            for i in range(count)
+        ]
+
+    def _header(self):
+        return [c['name'] for c in COLUMNS]
+
+    def _write_excel(self, rows):
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet()
+        sheet.append(self._header())
+        for row in rows:
+            sheet.append(row)
+
+        f = io.BytesIO()
+        workbook.save(f)
+        return f.getvalue()
+
+    def _write_csv(self, rows):
+        f = io.BytesIO()
+        writer = csv.writer(f)
+        writer.writerow([name.encode('utf-8') for name in self._header()])
+        for province, message, date, age in rows:
+            writer.writerow([
+                province.encode('utf-8'),
+                message.encode('utf-8'),
+                date.strftime(COLUMNS[2]['date_format']),
+                age,
+            ])
+        return f.getvalue()
+
+    def _read(self, file_format, content):
+        importer = Importer()
+        rows = importer.get_rows_iterator(io.BytesIO(content), file_format)
+        for item in importer.process_rows(rows, self.columns, META_DATA,
+                                          skip_header=True):
+            pass
+        self.date_fallbacks = importer.date_fallbacks
+
+    def _time(self, repeat, function, *args, **kwargs):
+        best = None
+        for i in range(repeat):
+            start = time.time()
+            function(*args, **kwargs)
+            elapsed = time.time() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
@@ -0,0 +1,25 @@
+from __future__ import unicode_literals, absolute_import
+
+from django.core.management.base import BaseCommand
+
+from chn_spreadsheet.jobs import run_queued_jobs, run_worker
+
+
+class Command(BaseCommand):
+    help = """Runs the spreadsheet imports queued by uploads, polling the
+    database for new ones. With --once, runs the queued imports and exits,
+    eg. from cron."""
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', default=False,
+                            help='Run the queued imports, then exit')
+        parser.add_argument('--poll-interval', type=float, default=5,
+                            help='Seconds to wait between polls for imports')
+
+    def handle(self, *args, **options):
+        if options['once']:
+            count = run_queued_jobs()
+            if options['verbosity']:
+                self.stdout.write('Ran %d imports' % count)
+        else:
+            run_worker(poll_interval=options['poll_interval'])
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chn_spreadsheet', '0011_update_geopoll_config'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportJob',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('source', models.CharField(max_length=256)),
+                ('file', models.FileField(upload_to=b'imports/%Y/%m/%d', blank=True)),
+                ('status', models.CharField(default=b'queued', max_length=16, db_index=True, choices=[(b'queued', 'Queued'), (b'running', 'Running'), (b'succeeded', 'Succeeded'), (b'failed', 'Failed')])),
+                ('rows_processed', models.IntegerField(default=0)),
+                ('rows_failed', models.IntegerField(default=0)),
+                ('items_saved', models.IntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('started', models.DateTimeField(null=True, blank=True)),
+                ('finished', models.DateTimeField(null=True, blank=True)),
+            ],
+        ),
+    ]
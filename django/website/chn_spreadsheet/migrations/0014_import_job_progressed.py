@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+def set_progressed(apps, schema_editor):
+    # Running jobs last made progress when they started, as far as we know
+    ImportJob = apps.get_model('chn_spreadsheet', 'ImportJob')
+    ImportJob.objects.using(schema_editor.connection.alias).update(
+        progressed=models.F('started'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chn_spreadsheet', '0013_import_job_date_fallbacks'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importjob',
+            name='progressed',
+            field=models.DateTimeField(null=True, blank=True),
+        ),
+        migrations.RunPython(set_progressed, migrations.RunPython.noop),
+    ]
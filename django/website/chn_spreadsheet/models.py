@@ -1,6 +1,9 @@
 import collections
+from datetime import timedelta
 
 from django.db import models
+from django.utils import timezone
+from django.utils.translation import ugettext, ugettext_lazy as _
 from jsonfield import JSONField
 
 UPLOAD_CHOICES = (
@@ -20,3 +23,123 @@ class SheetProfile(models.Model):
 
     def __unicode__(self):
         return self.label
+
+
+class ImportJobManager(models.Manager):
+    # Running jobs that have made no progress for longer than this are
+    # taken to have been left by a worker that died. Jobs report progress
+    # every Importer.progress_interval rows.
+    stale_after = timedelta(hours=1)
+
+    def fail_stale(self):
+        """ Fail the running jobs that have made no progress for more than
+        stale_after, and delete their files.
+
+        They are failed rather than queued again, as the chunks they
+        committed before their worker died would be imported twice.
+
+        Returns:
+            The number of jobs failed
+        """
+        now = timezone.now()
+        cutoff = now - self.stale_after
+        stale = self.filter(status=ImportJob.RUNNING, progressed__lt=cutoff)
+
+        count = 0
+        for job in stale:
+            # Unless it made progress since
+            failed = self.filter(id=job.id, status=ImportJob.RUNNING,
+                                 progressed__lt=cutoff).update(
+                status=ImportJob.FAILED,
+                error=ugettext("The import stopped, and may be incomplete. "
+                               "Its worker died while running it."),
+                finished=now,
+            )
+            if failed:
+                job.file.delete(save=False)
+                count += failed
+
+        return count
+
+    def claim_next(self):
+        """ Claim the oldest queued job for this worker, and mark it running
+
+        A job is only claimed if it is still queued when it is marked
+        running, so workers in other processes never run the same job.
+        Stale running jobs are failed first; see fail_stale.
+
+        Returns:
+            The claimed ImportJob, or None if no job is queued
+        """
+        self.fail_stale()
+
+        while True:
+            queued = self.filter(status=ImportJob.QUEUED).order_by(
+                'created', 'id').values_list('id', flat=True)[:1]
+            if not queued:
+                return None
+
+            job_id = queued[0]
+            now = timezone.now()
+            claimed = self.filter(id=job_id, status=ImportJob.QUEUED).update(
+                status=ImportJob.RUNNING, started=now, progressed=now)
+            if claimed:
+                return self.get(id=job_id)
+
+
+class ImportJob(models.Model):
+    """ A spreadsheet queued for import by the worker, run by the
+    run_import_worker command, outside the web request that uploaded it.
+    """
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (QUEUED, _('Queued')),
+        (RUNNING, _('Running')),
+        (SUCCEEDED, _('Succeeded')),
+        (FAILED, _('Failed')),
+    )
+
+    source = models.CharField(max_length=256)
+    file = models.FileField(upload_to='imports/%Y/%m/%d', blank=True)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES,
+                              default=QUEUED, db_index=True)
+    rows_processed = models.IntegerField(default=0)
+    # An import stops at the first row that fails, so this is 1 if the
+    # job failed on a row, and 0 otherwise
+    rows_failed = models.IntegerField(default=0)
+    items_saved = models.IntegerField(default=0)
+    # Dates parsed by guessing their format, see importer.DateParser
+    date_fallbacks = models.IntegerField(default=0)
+    error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    started = models.DateTimeField(null=True, blank=True)
+    # When the running job last reported progress, see fail_stale
+    progressed = models.DateTimeField(null=True, blank=True)
+    finished = models.DateTimeField(null=True, blank=True)
+
+    objects = ImportJobManager()
+
+    @property
+    def is_finished(self):
+        return self.status in (self.SUCCEEDED, self.FAILED)
+
+    @property
+    def rows_per_second(self):
+        """ The number of rows processed per second since the job started,
+        or None if it hasn't
+        """
+        if self.started is None:
+            return None
+
+        end = self.finished or timezone.now()
+        seconds = (end - self.started).total_seconds()
+        if seconds <= 0:
+            return None
+
+        return self.rows_processed / seconds
+
+    def __unicode__(self):
+        return '%s import %s (%s)' % (self.source, self.id, self.status)
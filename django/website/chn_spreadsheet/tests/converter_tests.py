@@ -0,0 +1,198 @@
+import datetime
+import decimal
+import pytest
+import pytz
+
+from ..importer import (
+    compile_columns,
+    DateParser,
+    make_converter,
+    SheetImportException
+)
+
+from django.utils.translation import ugettext as _
+
+
+def test_successful_runs_of_parse_date():
+    dates = (
+        ('05/01/2015', '%d/%m/%Y'),
+        ('5.1.2015', '%d.%m.%Y'),
+        ('5/1/15', '%d/%m/%y'),
+        ('05-01-2015', '%d-%m-%Y'),
+        (datetime.datetime(2015, 1, 5, 0, 0), None)
+    )
+    expected = pytz.utc.localize(datetime.datetime(2015, 1, 5))
+    for date, date_format in dates:
+        convert = make_converter({'type': 'date',
+                                  'field': '',
+                                  'date_format': date_format})
+
+        assert convert(date) == expected
+
+
+def test_exception_raised_on_faulty_dates():
+    bad_date = '05x01-2015'
+    convert = make_converter({'type': 'date',
+                              'field': '',
+                              'date_format': '%m-%d-%Y'})
+    with pytest.raises(SheetImportException):
+        convert(bad_date)
+
+
+def test_convert_value_raises_on_unknown_type():
+    value = 'Short message'
+    type = 'location'
+
+    convert = make_converter({'type': type, 'field': ''})
+    with pytest.raises(SheetImportException) as excinfo:
+        convert(value)
+    assert excinfo.value.message == _(u"Unknown data type 'location' ")
+
+
+def test_convert_value_raises_on_malformed_value():
+    value = 'not_integer'
+    type = 'integer'
+
+    convert = make_converter({'type': type, 'field': ''})
+
+    with pytest.raises(SheetImportException) as excinfo:
+        convert(value)
+
+    messages = excinfo.value.message.split('\n')
+    assert _(u"Can not process value 'not_integer' of type 'integer' ") in messages
+
+
+def test_convert_value_raises_on_date_without_format():
+    value = '1.5.2015'
+
+    convert = make_converter({
+        'type': 'date',
+        'field': 'created'})
+
+    with pytest.raises(SheetImportException) as excinfo:
+        convert(value)
+
+    messages = excinfo.value.message.split('\n')
+    assert _(u"Date format not specified for 'created' ") in messages
+
+
+def test_date_can_be_empty():
+    value = None
+
+    convert = make_converter({
+        'type': 'date',
+        'field': 'created'})
+
+    date = convert(value)
+
+    assert date is None
+
+
+def test_text_and_taxonomy_values_are_not_converted():
+    assert make_converter({'type': 'text', 'field': 'body'}) is None
+    assert make_converter({'type': 'taxonomy', 'field': 'terms'}) is None
+
+
+def test_compile_columns_makes_a_plan_per_column():
+    plan = compile_columns([
+        {'type': 'text', 'field': 'body'},
+        {'type': 'ignore', 'field': 'ignore'},
+        {'type': 'number', 'field': 'price'},
+        {'type': 'taxonomy', 'field': 'terms', 'taxonomy': 'tags'},
+    ])
+
+    assert isinstance(plan, tuple)
+    assert plan[1] is None
+
+    item = {}
+    for add, value in zip(plan, ['Hello', 'ignored', '10.4', 'Lofa']):
+        if add is not None:
+            add(item, value)
+
+    assert item == {
+        'body': 'Hello',
+        'price': decimal.Decimal('10.4'),
+        'terms': [{'taxonomy': 'tags', 'name': 'Lofa'}],
+    }
+
+
+def test_date_parser_settles_on_the_columns_own_format():
+    parser = DateParser({'type': 'date', 'field': 'created',
+                         'date_format': '%d/%m/%Y'})
+    parser.sample_size = 2
+
+    assert parser('05/01/2015') == pytz.utc.localize(
+        datetime.datetime(2015, 1, 5))
+    parser('06/01/2015')
+
+    assert parser.formats == ['%d/%m/%Y']
+    assert parser.fallbacks == 0
+
+
+def test_date_parser_detects_mis_specified_format():
+    parser = DateParser({'type': 'date', 'field': 'created',
+                         'date_format': '%d/%m/%Y'})
+    parser.sample_size = 2
+
+    parser('2015-01-05 10:30:00')
+    parser('2015-01-06 11:00:00')
+    date = parser('2015-01-07 12:15:00')
+
+    assert date == pytz.utc.localize(datetime.datetime(2015, 1, 7, 12, 15))
+    assert parser.formats == ['%Y-%m-%d %H:%M:%S', '%d/%m/%Y']
+    assert parser.fallbacks == 0
+
+
+def test_date_parser_keeps_the_order_of_days_and_months():
+    parser = DateParser({'type': 'date', 'field': 'created',
+                         'date_format': '%d/%m/%Y'})
+    parser.sample_size = 1
+
+    date = parser('05-01-2015 10:30')
+
+    assert date == pytz.utc.localize(datetime.datetime(2015, 1, 5, 10, 30))
+    assert parser.formats[0] == '%d-%m-%Y %H:%M'
+
+
+def test_date_parser_counts_fallback_parses():
+    parser = DateParser({'type': 'date', 'field': 'created',
+                         'date_format': '%d/%m/%Y'})
+    parser.sample_size = 1
+
+    parser('05/01/2015')
+    date = parser('January 6th 2015')
+
+    assert date == pytz.utc.localize(datetime.datetime(2015, 1, 6))
+    assert parser.fallbacks == 1
+
+
+def test_date_parser_remembers_parsed_values():
+    parser = DateParser({'type': 'date', 'field': 'created',
+                         'date_format': '%d/%m/%Y'})
+
+    first = parser('January 6th 2015')
+    assert parser('January 6th 2015') is first
+    assert parser.fallbacks == 1
+
+
+def test_compile_columns_lists_the_date_parsers():
+    date_parsers = []
+    compile_columns([
+        {'type': 'text', 'field': 'body'},
+        {'type': 'date', 'field': 'timestamp', 'date_format': '%d/%m/%Y'},
+    ], date_parsers)
+
+    [parser] = date_parsers
+    assert isinstance(parser, DateParser)
+    assert parser.field == 'timestamp'
+
+
+def test_date_parser_raises_on_values_that_are_not_dates():
+    parser = DateParser({'type': 'date', 'field': 'created',
+                         'date_format': '%d/%m/%Y'})
+
+    with pytest.raises(SheetImportException) as excinfo:
+        parser(42.0)
+
+    messages = excinfo.value.message.split('\n')
+    assert _(u"Can not process value '42.0' of type 'date' ") in messages
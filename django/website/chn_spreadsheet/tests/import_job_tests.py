@@ -0,0 +1,170 @@
+from os import path
+import pytest
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.utils import timezone
+
+import transport
+
+from ..jobs import queue_import, run_job, run_queued_jobs
+from ..models import ImportJob, SheetProfile
+
+TEST_BASE_DIR = path.abspath(path.dirname(__file__))
+TEST_DIR = path.join(TEST_BASE_DIR, 'test_files')
+
+
+@pytest.fixture
+def media_root(settings, tmpdir):
+    settings.MEDIA_ROOT = str(tmpdir)
+    return tmpdir
+
+
+def upload(name):
+    with open(path.join(TEST_DIR, name), 'rb') as f:
+        return SimpleUploadedFile(name, f.read())
+
+
+@pytest.mark.django_db
+def test_queued_import_is_not_run_until_claimed(media_root):
+    job = queue_import('geopoll', upload('sample_geopoll.xlsx'))
+
+    assert job.status == ImportJob.QUEUED
+    assert job.file
+    assert len(transport.items.list()) == 0
+
+
+@pytest.mark.django_db
+def test_claim_next_claims_oldest_queued_job_once(media_root):
+    first = queue_import('geopoll', upload('sample_geopoll.xlsx'))
+    second = queue_import('geopoll', upload('sample_geopoll.xlsx'))
+
+    claimed = ImportJob.objects.claim_next()
+    assert claimed.id == first.id
+    assert claimed.status == ImportJob.RUNNING
+    assert claimed.started is not None
+
+    assert ImportJob.objects.claim_next().id == second.id
+    assert ImportJob.objects.claim_next() is None
+
+
+@pytest.mark.django_db
+def test_claim_next_fails_jobs_left_running_by_a_dead_worker(media_root):
+    stale = queue_import('geopoll', upload('sample_geopoll.xlsx'))
+    long_running = queue_import('geopoll', upload('sample_geopoll.xlsx'))
+    long_ago = timezone.now() - ImportJob.objects.stale_after * 2
+    ImportJob.objects.filter(id=stale.id).update(
+        status=ImportJob.RUNNING, started=long_ago, progressed=long_ago)
+    ImportJob.objects.filter(id=long_running.id).update(
+        status=ImportJob.RUNNING, started=long_ago,
+        progressed=timezone.now())
+
+    assert ImportJob.objects.claim_next() is None
+
+    stale = ImportJob.objects.get(id=stale.id)
+    assert stale.status == ImportJob.FAILED
+    assert stale.error
+    assert stale.finished is not None
+    assert not stale.file.storage.exists(stale.file.name)
+    long_running = ImportJob.objects.get(id=long_running.id)
+    assert long_running.status == ImportJob.RUNNING
+    assert long_running.file.storage.exists(long_running.file.name)
+
+
+@pytest.mark.django_db
+def test_run_job_does_not_revive_a_job_failed_as_stale(media_root):
+    queue_import('geopoll', upload('sample_geopoll.xlsx'))
+    job = ImportJob.objects.claim_next()
+    # As if another worker failed it as stale while it ran
+    ImportJob.objects.filter(id=job.id).update(
+        status=ImportJob.FAILED, error="Stale")
+
+    job = run_job(job)
+
+    assert job.status == ImportJob.FAILED
+    assert job.error == "Stale"
+    assert ImportJob.objects.get(id=job.id).error == "Stale"
+
+
+@pytest.mark.django_db
+def test_run_job_imports_and_records_progress(media_root):
+    queue_import('geopoll', upload('sample_geopoll.xlsx'))
+
+    job = run_job(ImportJob.objects.claim_next())
+
+    job = ImportJob.objects.get(id=job.id)
+    items = transport.items.list()
+    assert job.status == ImportJob.SUCCEEDED
+    assert job.items_saved == len(items) > 0
+    assert job.rows_processed == len(items)
+    assert job.rows_failed == 0
+    assert job.finished is not None
+    assert job.rows_per_second > 0
+    assert not job.file
+
+
+@pytest.mark.django_db
+def test_run_job_records_failure(media_root):
+    queue_import('geopoll', upload('sample_excel.xlsx'))
+
+    job = run_job(ImportJob.objects.claim_next())
+
+    job = ImportJob.objects.get(id=job.id)
+    assert job.status == ImportJob.FAILED
+    assert job.error
+    assert job.items_saved == 0
+    assert len(transport.items.list()) == 0
+
+
+@pytest.mark.django_db
+def test_run_job_reports_progress_as_it_goes(media_root, monkeypatch):
+    queue_import('geopoll', upload('sample_geopoll.xlsx'))
+    job = ImportJob.objects.claim_next()
+
+    reports = []
+    save = transport.items.bulk_create
+
+    def bulk_create(items):
+        reports.append(ImportJob.objects.get(id=job.id))
+        return save(items)
+    monkeypatch.setattr(transport.items, 'bulk_create', bulk_create)
+    monkeypatch.setattr('chn_spreadsheet.importer.Importer.progress_interval', 1)
+
+    run_job(job)
+
+    assert reports and reports[0].rows_processed > 0
+    assert reports[0].progressed > job.started
+
+
+@pytest.mark.django_db
+def test_worker_command_runs_queued_jobs_once(media_root):
+    queue_import('geopoll', upload('sample_geopoll.xlsx'))
+    queue_import('geopoll', upload('sample_geopoll.xlsx'))
+
+    call_command('run_import_worker', once=True, verbosity=0)
+
+    assert set(ImportJob.objects.values_list('status', flat=True)) == set(
+        [ImportJob.SUCCEEDED])
+    assert run_queued_jobs() == 0
+
+
+@pytest.mark.django_db
+def test_run_job_records_dates_not_matching_the_format(media_root):
+    SheetProfile.objects.create(label='sms', profile={
+        'format': 'csv',
+        'columns': [
+            {'name': 'Message', 'type': 'text', 'field': 'body'},
+            {'name': 'Date', 'type': 'date', 'field': 'timestamp',
+             'date_format': '%d/%m/%Y'},
+        ],
+        'taxonomies': {},
+    })
+    queue_import('sms', SimpleUploadedFile(
+        'sms.csv', b'one,05/01/2015\ntwo,January 6th 2015\n'))
+
+    job = run_job(ImportJob.objects.claim_next())
+
+    job = ImportJob.objects.get(id=job.id)
+    assert job.status == ImportJob.SUCCEEDED
+    assert job.items_saved == 2
+    assert job.date_fallbacks == 1
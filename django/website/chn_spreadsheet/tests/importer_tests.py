@@ -1,5 +1,6 @@
 import datetime
 import decimal
+import io
 from os import path
 import pytest
 import pytz
@@ -9,6 +10,7 @@ from django.utils.translation import ugettext as _
 import transport
 
 from ..importer import (
+    compile_columns,
     Importer,
     SheetProfile, SheetImportException
 )
@@ -97,6 +99,93 @@ def test_get_rows_iterator_works_on_excel_files(importer):
     assert len(rows[1]) == 2
 
 
+def test_get_rows_iterator_streams_csv_files(importer):
+    f = io.BytesIO(b'Province,Message\r\n'
+                   b'London,"Short, quoted\r\nmessage"\r\n'
+                   b'Cambridge,What?\r\n')
+
+    rows = importer.get_rows_iterator(f, 'csv')
+
+    assert rows.next() == ['Province', 'Message']
+    assert list(rows) == [
+        ['London', 'Short, quoted\r\nmessage'],
+        ['Cambridge', 'What?'],
+    ]
+
+
+def test_get_rows_iterator_reads_lines_split_across_chunks(importer,
+                                                           monkeypatch):
+    monkeypatch.setattr('chn_spreadsheet.importer.TEXT_CHUNK_SIZE', 3)
+    f = io.BytesIO(u'\ufeffa,\u00e9t\u00e9\r\nb,c\rd,e\n'.encode('utf-8'))
+
+    rows = list(importer.get_rows_iterator(f, 'csv'))
+
+    assert rows == [['a', u'\u00e9t\u00e9'], ['b', 'c'], ['d', 'e']]
+
+
+def test_get_rows_iterator_reads_tsv_in_given_encoding(importer):
+    f = io.BytesIO(u'a\t"b"\r\nc\t\u00e9\r\n'.encode('utf-16'))
+
+    rows = list(importer.get_rows_iterator(f, 'tsv', encoding='utf-16',
+                                           quoting='none'))
+
+    assert rows == [['a', '"b"'], ['c', u'\u00e9']]
+
+
+def test_get_rows_iterator_uses_given_delimiter_and_quotechar(importer):
+    f = io.BytesIO(b"a;'b;c'\n")
+
+    rows = list(importer.get_rows_iterator(f, 'csv', delimiter=';',
+                                           quotechar="'"))
+
+    assert rows == [['a', 'b;c']]
+
+
+def test_get_rows_iterator_raises_on_bad_csv_options(importer):
+    with pytest.raises(SheetImportException) as excinfo:
+        importer.get_rows_iterator(io.BytesIO(), 'csv', quoting='some')
+    assert excinfo.value.message == _('Unsupported quoting: some')
+
+    with pytest.raises(SheetImportException) as excinfo:
+        importer.get_rows_iterator(io.BytesIO(), 'csv', encoding='klingon')
+    assert excinfo.value.message == _('Unknown encoding: klingon')
+
+    with pytest.raises(SheetImportException) as excinfo:
+        importer.get_rows_iterator(io.BytesIO(), 'csv', delimiter=';;')
+    assert excinfo.value.message.startswith(_('Invalid csv options: '))
+
+
+def test_get_rows_iterator_raises_on_undecodable_csv(importer):
+    rows = importer.get_rows_iterator(io.BytesIO(b'a,\xff\n'), 'csv')
+
+    with pytest.raises(SheetImportException) as excinfo:
+        list(rows)
+    assert excinfo.value.message.startswith(_('Could not read csv file: '))
+
+
+@pytest.mark.django_db
+def test_store_spreadsheet_imports_csv(importer):
+    SheetProfile.objects.create(label='sms', profile={
+        'format': 'csv',
+        'delimiter': ';',
+        'skip_header': 1,
+        'columns': [
+            {'name': 'Message', 'type': 'text', 'field': 'body'},
+            {'name': 'Date', 'type': 'date', 'field': 'timestamp',
+             'date_format': '%d/%m/%Y'},
+        ],
+        'taxonomies': {'item-types': 'question'},
+    })
+    f = io.BytesIO(b'Date;Message\n21/07/2014;Is the water safe?\n')
+
+    assert importer.store_spreadsheet('sms', f) == 1
+
+    [item] = transport.items.list()
+    assert item['body'] == 'Is the water safe?'
+    assert item['timestamp'] == pytz.utc.localize(
+        datetime.datetime(2014, 7, 21))
+
+
 def _make_columns_row(column_list):
     row = [d.copy() for d in column_list]
 
@@ -184,7 +273,7 @@ def test_process_row(importer):
         }
     ]
 
-    converted = importer.process_row(row, columns)
+    converted = importer.process_row(row, compile_columns(columns))
     assert converted == {
         'message': 'Short message',
         'age': 5,
@@ -225,8 +314,8 @@ def __test_process_rows_without_or_with_header(importer, with_header):
     columns[0]['type'] = 'text'
     rows = _rows_generator()
 
-    objects = importer.process_rows(rows, columns, {'item-types': 'question'},
-                                    with_header)
+    objects = list(importer.process_rows(
+        rows, columns, {'item-types': 'question'}, with_header))
 
     assert objects[0]['message.location'] == 'London'
     assert objects[0]['message.content'] == 'Short message'
@@ -259,8 +348,8 @@ def test_process_rows_displays_line_number_on_error(importer):
 
     with_header = True
     with pytest.raises(SheetImportException) as excinfo:
-        importer.process_rows(rows, columns, {'item-types': 'question'},
-                              with_header)
+        list(importer.process_rows(rows, columns, {'item-types': 'question'},
+                                   with_header))
 
     assert excinfo.value.message == _(u"Unknown data type 'location' in row 2 ")
     assert len(excinfo.traceback) > 2, "Was expecting traceback of more than 2 lines"
@@ -303,8 +392,8 @@ def test_process_rows_ignores_empty_lines(importer):
 
     with_header = True
 
-    objects = importer.process_rows(rows, columns, {'item-types': 'question'},
-                                    with_header)
+    objects = list(importer.process_rows(
+        rows, columns, {'item-types': 'question'}, with_header))
 
     expected_objects = [
         {
@@ -344,3 +433,104 @@ def test_save_rows_creates_item_with_term(importer):
 
     assert counts_per_item['question'] == 1
     assert counts_per_item['rumor'] == 0
+
+
+@pytest.mark.django_db
+def test_save_rows_saves_in_batches(importer):
+    importer.save_batch_size = 2
+    objects = [
+        {
+            'body': "Text %d" % i,
+            'terms': [{
+                'name': 'question',
+                'taxonomy': 'item-types',
+            }],
+        }
+        for i in range(5)
+    ]
+
+    assert importer.save_rows(objects) == 5
+    assert len(transport.items.list()) == 5
+
+
+@pytest.mark.django_db
+def test_save_rows_commits_chunks_before_an_error(importer):
+    importer.save_batch_size = 2
+
+    def _objects():
+        for i in range(5):
+            yield {'body': "Text %d" % i}
+        raise SheetImportException("Bad value in row 6 ")
+
+    with pytest.raises(SheetImportException) as excinfo:
+        importer.save_rows(_objects())
+
+    assert excinfo.value.message == (
+        "Bad value in row 6 "
+        "(2 chunks, of 4 entries, were committed before the error) ")
+    # The chunk being converted is not saved
+    assert len(transport.items.list()) == 4
+
+
+@pytest.mark.django_db
+def test_store_spreadsheet_reads_rows_as_chunks_are_saved(importer, monkeypatch):
+    importer.save_batch_size = 2
+    rows_read = []
+
+    def _rows():
+        for i in range(6):
+            rows_read.append(i)
+            yield ('Message %d' % i,)
+
+    monkeypatch.setattr(importer, 'get_profile', lambda label: {
+        'format': 'excel',
+        'columns': [{'name': 'Message', 'type': 'text', 'field': 'body'}],
+        'taxonomies': {},
+    })
+    monkeypatch.setattr(importer, 'get_rows_iterator',
+                        lambda f, file_format, **options: _rows())
+
+    rows_read_by_chunk = []
+    save = transport.items.bulk_create
+
+    def bulk_create(items):
+        rows_read_by_chunk.append(len(rows_read))
+        return save(items)
+    monkeypatch.setattr(transport.items, 'bulk_create', bulk_create)
+
+    assert importer.store_spreadsheet('streamed', None) == 6
+    assert rows_read_by_chunk == [2, 4, 6]
+    assert importer.chunks_committed == 3
+
+
+@pytest.mark.django_db
+def test_save_rows_resolves_each_term_once_per_import(importer, monkeypatch):
+    importer.save_batch_size = 2
+    objects = [
+        {
+            'body': "Text %d" % i,
+            'terms': [
+                {'name': 'question', 'taxonomy': 'item-types'},
+                {'name': 'tag %d' % (i % 2), 'taxonomy': 'tags'},
+            ],
+        }
+        for i in range(5)
+    ]
+
+    resolved = []
+    resolve = transport.terms.resolve
+
+    def resolve_terms(pairs):
+        pairs = set(pairs)
+        resolved.extend(pairs)
+        return resolve(pairs)
+    monkeypatch.setattr(transport.terms, 'resolve', resolve_terms)
+
+    assert importer.save_rows(objects) == 5
+
+    assert sorted(resolved) == [
+        ('item-types', 'question'), ('tags', 'tag 0'), ('tags', 'tag 1')]
+    item_types = transport.taxonomies.term_itemcount(slug='item-types')
+    assert {t['name']: t['count'] for t in item_types}['question'] == 5
+    tags = transport.taxonomies.term_itemcount(slug='tags')
+    assert {t['name']: t['count'] for t in tags} == {'tag 0': 3, 'tag 1': 2}
@@ -21,7 +21,8 @@ def test_items_imported(importer):
     num_saved = importer.store_spreadsheet('rapidpro', f)
     assert num_saved > 0
 
-    items = transport.items.list()
+    # Listed newest first, so in reverse order of the spreadsheet rows
+    items = transport.items.list()[::-1]
     assert len(items) == num_saved
 
     assert items[0]['body'] == "That there is a special budget to give money to the family of each dead in Liberia since the Ebola outbreak."
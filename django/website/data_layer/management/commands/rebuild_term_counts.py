@@ -0,0 +1,41 @@
+from __future__ import unicode_literals, absolute_import
+
+from django.core.management.base import BaseCommand, CommandError
+
+from data_layer.models import TermDailyCount
+
+
+class Command(BaseCommand):
+    help = """Rebuilds the daily term counts from the links between items
+    and terms, then checks them against the live counts. With --check,
+    only checks them."""
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true', default=False,
+                            help='Only check the counts, without rebuilding')
+
+    def handle(self, *args, **options):
+        if not options['check']:
+            TermDailyCount.objects.rebuild()
+            if options['verbosity']:
+                self.stdout.write('Rebuilt the daily term counts')
+
+        live = TermDailyCount.objects.live_counts()
+        stored = TermDailyCount.objects.stored_counts()
+
+        mismatches = sorted(
+            key for key in set(live) | set(stored)
+            if live[key] != stored[key]
+        )
+        for term_id, day in mismatches:
+            self.stderr.write('Term %d on %s: counted %d, live %d' % (
+                term_id, day, stored[(term_id, day)], live[(term_id, day)]))
+
+        if mismatches:
+            raise CommandError(
+                '%d daily term counts differ from the live counts' % len(
+                    mismatches))
+
+        if options['verbosity']:
+            self.stdout.write(
+                '%d daily term counts match the live counts' % len(live))
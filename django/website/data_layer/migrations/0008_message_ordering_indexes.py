@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_layer', '0007_message_created_id_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='message',
+            name='network_provider',
+            field=models.CharField(db_index=True, max_length=200, blank=True),
+        ),
+        migrations.AlterField(
+            model_name='message',
+            name='timestamp',
+            field=models.DateTimeField(null=True, db_index=True),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+from data_layer.search import create_text_index, drop_text_index
+
+
+def add_text_index(apps, schema_editor):
+    create_text_index(schema_editor)
+
+
+def remove_text_index(apps, schema_editor):
+    drop_text_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_layer', '0008_message_ordering_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_text_index, remove_text_index)
+    ]
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from collections import Counter
+
+from django.conf import settings
+from django.db import models, migrations
+from django.utils import timezone
+
+
+def count_day(timestamp):
+    # As data_layer.models.count_day, at the time of this migration
+    if timestamp is None:
+        return None
+
+    if settings.USE_TZ:
+        timestamp = timezone.localtime(
+            timestamp, timezone.get_default_timezone())
+
+    return timestamp.date()
+
+
+def count_terms(apps, schema_editor):
+    Message = apps.get_model('data_layer', 'Message')
+    TermDailyCount = apps.get_model('data_layer', 'TermDailyCount')
+    db_alias = schema_editor.connection.alias
+
+    counts = Counter()
+    links = Message.terms.through.objects.using(db_alias).values_list(
+        'term_id', 'message__timestamp')
+    for term_id, timestamp in links.iterator():
+        counts[(term_id, count_day(timestamp))] += 1
+
+    TermDailyCount.objects.using(db_alias).bulk_create(
+        TermDailyCount(term_id=term_id, day=day, count=count)
+        for (term_id, day), count in counts.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('taxonomies', '0004_taxonomy_vocabulary'),
+        ('data_layer', '0009_message_body_text_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TermDailyCount',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('day', models.DateField(null=True)),
+                ('count', models.IntegerField(default=0)),
+                ('term', models.ForeignKey(related_name='daily_counts', to='taxonomies.Term')),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='termdailycount',
+            unique_together=set([('term', 'day')]),
+        ),
+        migrations.RunPython(count_terms, migrations.RunPython.noop),
+    ]
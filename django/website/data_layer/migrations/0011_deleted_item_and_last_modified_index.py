@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+from data_layer.search import create_text_index, drop_text_index
+
+
+# SQLite alters a table by copying it to a new one, which drops the
+# triggers that keep its text index up to date, so the index is recreated
+# around the change. Other databases alter the table in place.
+def drop_sqlite_text_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        drop_text_index(schema_editor)
+
+
+def create_sqlite_text_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        create_text_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_layer', '0010_term_daily_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeletedItem',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('item_id', models.IntegerField()),
+                ('deleted', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+        ),
+        migrations.RunPython(drop_sqlite_text_index, create_sqlite_text_index),
+        migrations.AlterField(
+            model_name='message',
+            name='last_modified',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.RunPython(create_sqlite_text_index, drop_sqlite_text_index),
+    ]
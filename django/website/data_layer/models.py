@@ -1,13 +1,19 @@
-from django.db import models
+from collections import Counter
+
+from django.conf import settings
+from django.db import models, transaction, DatabaseError, IntegrityError
+from django.db.models import F, Max
 from django.dispatch.dispatcher import receiver
+from django.utils import timezone
 
-from taxonomies.models import Term
+from taxonomies.models import Taxonomy, Term
 from taxonomies.exceptions import TermException
 
 
 class DataLayerModel(models.Model):
     created = models.DateTimeField(auto_now_add=True)
-    last_modified = models.DateTimeField(auto_now=True)
+    # Indexed for syncing changes, see rest_api.views.ItemViewSet
+    last_modified = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         abstract = True
@@ -17,11 +23,231 @@ class DataLayerModel(models.Model):
         self.save()
 
 
+class _UnknownItemIds(DatabaseError):
+    """ The ids of bulk created Items could not be read back """
+
+
+class MessageManager(models.Manager):
+
+    def bulk_create_with_terms(self, items_and_terms):
+        """ Create many Items and link them to their Terms in one
+        transaction, using multi-row inserts for both the Items and the
+        rows of the terms through table.
+
+        args:
+            items_and_terms: list of (Item, [Term, ...]) pairs. The Items
+                must not have been saved yet.
+
+        returns:
+            The list of Items, with their primary keys set.
+
+        Bulk inserts don't give us the primary keys back, so we note the
+        highest existing id first and read back the ids above it in order.
+        If another connection inserted Items at the same time, there are
+        more ids than Items, so the bulk insert is rolled back, and the
+        Items are inserted one at a time instead.
+        Unlike Item.terms.add() this does not send m2m_changed signals;
+        the new Items' last_modified is already current.
+        """
+        items = [item for item, _ in items_and_terms]
+        if not items:
+            return items
+
+        with transaction.atomic():
+            try:
+                with transaction.atomic():
+                    self._bulk_insert(items)
+            except _UnknownItemIds:
+                for item in items:
+                    item.pk = None
+                    item.save()
+
+            Through = self.model.terms.through
+            links = set()
+            for item, terms in items_and_terms:
+                links.update((item.pk, term.id) for term in terms)
+
+            Through.objects.bulk_create(
+                Through(message_id=item_id, term_id=term_id)
+                for item_id, term_id in links
+            )
+
+            TermDailyCount.objects.adjust(Counter(
+                (term.id, count_day(item.timestamp))
+                for item, terms in items_and_terms
+                for term in set(terms)
+            ))
+
+        return items
+
+    def _bulk_insert(self, items):
+        """ Insert the Items with a multi-row insert, and set their primary
+        keys.
+
+        throws:
+            _UnknownItemIds if other Items were inserted at the same time,
+            so that the primary keys can't be told apart
+        """
+        last_id = self.aggregate(last_id=Max('id'))['last_id'] or 0
+        self.bulk_create(items)
+
+        ids = list(self.filter(id__gt=last_id).order_by('id').values_list(
+            'id', flat=True))
+        if len(ids) != len(items):
+            raise _UnknownItemIds(
+                "Could not determine the ids of bulk created items")
+
+        for id, item in zip(ids, items):
+            item.pk = id
+
+    def bulk_apply_terms(self, item_ids, terms):
+        """ Add or replace values of term.taxonomy for all the given Items
+
+        This follows the rules of Message.apply_terms, but uses a handful
+        of set-based queries whatever the number of Items.
+
+        returns:
+            The ids of the Items that exist, and so were updated.
+        """
+        if isinstance(terms, Term):
+            terms = [terms]
+
+        taxonomy = terms[0].taxonomy
+
+        if not all(t.taxonomy == taxonomy for t in terms):
+            raise TermException("Terms cannot be applied from different taxonomies")
+
+        if not taxonomy.is_multiple and len(terms) > 1:
+            message = "Taxonomy '%s' does not support multiple terms" % taxonomy
+            raise TermException(message)
+
+        Through = self.model.terms.through
+        with transaction.atomic():
+            timestamps = dict(
+                self.filter(id__in=item_ids).values_list('id', 'timestamp'))
+            ids = list(timestamps)
+
+            if not taxonomy.is_multiple:
+                self._delete_term_links(ids, taxonomy, keep=terms)
+
+            existing = set(Through.objects.filter(
+                message_id__in=ids,
+                term__in=terms,
+            ).values_list('message_id', 'term_id'))
+
+            new_links = [
+                (id, term.id) for id in ids for term in terms
+                if (id, term.id) not in existing
+            ]
+            Through.objects.bulk_create(
+                Through(message_id=id, term_id=term_id)
+                for id, term_id in new_links
+            )
+            TermDailyCount.objects.adjust(Counter(
+                (term_id, count_day(timestamps[id]))
+                for id, term_id in new_links
+            ))
+
+            self._note_external_modification(ids)
+
+        return ids
+
+    def bulk_delete_all_terms(self, item_ids, taxonomy):
+        """ Remove all the terms of the given Taxonomy from the given Items
+
+        returns:
+            The ids of the Items that exist, and so were updated.
+        """
+        with transaction.atomic():
+            ids = list(self.filter(id__in=item_ids).values_list('id', flat=True))
+            self._delete_term_links(ids, taxonomy)
+            self._note_external_modification(ids)
+
+        return ids
+
+    def _delete_term_links(self, ids, taxonomy, keep=()):
+        links = self.model.terms.through.objects.filter(
+            message_id__in=ids,
+            term__taxonomy=taxonomy,
+        )
+        if keep:
+            links = links.exclude(term__in=keep)
+        TermDailyCount.objects.count_links(links, -1)
+        links.delete()
+
+    def bulk_delete(self, item_ids):
+        """ Delete the given Items, and their links to terms, with
+        set-based deletes
+
+        Items must be deleted with this or Message.delete, which keep the
+        term counts up to date and record DeletedItems, rather than by
+        deleting querysets.
+
+        returns:
+            The ids of the Items that existed, and so were deleted.
+        """
+        with transaction.atomic():
+            ids = list(self.filter(id__in=item_ids).values_list('id', flat=True))
+            TermDailyCount.objects.count_links(
+                self.model.terms.through.objects.filter(message_id__in=ids),
+                -1
+            )
+            self.filter(id__in=ids).delete()
+            DeletedItem.objects.bulk_create(
+                DeletedItem(item_id=id) for id in ids)
+
+        return ids
+
+    def _note_external_modification(self, ids):
+        # The set-based equivalent of Message.note_external_modification
+        self.filter(id__in=ids).update(last_modified=timezone.now())
+
+
 class Message(DataLayerModel):
     body = models.TextField()
-    timestamp = models.DateTimeField(null=True)
+    timestamp = models.DateTimeField(null=True, db_index=True)
     terms = models.ManyToManyField(Term, related_name="items")
-    network_provider = models.CharField(max_length=200, blank=True)
+    network_provider = models.CharField(
+        max_length=200, blank=True, db_index=True)
+
+    objects = MessageManager()
+
+    class Meta:
+        # For paging through items newest first, see
+        # rest_api.pagination.ItemCursorPagination
+        index_together = [('created', 'id')]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        item = super(Message, cls).from_db(db, field_names, values)
+        # Remember the day the Item's terms are counted in, so that
+        # they can be moved if its timestamp changes
+        if 'timestamp' in field_names:
+            item._counted_day = count_day(item.timestamp)
+        return item
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            counted_day = getattr(self, '_counted_day', None)
+            day = count_day(self.timestamp)
+            if hasattr(self, '_counted_day') and counted_day != day:
+                deltas = Counter()
+                for term_id in self.terms.through.objects.filter(
+                        message_id=self.pk).values_list('term_id', flat=True):
+                    deltas[(term_id, counted_day)] -= 1
+                    deltas[(term_id, day)] += 1
+                TermDailyCount.objects.adjust(deltas)
+
+            super(Message, self).save(*args, **kwargs)
+
+        self._counted_day = day
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            TermDailyCount.objects.count_links(
+                self.terms.through.objects.filter(message_id=self.pk), -1)
+            DeletedItem.objects.create(item_id=self.pk)
+            super(Message, self).delete(*args, **kwargs)
 
     def apply_terms(self, terms):
         """ Add or replace values of term.taxonomy for current Item
@@ -53,6 +279,25 @@ class Message(DataLayerModel):
 
         self.terms.add(*terms)
 
+    def apply_term_names(self, taxonomy_slug, names):
+        """ Add or replace the named terms of a taxonomy, as apply_terms
+        does, creating missing terms if the taxonomy's vocabulary is open.
+
+        returns:
+            The terms applied
+
+        throws:
+            Taxonomy.DoesNotExist if there is no taxonomy with the slug
+            Term.DoesNotExist if a named term does not exist in a taxonomy
+            whose vocabulary is not open
+        """
+        taxonomy = Taxonomy.objects.get(slug=taxonomy_slug)
+        terms = [Term.objects.by_taxonomy(taxonomy=taxonomy, name=name)
+                 for name in names]
+
+        self.apply_terms(terms)
+        return terms
+
     def delete_all_terms(self, taxonomy):
         for term in self.terms.filter(taxonomy=taxonomy):
             self.terms.remove(term)
@@ -68,10 +313,132 @@ class Message(DataLayerModel):
 Item = Message
 
 
+class DeletedItem(models.Model):
+    """ A record of the deletion of an Item, so that copies of the Items
+    elsewhere can be kept in sync; see rest_api.views.ItemViewSet.deleted
+    """
+    item_id = models.IntegerField()
+    deleted = models.DateTimeField(auto_now_add=True, db_index=True)
+
+
+def count_day(timestamp):
+    """ Return the day an Item with the given timestamp is counted in by
+    TermDailyCount, in the default time zone, or None without a timestamp.
+    """
+    if timestamp is None:
+        return None
+
+    if settings.USE_TZ:
+        timestamp = timezone.localtime(
+            timestamp, timezone.get_default_timezone())
+
+    return timestamp.date()
+
+
+class TermDailyCountManager(models.Manager):
+
+    def adjust(self, deltas):
+        """ Add to the counts of terms
+
+        args:
+            deltas: dictionary of the number to add (or subtract, if
+                negative) to each count, by (term id, day)
+        """
+        for (term_id, day), delta in deltas.items():
+            if not delta:
+                continue
+
+            counts = self.filter(term_id=term_id, day=day)
+            if counts.update(count=F('count') + delta):
+                continue
+
+            try:
+                with transaction.atomic():
+                    self.create(term_id=term_id, day=day, count=delta)
+            except IntegrityError:
+                # Created by another connection since
+                counts.update(count=F('count') + delta)
+
+    def count_links(self, links, sign=1):
+        """ Add the given links between Items and Terms to the counts, or
+        subtract them if sign is -1.
+
+        args:
+            links: QuerySet of the Item.terms through model
+            sign: 1 or -1
+        """
+        deltas = Counter()
+        for term_id, timestamp in links.values_list(
+                'term_id', 'message__timestamp'):
+            deltas[(term_id, count_day(timestamp))] += sign
+
+        self.adjust(deltas)
+
+    def live_counts(self):
+        """ Count the links between Items and Terms per term and day, from
+        the links themselves.
+
+        The days are those of count_day, as for the counts kept up to date
+        by count_links, rather than truncated by the database, which on
+        MySQL needs its time zone tables loaded.
+
+        returns:
+            A Counter of the counts, by (term id, day)
+        """
+        counts = Counter()
+        links = Item.terms.through.objects.values_list(
+            'term_id', 'message__timestamp')
+        for term_id, timestamp in links.iterator():
+            counts[(term_id, count_day(timestamp))] += 1
+
+        return counts
+
+    def stored_counts(self):
+        """ Return the stored counts, by (term id, day), leaving out zeros """
+        counts = Counter()
+        for term_id, day, count in self.values_list('term_id', 'day', 'count'):
+            counts[(term_id, day)] += count
+
+        return Counter({k: v for k, v in counts.items() if v})
+
+    def rebuild(self):
+        """ Replace the stored counts with the live counts """
+        with transaction.atomic():
+            self.all().delete()
+            self.bulk_create(
+                self.model(term_id=term_id, day=day, count=count)
+                for (term_id, day), count in self.live_counts().items()
+            )
+
+
+class TermDailyCount(models.Model):
+    """ The number of Items with each Term, per day of the Items'
+    timestamp (in the default time zone), or without a timestamp.
+
+    These are kept up to date as terms are added to and removed from
+    Items, and as Items are deleted or their timestamp changes, so that
+    counting the Items of a term does not need to go through all the
+    links between Items and Terms; see rest_api.views.TaxonomyViewSet.
+    The rebuild_term_counts management command recounts them.
+    """
+    term = models.ForeignKey(Term, related_name='daily_counts')
+    day = models.DateField(null=True)
+    count = models.IntegerField(default=0)
+
+    objects = TermDailyCountManager()
+
+    class Meta:
+        unique_together = ('term', 'day')
+
+
 @receiver(models.signals.m2m_changed, sender=Item.terms.through,
           dispatch_uid="data_layer.models.terms_signal_handler")
 def terms_signal_handler(sender, **kwargs):
-    if kwargs.get('action') not in ('post_add', 'post_remove'):
+    action = kwargs.get('action')
+    if action in ('post_add', 'pre_remove', 'pre_clear'):
+        _count_changed_term_links(**kwargs)
+
+    if action not in ('post_add', 'post_remove'):
         return
 
     if kwargs.get('reverse'):
@@ -81,3 +448,19 @@ def terms_signal_handler(sender, **kwargs):
 
     for item in items:
         item.note_external_modification()
+
+
+def _count_changed_term_links(instance, action, reverse, pk_set, **kwargs):
+    # Links are counted after they are added, but before they are removed,
+    # as the ids removed may include some that were not linked
+    if reverse:
+        links = Item.terms.through.objects.filter(term_id=instance.pk)
+        if action != 'pre_clear':
+            links = links.filter(message_id__in=pk_set)
+    else:
+        links = Item.terms.through.objects.filter(message_id=instance.pk)
+        if action != 'pre_clear':
+            links = links.filter(term_id__in=pk_set)
+
+    sign = 1 if action == 'post_add' else -1
+    TermDailyCount.objects.count_links(links, sign)
@@ -0,0 +1,155 @@
+""" Full text search over the bodies of messages.
+
+Each database has its own kind of text index, created by the
+data_layer 0009 migration and kept up to date by the database itself on
+insert, update and delete:
+
+ - MySQL: a FULLTEXT index on the body column;
+ - PostgreSQL: a GIN index on the body's tsvector;
+ - SQLite: an external content FTS5 table, kept in step by triggers.
+
+Other databases have no index, and fall back to a scan of the bodies.
+"""
+from django.db import connection
+
+
+MESSAGE_TABLE = 'data_layer_message'
+SQLITE_FTS_TABLE = 'data_layer_message_fts'
+MYSQL_FTS_INDEX = 'data_layer_message_body_fts'
+POSTGRESQL_FTS_INDEX = 'data_layer_message_body_fts'
+POSTGRESQL_FTS_CONFIG = 'simple'
+
+# The SQL to create and drop the text index, by database vendor
+CREATE_INDEX_SQL = {
+    'mysql': [
+        "ALTER TABLE {table} ADD FULLTEXT INDEX {index} (body)",
+    ],
+    'postgresql': [
+        "CREATE INDEX {index} ON {table} "
+        "USING GIN (to_tsvector('{config}', body))",
+    ],
+    'sqlite': [
+        "CREATE VIRTUAL TABLE {fts} USING fts5("
+        "body, content='{table}', content_rowid='id')",
+        "CREATE TRIGGER {fts}_insert AFTER INSERT ON {table} BEGIN "
+        "INSERT INTO {fts}(rowid, body) VALUES (new.id, new.body); END",
+        "CREATE TRIGGER {fts}_delete AFTER DELETE ON {table} BEGIN "
+        "INSERT INTO {fts}({fts}, rowid, body) "
+        "VALUES ('delete', old.id, old.body); END",
+        "CREATE TRIGGER {fts}_update AFTER UPDATE OF body ON {table} BEGIN "
+        "INSERT INTO {fts}({fts}, rowid, body) "
+        "VALUES ('delete', old.id, old.body); "
+        "INSERT INTO {fts}(rowid, body) VALUES (new.id, new.body); END",
+        # Index the existing messages
+        "INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ],
+}
+
+DROP_INDEX_SQL = {
+    'mysql': [
+        "ALTER TABLE {table} DROP INDEX {index}",
+    ],
+    'postgresql': [
+        "DROP INDEX {index}",
+    ],
+    'sqlite': [
+        "DROP TRIGGER {fts}_insert",
+        "DROP TRIGGER {fts}_delete",
+        "DROP TRIGGER {fts}_update",
+        "DROP TABLE {fts}",
+    ],
+}
+
+
+def _format(sql, vendor):
+    index = {
+        'mysql': MYSQL_FTS_INDEX,
+        'postgresql': POSTGRESQL_FTS_INDEX,
+    }.get(vendor)
+
+    return sql.format(
+        table=MESSAGE_TABLE,
+        fts=SQLITE_FTS_TABLE,
+        index=index,
+        config=POSTGRESQL_FTS_CONFIG,
+    )
+
+
+def create_text_index(schema_editor):
+    """ Create the text index for the schema editor's database """
+    vendor = schema_editor.connection.vendor
+    for sql in CREATE_INDEX_SQL.get(vendor, []):
+        schema_editor.execute(_format(sql, vendor))
+
+
+def drop_text_index(schema_editor):
+    """ Drop the text index of the schema editor's database """
+    vendor = schema_editor.connection.vendor
+    for sql in DROP_INDEX_SQL.get(vendor, []):
+        schema_editor.execute(_format(sql, vendor))
+
+
+def _sqlite_match_query(text):
+    # Quote each word, so that FTS5 query syntax isn't interpreted, and
+    # match any of them, as MySQL's natural language mode does
+    words = text.split()
+    return ' OR '.join('"%s"' % w.replace('"', '""') for w in words)
+
+
+def search(messages, text):
+    """ Filter messages down to those whose body matches the given text,
+    using the database's text index.
+
+    args:
+        messages: QuerySet of messages
+        text: The words to search for. Messages matching any of the
+            words are found, and ranked by how well they match.
+
+    returns:
+        The filtered QuerySet. Its messages have a `search_rank`
+        attribute, which is higher for better matches.
+    """
+    vendor = connection.vendor
+    table = MESSAGE_TABLE
+
+    if vendor == 'mysql':
+        match = 'MATCH ({}.body) AGAINST (%s IN NATURAL LANGUAGE MODE)'.format(
+            table)
+        return messages.extra(
+            select={'search_rank': match},
+            select_params=(text,),
+            where=[match],
+            params=(text,),
+        )
+
+    if vendor == 'postgresql':
+        vector = "to_tsvector('{}', {}.body)".format(
+            POSTGRESQL_FTS_CONFIG, table)
+        query = "plainto_tsquery('{}', %s)".format(POSTGRESQL_FTS_CONFIG)
+        return messages.extra(
+            select={'search_rank': 'ts_rank({}, {})'.format(vector, query)},
+            select_params=(text,),
+            where=['{} @@ {}'.format(vector, query)],
+            params=(text,),
+        )
+
+    if vendor == 'sqlite':
+        match_query = _sqlite_match_query(text)
+        if not match_query:
+            return messages.none()
+
+        # bm25 is lower for better matches
+        fts = SQLITE_FTS_TABLE
+        return messages.extra(
+            select={'search_rank': '-bm25({})'.format(fts)},
+            tables=[fts],
+            where=[
+                '{}.rowid = {}.id'.format(fts, table),
+                '{} MATCH %s'.format(fts),
+            ],
+            params=(match_query,),
+        )
+
+    # No text index on other databases, so scan the bodies
+    return messages.filter(body__icontains=text).extra(
+        select={'search_rank': '0'})
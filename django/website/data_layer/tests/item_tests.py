@@ -7,6 +7,7 @@ from django.utils import timezone
 from factories import ItemFactory
 from ..models import Item
 from taxonomies.exceptions import TermException
+from taxonomies.models import Taxonomy, Term
 from taxonomies.tests.factories import TermFactory, TaxonomyFactory
 
 
@@ -211,3 +212,61 @@ def test_applied_terms_must_be_from_same_taxonomy(item,
 
     expected_message = "Terms cannot be applied from different taxonomies"
     assert excinfo.value.message == expected_message
+
+
+@pytest.mark.django_db
+def test_bulk_create_with_terms_sets_ids_and_links_terms():
+    terms = [TermFactory() for i in range(2)]
+
+    items = Item.objects.bulk_create_with_terms([
+        (Item(body="One"), [terms[0]]),
+        (Item(body="Two"), terms),
+    ])
+
+    assert [Item.objects.get(id=i.id).body for i in items] == ["One", "Two"]
+    assert list(items[0].terms.all()) == [terms[0]]
+    assert set(items[1].terms.all()) == set(terms)
+
+
+@pytest.mark.django_db
+def test_bulk_create_with_terms_survives_items_inserted_concurrently(
+        monkeypatch):
+    term = TermFactory()
+    bulk_create = Item.objects.bulk_create
+
+    def bulk_create_alongside_another_connection(objs, *args, **kwargs):
+        created = bulk_create(objs, *args, **kwargs)
+        # As if another connection inserted it, after our bulk insert
+        Item.objects.create(body="Concurrent")
+        return created
+    monkeypatch.setattr(Item.objects, 'bulk_create',
+                        bulk_create_alongside_another_connection)
+
+    items = Item.objects.bulk_create_with_terms([
+        (Item(body="One"), [term]),
+        (Item(body="Two"), [term]),
+    ])
+
+    assert [Item.objects.get(id=i.id).body for i in items] == ["One", "Two"]
+    assert set(term.items.all()) == set(items)
+    # The bulk insert was rolled back, so nothing is inserted twice
+    assert sorted(Item.objects.filter(body__in=["One", "Two"]).values_list(
+        'body', flat=True)) == ["One", "Two"]
+
+
+@pytest.mark.django_db
+def test_apply_term_names_creates_terms_of_open_taxonomies_only():
+    item = ItemFactory()
+    tags = TaxonomyFactory(vocabulary='open', multiplicity='multiple')
+    categories = TaxonomyFactory(vocabulary='closed')
+
+    terms = item.apply_term_names(tags.slug, ["new", "other"])
+
+    assert set(t.name for t in item.terms.all()) == set(["new", "other"])
+    assert set(terms) == set(item.terms.all())
+
+    with pytest.raises(Term.DoesNotExist):
+        item.apply_term_names(categories.slug, ["unknown"])
+
+    with pytest.raises(Taxonomy.DoesNotExist):
+        item.apply_term_names("unknown-taxonomy", ["new"])
@@ -0,0 +1,174 @@
+from datetime import datetime
+
+import pytest
+import pytz
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test.utils import override_settings
+
+from factories import ItemFactory
+from ..models import Item, TermDailyCount, count_day
+from taxonomies.tests.factories import TermFactory, TaxonomyFactory
+
+
+def assert_counts_are_live():
+    live = TermDailyCount.objects.live_counts()
+    assert TermDailyCount.objects.stored_counts() == live
+
+
+def stored_count(term, item):
+    return TermDailyCount.objects.stored_counts()[
+        (term.id, count_day(item.timestamp))]
+
+
+@pytest.fixture
+def tags():
+    return TaxonomyFactory(multiplicity='multiple')
+
+
+@pytest.fixture
+def terms(tags):
+    return [TermFactory(taxonomy=tags) for i in range(3)]
+
+
+@pytest.fixture
+def items():
+    return [ItemFactory() for i in range(3)]
+
+
+@pytest.mark.django_db
+def test_counts_follow_terms_added_and_removed(terms, items):
+    items[0].terms.add(terms[0], terms[1])
+    items[1].terms.add(terms[0])
+    assert stored_count(terms[0], items[0]) >= 1
+    assert_counts_are_live()
+
+    # Removing terms the item does not have changes nothing
+    items[1].terms.remove(terms[0], terms[2])
+    assert_counts_are_live()
+
+    items[0].terms.clear()
+    assert_counts_are_live()
+
+
+@pytest.mark.django_db
+def test_counts_follow_items_added_and_removed_from_terms(terms, items):
+    terms[0].items.add(items[0], items[1])
+    assert_counts_are_live()
+
+    terms[0].items.remove(items[1])
+    assert_counts_are_live()
+
+    terms[0].items.clear()
+    assert_counts_are_live()
+
+
+@pytest.mark.django_db
+def test_counts_follow_applied_terms():
+    category1, category2 = [TermFactory(taxonomy=TaxonomyFactory())] * 2
+    item = ItemFactory()
+
+    item.apply_terms(category1)
+    item.apply_terms(category2)
+    assert_counts_are_live()
+
+    item.delete_all_terms(category2.taxonomy)
+    assert_counts_are_live()
+
+
+@pytest.mark.django_db
+def test_counts_follow_bulk_term_changes(terms, items):
+    category = TermFactory()
+    ids = [i.id for i in items]
+
+    Item.objects.bulk_apply_terms(ids, terms[:2])
+    Item.objects.bulk_apply_terms(ids[:2], terms[1:])
+    Item.objects.bulk_apply_terms(ids, category)
+    assert_counts_are_live()
+
+    Item.objects.bulk_delete_all_terms(ids[1:], terms[0].taxonomy)
+    assert_counts_are_live()
+
+
+@pytest.mark.django_db
+def test_counts_follow_bulk_created_items(terms):
+    Item.objects.bulk_create_with_terms([
+        (Item(body="One", timestamp=datetime(2015, 8, 1, tzinfo=pytz.utc)),
+         [terms[0], terms[0]]),
+        (Item(body="Two"), [terms[0], terms[1]]),
+    ])
+
+    assert_counts_are_live()
+
+
+@pytest.mark.django_db
+def test_counts_follow_deleted_items(terms, items):
+    for item in items:
+        item.terms.add(*terms)
+
+    items[0].delete()
+    assert_counts_are_live()
+
+    Item.objects.bulk_delete([items[1].id, items[2].id])
+    assert_counts_are_live()
+    assert TermDailyCount.objects.stored_counts() == {}
+
+
+@pytest.mark.django_db
+def test_counts_follow_changed_timestamps(terms):
+    item = ItemFactory(timestamp=None)
+    item.terms.add(terms[0])
+
+    item = Item.objects.get(id=item.id)
+    item.timestamp = datetime(2015, 8, 1, 12, tzinfo=pytz.utc)
+    item.save()
+    assert_counts_are_live()
+
+    item = Item.objects.get(id=item.id)
+    item.timestamp = datetime(2015, 8, 2, 12, tzinfo=pytz.utc)
+    item.save()
+    item.timestamp = None
+    item.save()
+    assert_counts_are_live()
+
+
+@pytest.mark.django_db
+def test_counts_days_in_default_time_zone(terms):
+    with override_settings(TIME_ZONE='Africa/Addis_Ababa'):
+        item = ItemFactory(
+            timestamp=datetime(2015, 8, 1, 22, tzinfo=pytz.utc))
+        item.terms.add(terms[0])
+
+        assert TermDailyCount.objects.stored_counts() == {
+            (terms[0].id, datetime(2015, 8, 2).date()): 1
+        }
+        assert_counts_are_live()
+
+
+@pytest.mark.django_db
+def test_rebuild_term_counts_command_rebuilds_counts(terms, items):
+    items[0].terms.add(terms[0])
+    TermDailyCount.objects.all().update(count=5)
+    TermDailyCount.objects.create(term=terms[1], day=None, count=2)
+
+    with pytest.raises(CommandError):
+        call_command('rebuild_term_counts', check=True, verbosity=0)
+
+    call_command('rebuild_term_counts', verbosity=0)
+
+    assert_counts_are_live()
+    call_command('rebuild_term_counts', check=True, verbosity=0)
+
+
+@pytest.mark.django_db
+def test_live_counts_take_days_in_the_default_time_zone(terms):
+    # Late evening in UTC is the next day in London in summer
+    late = ItemFactory(timestamp=datetime(2015, 6, 1, 23, 30, tzinfo=pytz.utc))
+    untimed = ItemFactory(timestamp=None)
+    late.terms.add(terms[0])
+    untimed.terms.add(terms[0])
+
+    assert TermDailyCount.objects.live_counts() == {
+        (terms[0].id, datetime(2015, 6, 2).date()): 1,
+        (terms[0].id, None): 1,
+    }
@@ -38,6 +38,7 @@ _assets = [
     'hid/js/spinner.js',
     'hid/js/messages.js',
     'hid/js/automatic_file_upload.js',
+    'hid/js/import_job_status.js',
     'js/bootstrap-tagsinput.js',
     'hid/js/select_all_checkbox.js'
 ]
@@ -0,0 +1,46 @@
+/**
+ * Poll the status of a spreadsheet import, and show its progress until
+ * it finishes.
+ *
+ * Usage:
+ * - The element should have an 'import-job' class, a 'data-status-url'
+ *   attribute with the url of the import's status, and a 'data-finished'
+ *   attribute that is 'true' if the import has already finished;
+ * - The progress is shown in its descendants with the 'import-job-status',
+ *   'import-job-rows-processed', 'import-job-rows-failed',
+ *   'import-job-items-saved', 'import-job-date-fallbacks',
+ *   'import-job-rows-per-second' and 'import-job-summary' classes.
+ */
+(function($){
+    var POLL_INTERVAL = 2000;
+
+    function poll($job) {
+        $.getJSON($job.data('status-url'), function(status) {
+            $('.import-job-status', $job).text(status.status_display);
+            $('.import-job-rows-processed', $job).text(status.rows_processed);
+            $('.import-job-rows-failed', $job).text(status.rows_failed);
+            $('.import-job-items-saved', $job).text(status.items_saved);
+            $('.import-job-date-fallbacks', $job).text(status.date_fallbacks);
+            if (status.rows_per_second !== null) {
+                $('.import-job-rows-per-second', $job).text(status.rows_per_second);
+            }
+
+            if (status.finished) {
+                $('.import-job-summary', $job)
+                    .text(status.summary)
+                    .toggleClass('text-danger', status.status === 'failed');
+            } else {
+                setTimeout(function() { poll($job); }, POLL_INTERVAL);
+            }
+        });
+    }
+
+    $(document).ready(function() {
+        $('.import-job').each(function() {
+            var $job = $(this);
+            if ($job.data('finished') !== true) {
+                setTimeout(function() { poll($job); }, POLL_INTERVAL);
+            }
+        });
+    });
+})(jQuery);
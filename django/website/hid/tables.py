@@ -2,6 +2,119 @@ import django_tables2 as tables
 from django.conf import settings
 from django.template import loader
 from django.utils.translation import ugettext_lazy as _
+from django_tables2.tables import TableData
+from django_tables2.utils import OrderBy
+
+from hid.constants import ITEM_TYPE_CATEGORY
+import transport
+
+# How ItemTable and the item list API order items by default
+DEFAULT_ITEM_ORDERING = ('-created',)
+
+# The item list API's ordering fields for ItemTable columns, where they
+# differ from the column names
+ITEM_ORDERING_FIELDS = {
+    'category': 'terms:' + ITEM_TYPE_CATEGORY['question'],
+}
+
+# The item fields ItemTable columns render, where they differ from the
+# column names
+ITEM_COLUMN_FIELDS = {
+    'select_item': 'id',
+    'category': 'terms',
+}
+
+
+class PagedItemList(object):
+    """ The items matching the given transport filters, fetched one slice
+        at a time as they are accessed, rather than all at once.
+
+        This is what ItemTable expects to be given when it is paginated,
+        so that only the visible page of items is fetched, in the order
+        the table is sorted in.
+    """
+    verbose_name = _('item')
+    verbose_name_plural = _('items')
+
+    def __init__(self, **filters):
+        self.filters = filters
+        self.ordering = None
+        self._count = None
+
+    def order_by(self, fields):
+        """ Have the API order the items by the given fields
+
+            Args:
+                fields (list of str): Item list API ordering fields,
+                    optionally prefixed with '-' for descending order
+        """
+        self.ordering = ','.join(fields) or None
+
+    def _list(self, **kwargs):
+        if self.ordering:
+            kwargs['ordering'] = self.ordering
+        kwargs.update(self.filters)
+
+        return transport.items.list(**kwargs)
+
+    def _fetch(self, offset, limit):
+        page = self._list(offset=offset, limit=limit)
+        self._count = page['count']
+        return page['results']
+
+    def __len__(self):
+        if self._count is None:
+            self._fetch(0, 0)
+
+        return self._count
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.start or 0, key.stop, key.step or 1
+            if start < 0 or stop is None or stop < 0:
+                # Relative to the end, so we need the count first
+                start, stop, step = key.indices(len(self))
+            if step != 1:
+                return list(self)[key]
+            if stop <= start:
+                return []
+
+            return self._fetch(start, stop - start)
+
+        if key < 0:
+            key += len(self)
+        items = self._fetch(key, 1) if key >= 0 else []
+        if not items:
+            raise IndexError('item index out of range')
+
+        return items[0]
+
+    def __iter__(self):
+        return iter(self._list())
+
+
+class ItemTableData(TableData):
+    """ Table data that keeps a PagedItemList lazy, rather than turning
+        it into a list of all the items, and has the API sort it.
+    """
+    def __init__(self, data, table):
+        if isinstance(data, PagedItemList):
+            self.table = table
+            self.list = data
+        else:
+            super(ItemTableData, self).__init__(data, table)
+
+    def order_by(self, aliases):
+        if not isinstance(self.data, PagedItemList):
+            return super(ItemTableData, self).order_by(aliases)
+
+        fields = []
+        for alias in (OrderBy(a) for a in aliases):
+            prefix = '-' if alias.is_descending else ''
+            fields.append(
+                prefix + ITEM_ORDERING_FIELDS.get(alias.bare, alias.bare))
+
+        self.list.order_by(fields)
 
 
 class NamedCheckBoxColumn(tables.CheckBoxColumn):
@@ -11,10 +124,12 @@ class NamedCheckBoxColumn(tables.CheckBoxColumn):
 
 
 class ItemTable(tables.Table):
+    TableDataClass = ItemTableData
+
     class Meta:
         attrs = {'class': 'table table-bordered table-hover table-striped'}
         template = 'hid/table.html'
-        order_by = ('-created',)
+        order_by = DEFAULT_ITEM_ORDERING
 
     select_item = tables.TemplateColumn(
         template_name='hid/select_item_id_checkbox_column.html',
@@ -45,6 +160,19 @@ class ItemTable(tables.Table):
         self.categories = kwargs.pop('categories')
         super(ItemTable, self).__init__(*args, **kwargs)
 
+    @classmethod
+    def get_item_fields(cls, exclude=()):
+        """ Return the item fields that the table's columns render, so
+            that only those need be fetched.
+
+            Args:
+                - exclude: Names of the columns that will be excluded
+            Returns:
+                List of item field names
+        """
+        return [ITEM_COLUMN_FIELDS.get(name, name)
+                for name in cls.base_columns if name not in exclude]
+
     def render_category(self, record, value):
         Template = loader.get_template('hid/categories_column.html')
         selected = []
@@ -10,7 +10,7 @@ from django.utils.translation import ungettext
 from hid.assets import require_assets
 from hid.constants import ITEM_TYPE_CATEGORY
 from hid.forms.upload import UploadForm
-from hid.tables import ItemTable
+from hid.tables import ItemTable, PagedItemList
 import transport
 from transport.exceptions import TransportException
 
@@ -29,7 +29,9 @@ class ViewAndEditTableTab(object):
         Settings:
             label (str): Label for the table data type
             filters (dict): Filters to pass to the term
-                list API
+                list API. Date ranges may be relative to the
+                current time, eg. {"created_after": "now-7d"}
+                lists the items imported in the last week.
             categories (list of str): List of taxonomy slugs
                 which indiciate the taxonomies the items
                 in this view can be categorized by.
@@ -38,6 +40,8 @@ class ViewAndEditTableTab(object):
                 missing, all columns are displayed.
             per_page (int): Number of items to display per
                 page. Defaults to 25.
+            body_length (int): If present, only this many
+                characters of the items' bodies are displayed.
 
     """
     template_name = 'hid/tabs/view_and_edit_table.html'
@@ -64,20 +68,35 @@ class ViewAndEditTableTab(object):
             )
         }
 
-    def _get_items(self, **kwargs):
+    def _get_items(self, query=None, **kwargs):
         """ Given the tab settings, return the list of items
             to include in the page
 
             Args:
+                query (str): If present, only items whose body
+                    matches these words are listed, best
+                    matches first unless sorted otherwise.
                 **kwargs (dict): Tab settings. If present
                     kwargs['filters'] is expected to be
                     a dictionary of filters that is passed
-                    on to the transport API.
+                    on to the transport API. Only the fields
+                    of the columns displayed are fetched.
             Reruns:
-                QuerySet: The items to list on the page
+                PagedItemList: The items to list on the page, which
+                    are only fetched a page at a time
         """
         filters = kwargs.get('filters', {})
-        return transport.items.list(**filters)
+        fields = ItemTable.get_item_fields(
+            exclude=self._get_columns_to_exclude(**kwargs))
+
+        body_length = kwargs.get('body_length', None)
+        if body_length:
+            filters = dict(filters, body_length=body_length)
+
+        if query:
+            filters = dict(filters, q=query)
+
+        return PagedItemList(fields=fields, **filters)
 
     def _get_columns_to_exclude(self, **kwargs):
         """ Given the tab settings, return the columns to exclude
@@ -169,9 +188,10 @@ class ViewAndEditTableTab(object):
 
     def get_context_data(self, tab_instance, request, **kwargs):
         question_types = self._get_category_options(**kwargs)
+        search_query = request.GET.get('q', '').strip()
         # Build the table
         table = ItemTable(
-            self._get_items(**kwargs),
+            self._get_items(query=search_query, **kwargs),
             categories=question_types,
             exclude=self._get_columns_to_exclude(**kwargs),
             orderable=True,
@@ -197,6 +217,7 @@ class ViewAndEditTableTab(object):
             'add_button_for': self._get_item_type_filter(kwargs),
             'type_label': kwargs.get('label', '?'),
             'table': table,
+            'search_query': search_query,
             'upload_form': upload_form,
             'actions': actions,
             'has_categories': len(question_types) > 0,
@@ -364,8 +385,7 @@ def _delete_items(request, deleted):
             items (list of int): List of items to delete
     """
     try:
-        transport.items.bulk_delete(deleted)
-        num_deleted = len(deleted)
+        num_deleted = transport.items.bulk_delete(deleted)['count']
         msg = ungettext("%d item deleted.",
                         "%d items deleted.",
                         num_deleted) % num_deleted
@@ -379,36 +399,45 @@ def _add_items_categories(request, items):
     """ Add the given category to the given items,
         and set a success/failure on the request
 
+        Items that get the same category are updated
+        together, in a single call.
+
         Args:
             request (Request): Current request object
             items (list of (item id, taxonomy_slug, term_name)):
                 tupples to update.
     """
+    item_ids_by_category = OrderedDict()
+    for item_id, taxonomy_slug, term_name in items:
+        item_ids_by_category.setdefault(
+            (taxonomy_slug, term_name), []
+        ).append(item_id)
+
     success = 0
     failed = 0
-    for item_id, taxonomy_slug, term_name in items:
+    for (taxonomy_slug, term_name), item_ids in item_ids_by_category.items():
         try:
             if term_name:
-                transport.items.add_terms(
-                    item_id,
+                transport.items.bulk_add_terms(
+                    item_ids,
                     taxonomy_slug,
                     term_name
                 )
             else:
-                transport.items.delete_all_terms(
-                    item_id,
+                transport.items.bulk_delete_all_terms(
+                    item_ids,
                     taxonomy_slug
                 )
-            success += 1
+            success += len(item_ids)
         except TransportException:
-            failed += 1
+            failed += len(item_ids)
     if success > 0:
         msg = ungettext("Updated %d item.",
                         "Updated %d items.",
-                        len(items)) % len(items)
+                        success) % success
         messages.success(request, msg)
     if failed > 0:
         msg = ungettext("Failed to update %d item.",
                         "Failed to update %d items.",
-                        len(items)) % len(items)
-        messages.success(request, msg)
+                        failed) % failed
+        messages.error(request, msg)
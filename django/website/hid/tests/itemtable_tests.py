@@ -1,7 +1,9 @@
 import mock
+import pytest
 
-
-from hid.tables import ItemTable
+from data_layer.tests.factories import ItemFactory
+from hid.tables import ItemTable, PagedItemList
+import transport
 
 
 def test_get_selected_returns_empty_list_on_empty_selection():
@@ -62,3 +64,65 @@ def test_get_row_select_values_does_not_remove_empty():
     ]
     actual = ItemTable.get_row_select_values(post_params, 'category')
     assert sorted(expected) == sorted(actual)  # Order is not important
+
+
+@pytest.mark.django_db
+def test_paged_item_list_fetches_only_the_requested_slice():
+    items = [ItemFactory() for i in range(5)]
+    paged_items = PagedItemList()
+
+    with mock.patch('transport.items.list',
+                    wraps=transport.items.list) as list_items:
+        page = paged_items[1:3]
+
+    list_items.assert_called_once_with(offset=1, limit=2)
+    assert [i['id'] for i in page] == [items[3].id, items[2].id]
+    assert len(paged_items) == 5
+
+
+@pytest.mark.django_db
+def test_paged_item_list_passes_on_filters():
+    ItemFactory(body="one")
+    ItemFactory(body="two")
+
+    paged_items = PagedItemList(body="two")
+
+    assert len(paged_items) == 1
+    assert [i['body'] for i in paged_items] == ["two"]
+
+
+@pytest.mark.django_db
+def test_item_table_paginates_paged_item_list():
+    items = [ItemFactory() for i in range(5)]
+
+    table = ItemTable(PagedItemList(), categories=[])
+    table.paginate(per_page=2, page=2)
+
+    assert table.paginator.count == 5
+    assert [r.record['id'] for r in table.page.object_list] == \
+        [items[2].id, items[1].id]
+
+
+@pytest.mark.django_db
+def test_item_table_has_api_sort_paged_item_list():
+    ItemFactory(body="b")
+    ItemFactory(body="a")
+    ItemFactory(body="c")
+    paged_items = PagedItemList()
+
+    table = ItemTable(paged_items, categories=[], order_by='-body')
+    with mock.patch('transport.items.list',
+                    wraps=transport.items.list) as list_items:
+        table.paginate(per_page=2, page=1)
+        bodies = [r.record['body'] for r in table.page.object_list]
+
+    assert bodies == ["c", "b"]
+    for call in list_items.call_args_list:
+        assert call[1]['ordering'] == '-body'
+
+
+def test_get_item_fields_returns_fields_of_included_columns():
+    fields = ItemTable.get_item_fields(exclude=['category', 'created'])
+
+    assert set(fields) == set(
+        ['id', 'timestamp', 'body', 'network_provider'])
@@ -23,43 +23,37 @@ class TestTableWidget(TestCase):
         widget = TableWidget()
         with patch('hid.widgets.table.transport.items.list') as mock:
             widget.get_context_data(filters={'a': 'b'})
-            self.assertEquals(mock.call_args[1], {'a': 'b'})
+            self.assertEquals(mock.call_args[1]['a'], 'b')
+            self.assertEquals(mock.call_args[1]['limit'], 10)
 
-    def test_get_context_data_limits_rows_as_per_settings(self):
+    def test_get_context_data_fetches_only_displayed_fields(self):
         widget = TableWidget()
         with patch('hid.widgets.table.transport.items.list') as mock:
-            mock.return_value = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
-            with patch('hid.widgets.table.ItemTable') as mock_table:
-                widget.get_context_data(count=3)
-                processed_rows = mock_table.call_args[0][0]
-                self.assertEqual(len(processed_rows), 3)
+            widget.get_context_data(body_length=50)
+            self.assertEqual(set(mock.call_args[1]['fields']),
+                             set(['created', 'timestamp', 'body']))
+            self.assertEqual(mock.call_args[1]['body_length'], 50)
 
-    def test_get_context_data_orders_rows_as_per_settings(self):
+    def test_get_context_data_limits_rows_as_per_settings(self):
         widget = TableWidget()
         with patch('hid.widgets.table.transport.items.list') as mock:
-            mock.return_value = [{'a': 1}, {'a': 4}, {'a': 2}]
+            mock.return_value = {'count': 10, 'results': [1, 2, 3]}
             with patch('hid.widgets.table.ItemTable') as mock_table:
-                widget.get_context_data(order_by='a')
+                widget.get_context_data(count=3)
+                self.assertEqual(mock.call_args[1]['limit'], 3)
                 processed_rows = mock_table.call_args[0][0]
-                self.assertEqual(processed_rows, [
-                    {'a': 1}, {'a': 2}, {'a': 4}
-                ])
+                self.assertEqual(processed_rows, [1, 2, 3])
 
-    def test_get_context_data_orders_row_reverse_as_per_settings(self):
+    def test_get_context_data_orders_rows_as_per_settings(self):
         widget = TableWidget()
         with patch('hid.widgets.table.transport.items.list') as mock:
-            mock.return_value = [{'a': 1}, {'a': 4}, {'a': 2}]
-            with patch('hid.widgets.table.ItemTable') as mock_table:
-                widget.get_context_data(order_by='-a')
-                processed_rows = mock_table.call_args[0][0]
-                self.assertEqual(processed_rows, [
-                    {'a': 4}, {'a': 2}, {'a': 1}
-                ])
+            widget.get_context_data(order_by='-a')
+            self.assertEqual(mock.call_args[1]['ordering'], '-a')
 
     def test_get_context_data_table_excludes_fields(self):
         widget = TableWidget()
         with patch('hid.widgets.table.transport.items.list') as mock:
-            mock.return_value = []
+            mock.return_value = {'count': 0, 'results': []}
             with patch('hid.widgets.table.ItemTable') as mock_table:
                 widget.get_context_data()
                 excludes = mock_table.call_args[1]['exclude']
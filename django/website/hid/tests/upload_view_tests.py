@@ -1,8 +1,19 @@
+from datetime import timedelta
+import json
 from mock import Mock
+import pytest
 
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.core.urlresolvers import reverse
+from django.test import RequestFactory
+from django.utils import timezone
+from django.utils.http import urlencode
 
-from ..views.upload_spreadsheet import UploadSpreadsheetView
+from chn_spreadsheet.models import ImportJob
+from ..views.upload_spreadsheet import (
+    ImportJobView, UploadSpreadsheetView, import_job_status
+)
+from .views_tests import fix_messages
 
 
 def test_redirects_to_next_url_after_upload():
@@ -15,3 +26,101 @@ def test_redirects_to_next_url_after_upload():
     url = view.get_success_url()
 
     assert url == next_url
+
+
+@pytest.mark.django_db
+def test_upload_queues_import_and_redirects_to_its_page(settings, tmpdir):
+    settings.MEDIA_ROOT = str(tmpdir)
+    next_url = reverse('tabbed-page',
+                       kwargs={'name': 'main', 'tab_name': 'rumors'})
+    request = fix_messages(RequestFactory().post('/', {
+        'source': 'geopoll',
+        'next': next_url,
+        'file': SimpleUploadedFile('sample.xlsx', 'not read yet'),
+    }))
+
+    response = UploadSpreadsheetView.as_view()(request)
+
+    [job] = ImportJob.objects.all()
+    assert job.status == ImportJob.QUEUED
+    assert job.source == 'geopoll'
+    assert response.status_code == 302
+    job_url = reverse('sources-upload-job', kwargs={'job_id': job.id})
+    assert response.url == '%s?%s' % (job_url, urlencode({'next': next_url}))
+
+
+@pytest.mark.django_db
+def test_import_job_status_reports_progress():
+    job = ImportJob.objects.create(
+        source='geopoll', status=ImportJob.RUNNING,
+        started=timezone.now() - timedelta(seconds=10),
+        rows_processed=500, items_saved=400)
+
+    response = import_job_status(RequestFactory().get('/'), job.id)
+
+    status = json.loads(response.content)
+    assert status['status'] == ImportJob.RUNNING
+    assert not status['finished']
+    assert status['rows_processed'] == 500
+    assert status['items_saved'] == 400
+    assert 0 < status['rows_per_second'] <= 50
+    assert status['summary'] is None
+
+
+@pytest.mark.django_db
+def test_import_job_status_summarizes_finished_import():
+    now = timezone.now()
+    job = ImportJob.objects.create(
+        source='geopoll', status=ImportJob.SUCCEEDED, started=now,
+        finished=now + timedelta(seconds=2),
+        rows_processed=3, items_saved=3)
+
+    response = import_job_status(RequestFactory().get('/'), job.id)
+
+    status = json.loads(response.content)
+    assert status['finished']
+    assert status['rows_per_second'] == 1.5
+    assert status['summary'] == "Upload successful! 3 entries have been added."
+
+
+@pytest.mark.django_db
+def test_import_job_page_sends_unsafe_next_urls_to_the_dashboard():
+    job = ImportJob.objects.create(source='geopoll')
+    view = ImportJobView()
+    view.object = job
+
+    for next_url in ('javascript:alert(1)', 'http://example.com/',
+                     '//example.com/'):
+        view.request = RequestFactory().get('/', {'next': next_url})
+
+        assert view.get_context_data()['next'] == reverse('dashboard')
+
+
+@pytest.mark.django_db
+def test_import_job_page_shows_job_and_next_url():
+    job = ImportJob.objects.create(source='geopoll')
+    view = ImportJobView()
+    view.request = RequestFactory().get('/', {'next': '/back/'})
+    view.object = job
+
+    context = view.get_context_data()
+
+    assert context['job'] == job
+    assert context['next'] == '/back/'
+    assert context['summary'] is None
+
+
+@pytest.mark.django_db
+def test_import_job_status_reports_dates_not_matching_the_format():
+    now = timezone.now()
+    job = ImportJob.objects.create(
+        source='geopoll', status=ImportJob.SUCCEEDED, started=now,
+        finished=now, rows_processed=3, items_saved=3, date_fallbacks=2)
+
+    response = import_job_status(RequestFactory().get('/'), job.id)
+
+    status = json.loads(response.content)
+    assert status['date_fallbacks'] == 2
+    assert status['summary'] == (
+        "Upload successful! 3 entries have been added. "
+        "2 dates did not match the source's date format.")
@@ -1,4 +1,4 @@
-from mock import Mock
+from mock import Mock, patch
 import pytest
 
 from django.contrib.messages.storage.fallback import FallbackStorage
@@ -369,3 +369,57 @@ def test_view_and_edit_table_tab_sets_add_button_context():
         'name': test_item_type.name,
         'long_name': test_item_type.long_name
     }
+
+
+@pytest.mark.django_db
+def test_view_and_edit_table_tab_fetches_only_the_visible_page():
+    for i in range(3):
+        transport.items.create({'body': "Message %d" % i})
+    page = TabbedPageFactory()
+    tab_instance = TabInstanceFactory(page=page)
+    request = Mock(GET={'page': 2})
+    tab = ViewAndEditTableTab()
+
+    with patch('transport.items.list', wraps=transport.items.list) as list_items:
+        context_data = tab.get_context_data(
+            tab_instance, request, per_page=2)
+
+        bodies = [row.record['body']
+                  for row in context_data['table'].page.object_list]
+
+    assert bodies == ["Message 0"]
+    for call in list_items.call_args_list:
+        assert call[1]['limit'] <= 2
+
+
+@pytest.mark.django_db
+def test_view_and_edit_table_tab_filters_on_relative_date_range():
+    transport.items.create({'body': "Recent message"})
+    page = TabbedPageFactory()
+    tab_instance = TabInstanceFactory(page=page)
+    request = Mock(GET={})
+    tab = ViewAndEditTableTab()
+
+    context_data = tab.get_context_data(
+        tab_instance, request, filters={'created_after': 'now-7d'})
+    assert len(context_data['table'].rows) == 1
+
+    context_data = tab.get_context_data(
+        tab_instance, request, filters={'created_before': 'now-7d'})
+    assert len(context_data['table'].rows) == 0
+
+
+@pytest.mark.django_db(transaction=True)
+def test_view_and_edit_table_tab_searches_items():
+    transport.items.create({'body': "Where is the clinic"})
+    transport.items.create({'body': "The water is dirty"})
+    page = TabbedPageFactory()
+    tab_instance = TabInstanceFactory(page=page)
+    request = Mock(GET={'q': 'clinic'})
+    tab = ViewAndEditTableTab()
+
+    context_data = tab.get_context_data(tab_instance, request)
+
+    assert context_data['search_query'] == 'clinic'
+    bodies = [row.record['body'] for row in context_data['table'].rows]
+    assert bodies == ["Where is the clinic"]
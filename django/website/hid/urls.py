@@ -3,7 +3,9 @@ from django.contrib.auth.decorators import login_required
 
 from dashboard.views import DashboardView
 
-from .views.upload_spreadsheet import UploadSpreadsheetView
+from .views.upload_spreadsheet import (
+    ImportJobView, UploadSpreadsheetView, import_job_status
+)
 from .views.list_sources import ListSources
 from .views.item import AddEditItemView
 
@@ -11,6 +13,8 @@ from hid.tabs.view_and_edit_table import view_and_edit_table_form_process_items
 
 urlpatterns = patterns('',
     url(r'^sources/upload/$', login_required(UploadSpreadsheetView.as_view()), name='sources-upload'),
+    url(r'^sources/upload/(?P<job_id>\d+)/$', login_required(ImportJobView.as_view()), name='sources-upload-job'),
+    url(r'^sources/upload/(?P<job_id>\d+)/status/$', login_required(import_job_status), name='sources-upload-status'),
     url(r'^sources/(?P<label>\w+)/$', login_required(ListSources.as_view()), name='sources-edit'),
     url(r'^sources/$', login_required(ListSources.as_view()), name='sources'),
     url(r'^process-items/$', login_required(view_and_edit_table_form_process_items), name="data-view-process"),
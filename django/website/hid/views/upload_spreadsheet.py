@@ -1,34 +1,104 @@
 from django.contrib import messages
-from django.http import HttpResponseRedirect
-from django.utils.translation import ungettext
-from django.views.generic import FormView
+from django.core.urlresolvers import reverse
+from django.http import HttpResponseRedirect, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.utils.http import is_safe_url, urlencode
+from django.utils.translation import ugettext as _, ungettext
+from django.views.generic import DetailView, FormView
 
-from chn_spreadsheet.importer import Importer, SheetImportException
+from chn_spreadsheet.jobs import queue_import
+from chn_spreadsheet.models import ImportJob
+from hid.assets import require_assets
 from ..forms.upload import UploadForm
 
 
+def get_next_url(request, url):
+    """ Return the url to send the user back to, if it is on this site, or
+    else the dashboard, so that links can't send users elsewhere or run
+    javascript.
+    """
+    if url and is_safe_url(url, host=request.get_host()):
+        return url
+    return reverse('dashboard')
+
+
 class UploadSpreadsheetView(FormView):
+    """ Queue an uploaded spreadsheet for import, and send the user to the
+    import's page, which polls for its progress; the import itself is run
+    by the run_import_worker command.
+    """
     form_class = UploadForm
     template_name = "hid/upload.html"
 
     def get_success_url(self):
-        return self.request.POST.get('next')
+        return get_next_url(self.request, self.request.POST.get('next'))
 
     def form_valid(self, form):
         data = form.cleaned_data
-        source = data['source']
-        uploaded_file = data['file']
+        job = queue_import(data['source'], data['file'])
+
+        messages.info(self.request, _("Upload received, importing..."))
 
-        try:
-            importer = Importer()
-            saved = importer.store_spreadsheet(source, uploaded_file)
-            msg = ungettext("Upload successful! %d entry has been added.",
+        url = reverse('sources-upload-job', kwargs={'job_id': job.id})
+        return HttpResponseRedirect(
+            '%s?%s' % (url, urlencode({'next': self.get_success_url()})))
+
+
+def get_job_summary(job):
+    """ Return a message summarizing the outcome of a finished job, or None
+    if it isn't finished
+    """
+    if job.status == ImportJob.SUCCEEDED:
+        summary = ungettext("Upload successful! %d entry has been added.",
                             "Upload successful! %d entries have been added.",
-                            saved) % saved
+                            job.items_saved) % job.items_saved
+        if job.date_fallbacks:
+            summary += ' ' + ungettext(
+                "%d date did not match the source's date format.",
+                "%d dates did not match the source's date format.",
+                job.date_fallbacks) % job.date_fallbacks
+        return summary
+
+    if job.status == ImportJob.FAILED:
+        return job.error
+
+    return None
+
+
+class ImportJobView(DetailView):
+    """ Show the progress of an import, polling import_job_status """
+    model = ImportJob
+    pk_url_kwarg = 'job_id'
+    context_object_name = 'job'
+    template_name = "hid/upload_job.html"
+
+    def get_context_data(self, **kwargs):
+        require_assets('hid/js/import_job_status.js')
+        context = super(ImportJobView, self).get_context_data(**kwargs)
+        context['next'] = get_next_url(
+            self.request, self.request.GET.get('next'))
+        context['summary'] = get_job_summary(self.object)
+        return context
+
+
+def import_job_status(request, job_id):
+    """ Return the progress of an import as JSON, for its page to poll.
 
-            messages.success(self.request, msg)
-        except SheetImportException as exc:
-            msg = exc.message
-            messages.error(self.request, msg)
+    This is polled every few seconds while the import runs, so it reads
+    only the job.
+    """
+    job = get_object_or_404(ImportJob, id=job_id)
+    rows_per_second = job.rows_per_second
 
-        return HttpResponseRedirect(self.get_success_url())
+    return JsonResponse({
+        'status': job.status,
+        'status_display': unicode(job.get_status_display()),
+        'finished': job.is_finished,
+        'rows_processed': job.rows_processed,
+        'rows_failed': job.rows_failed,
+        'items_saved': job.items_saved,
+        'date_fallbacks': job.date_fallbacks,
+        'rows_per_second': (round(rows_per_second, 1)
+                            if rows_per_second is not None else None),
+        'summary': get_job_summary(job),
+    })
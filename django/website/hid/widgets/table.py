@@ -3,18 +3,16 @@ from hid.tables import ItemTable
 
 
 class TableWidget(object):
-    """ A table widget.
-
-        Eventually this should pull the table rows through the
-        data API. For now we pass these in via the settings.
+    """ A table widget, listing the first items matching some filters.
 
         Settings:
             title: Title of the table
-            headers: Row of headers
-            rows: Rows of data (list of lists)
-            html: Set to true to indicate that the
-                  headers and data contain html
-                  and should not be escaped
+            filters: Filters to pass to the item list API
+            count: Number of items to list. Defaults to 10.
+            order_by: Item list API ordering, eg. '-timestamp'.
+                Defaults to the newest items first.
+            body_length: If set, only this many characters of the
+                items' bodies are displayed.
     """
     template_name = 'hid/widgets/table.html'
 
@@ -24,23 +22,27 @@ class TableWidget(object):
         filters = kwargs.get('filters', {})
         count = kwargs.get('count', 10)
         order_by = kwargs.get('order_by', None)
+        body_length = kwargs.get('body_length', None)
+
+        exclude = ('category', 'select_item', 'network_provider')
 
-        # Fetch items. Eventually sorting & limiting
-        # number of items will be sorted by the API.
-        items = transport.items.list(**filters)
+        # Fetch only the items and fields to show, sorted by the API
         if order_by:
-            if order_by.startswith('-'):
-                items.sort(key=lambda e: e[order_by[1:]], reverse=True)
-            else:
-                items.sort(key=lambda e: e[order_by])
-        items = items[0:count]
+            filters = dict(filters, ordering=order_by)
+        if body_length:
+            filters = dict(filters, body_length=body_length)
+        items = transport.items.list(
+            limit=count,
+            fields=ItemTable.get_item_fields(exclude=exclude),
+            **filters
+        )['results']
 
         # Prepare table object
         table = ItemTable(
             items,
             categories=[],
             orderable=False,
-            exclude=('category', 'select_item', 'network_provider')
+            exclude=exclude
         )
 
         # And return context
@@ -0,0 +1,133 @@
+from calendar import timegm
+from functools import wraps
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.http import http_date, parse_http_date_safe
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def items_state(items):
+    """ Return the state of the given items that their representations
+    depend on: when the last of them was modified, and how many there are,
+    so that deletes are noticed too.
+
+    args:
+        items: QuerySet of items
+
+    returns:
+        A (last modified datetime or None, count) pair
+    """
+    aggregate = items.order_by().aggregate(
+        last_modified=Max('last_modified'),
+        count=Count('id'),
+    )
+    return (aggregate['last_modified'], aggregate['count'])
+
+
+def terms_state(terms):
+    """ Return the state of the given terms that representations naming
+    them depend on, as terms have no modification time of their own.
+
+    Only the ETag carries this state, so clients that send only
+    If-Modified-Since are not told of renamed terms.
+
+    args:
+        terms: QuerySet of terms
+
+    returns:
+        A digest of the terms' ids, names and long names
+    """
+    digest = hashlib.md5()
+    for row in terms.order_by('id').values_list('id', 'name', 'long_name'):
+        digest.update('|'.join(unicode(v) for v in row).encode('utf-8'))
+        digest.update('\n')
+    return digest.hexdigest()
+
+
+def get_validators(request, last_modified, *state):
+    """ Return the ETag and Last-Modified validators of a response to a
+    get request
+
+    args:
+        request: The request
+        last_modified: When what the response represents was last
+            modified, or None if unknown
+        *state: Anything else the response depends on, eg. a count
+
+    returns:
+        An (etag, last modified timestamp or None) pair
+    """
+    # Representations differ by action, query string and format
+    parts = [request.path, request.GET.urlencode(),
+             request.accepted_media_type, last_modified]
+    parts.extend(state)
+    digest = hashlib.md5(
+        '|'.join(unicode(p) for p in parts).encode('utf-8')).hexdigest()
+
+    timestamp = None
+    if last_modified is not None:
+        timestamp = timegm(last_modified.utctimetuple())
+
+    return '"%s"' % digest, timestamp
+
+
+def is_not_modified(request, etag, timestamp):
+    """ Return whether the client's copy of the response, as given by the
+    If-None-Match or If-Modified-Since header of the request, is current.
+
+    If-None-Match takes precedence, as If-Modified-Since cannot tell of
+    deletes of anything but the most recently modified.
+    """
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match is not None:
+        etags = [e.strip() for e in if_none_match.split(',')]
+        return etag in etags or '*' in etags
+
+    if_modified_since = parse_http_date_safe(
+        request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+    if if_modified_since is not None and timestamp is not None:
+        return timestamp <= if_modified_since
+
+    return False
+
+
+def conditional(get_state):
+    """ Decorate a view set action so that it answers conditional get
+    requests, with ETag and Last-Modified headers, and a 304 Not Modified
+    response if the client's copy is current.
+
+    args:
+        get_state: Name of the view set method, called with the action's
+            arguments, that returns the state the response depends on;
+            see get_validators. The validators are checked before the
+            action is run, so this should be much cheaper than the action.
+            If it returns None, the action is run unconditionally.
+    """
+    def decorator(action):
+        @wraps(action)
+        def wrapper(self, request, *args, **kwargs):
+            state = getattr(self, get_state)(request, *args, **kwargs)
+            if state is None:
+                return action(self, request, *args, **kwargs)
+
+            etag, timestamp = get_validators(request, *state)
+            if is_not_modified(request, etag, timestamp):
+                response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            else:
+                response = action(self, request, *args, **kwargs)
+
+            if response.status_code in (status.HTTP_200_OK,
+                                        status.HTTP_304_NOT_MODIFIED):
+                response['ETag'] = etag
+                if timestamp is not None:
+                    response['Last-Modified'] = http_date(timestamp)
+
+            return response
+
+        # For callers that are not answering requests, eg. DirectBackend
+        wrapper.unconditional = action
+        return wrapper
+    return decorator
+
@@ -0,0 +1,72 @@
+from datetime import datetime, timedelta
+import re
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+
+RELATIVE_DATE_RE = re.compile(r'^now(?:([+-])(\d+)([smhdw]))?$')
+
+RELATIVE_DATE_UNITS = {
+    's': 'seconds',
+    'm': 'minutes',
+    'h': 'hours',
+    'd': 'days',
+    'w': 'weeks',
+}
+
+
+def parse_date_filter(value, now=None):
+    """ Parse the value of a date range filter.
+
+    args:
+        value: An ISO 8601 date or date and time, or a date relative to
+            the current time such as "now", "now-7d" or "now+12h". Units
+            are s, m, h, d and w for seconds to weeks.
+        now: The current time, to make relative dates relative to
+
+    returns:
+        An aware datetime. Dates without a time are taken as midnight,
+        and times without a time zone as in the current time zone.
+
+    raises:
+        ValueError if the value is not a date
+    """
+    match = RELATIVE_DATE_RE.match(value.strip())
+    if match:
+        sign, amount, unit = match.groups()
+        now = now or timezone.now()
+        if not amount:
+            return now
+
+        delta = timedelta(**{RELATIVE_DATE_UNITS[unit]: int(amount)})
+        return now + delta if sign == '+' else now - delta
+
+    parsed = parse_datetime(value)
+    if parsed is None:
+        date = parse_date(value)
+        if date is None:
+            raise ValueError("'%s' is not a date" % value)
+        parsed = datetime(date.year, date.month, date.day)
+
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed, timezone.get_current_timezone())
+
+    return parsed
+
+
+def midnight_date(value):
+    """ Return the date of a date filter value if it is midnight in the
+    default time zone, the one items are counted per day in, or None
+    otherwise; see data_layer.models.TermDailyCount.
+    """
+    try:
+        parsed = parse_date_filter(value)
+    except ValueError:
+        return None
+
+    local = timezone.localtime(parsed, timezone.get_default_timezone())
+    if local.time():
+        return None
+
+    return local.date()
@@ -0,0 +1,142 @@
+from collections import Counter, OrderedDict
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db.models import Sum
+from django.utils import timezone
+
+from data_layer.models import Item, TermDailyCount
+from taxonomies.models import Term
+
+
+# The intervals of histograms
+HISTOGRAM_INTERVALS = ('hour', 'day', 'week', 'month')
+
+# The intervals that can be read from the daily term counts
+DAILY_COUNT_INTERVALS = ('day', 'week', 'month')
+
+
+def _interval_start(timestamp, interval):
+    """ Return the start of the interval of the current time zone that a
+    timestamp is in.
+
+    Timestamps are truncated here rather than by the database, which on
+    MySQL needs its time zone tables loaded to convert them, as
+    data_layer.models.count_day does.
+    """
+    if settings.USE_TZ:
+        timestamp = timezone.make_naive(
+            timestamp, timezone.get_current_timezone())
+
+    start = timestamp.replace(minute=0, second=0, microsecond=0)
+    if interval != 'hour':
+        start = start.replace(hour=0)
+    if interval == 'month':
+        start = start.replace(day=1)
+
+    return _bucket_start(start, interval)
+
+
+def _bucket_start(value, interval):
+    """ Return the start of the interval of a naive datetime truncated to
+    its hour, day or month
+    """
+    if interval == 'week':
+        value = value - timedelta(days=value.weekday())
+
+    if settings.USE_TZ and timezone.is_naive(value):
+        value = timezone.make_aware(value, timezone.get_current_timezone())
+
+    return value
+
+
+def term_histogram(taxonomy, items, interval):
+    """ Count the given items of each term of a taxonomy per interval of
+    time, by their timestamp, in one query.
+
+    Intervals are in the current time zone, and weeks start on Mondays.
+    Items without a timestamp are not counted.
+
+    args:
+        taxonomy: The Taxonomy whose terms to count
+        items: QuerySet of the items to count
+        interval: 'hour', 'day', 'week' or 'month'
+
+    returns:
+        A list of each term's name, long_name and counts. The counts are
+        a list of the start of each interval with items and their count,
+        oldest first.
+    """
+    links = Item.terms.through.objects.filter(
+        term__taxonomy=taxonomy,
+        message__timestamp__isnull=False,
+        message__in=items,
+    ).values_list('term_id', 'message__timestamp')
+
+    counts = {}
+    for term_id, timestamp in links.iterator():
+        start = _interval_start(timestamp, interval)
+        counts.setdefault(term_id, Counter())[start] += 1
+
+    return _histogram(taxonomy, counts)
+
+
+def term_histogram_from_daily_counts(taxonomy, interval, start_day=None,
+                                     end_day=None):
+    """ Count the items of each term of a taxonomy per interval of time,
+    from the daily term counts rather than the items themselves.
+
+    The current time zone must be the default one, which items are
+    counted per day in; see data_layer.models.TermDailyCount.
+
+    args:
+        taxonomy: The Taxonomy whose terms to count
+        interval: 'day', 'week' or 'month'
+        start_day: If not None, the first day to count
+        end_day: If not None, the day after the last one to count
+
+    returns:
+        The histogram, as term_histogram returns it
+    """
+    daily_counts = TermDailyCount.objects.filter(
+        term__taxonomy=taxonomy,
+        day__isnull=False,
+    )
+    if start_day is not None:
+        daily_counts = daily_counts.filter(day__gte=start_day)
+    if end_day is not None:
+        daily_counts = daily_counts.filter(day__lt=end_day)
+
+    rows = daily_counts.values('term_id', 'day').annotate(
+        day_count=Sum('count'))
+
+    counts = {}
+    for row in rows:
+        day = row['day']
+        if interval == 'month':
+            day = day.replace(day=1)
+        start = _bucket_start(datetime.combine(day, time()), interval)
+        term_counts = counts.setdefault(row['term_id'], {})
+        term_counts[start] = term_counts.get(start, 0) + row['day_count']
+
+    return _histogram(taxonomy, counts)
+
+
+def _histogram(taxonomy, counts):
+    """ Return the histogram of the terms of a taxonomy, given their
+    counts by start of interval, by term id. Intervals without items
+    are left out.
+    """
+    histogram = []
+    for term in Term.objects.filter(taxonomy=taxonomy).order_by('name'):
+        term_counts = counts.get(term.id, {})
+        histogram.append(OrderedDict([
+            ('name', term.name),
+            ('long_name', term.long_name),
+            ('counts', [
+                OrderedDict([('start', start), ('count', term_counts[start])])
+                for start in sorted(term_counts) if term_counts[start]
+            ]),
+        ]))
+
+    return histogram
@@ -0,0 +1,124 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.translation import ugettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    BasePagination, LimitOffsetPagination, _positive_int
+)
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def older_than(items, created, id):
+    """ Filter items down to those after the given (created, id) position
+    when listed newest first, ie. ordered by ('-created', '-id').
+    """
+    return items.filter(Q(created__lt=created) | Q(created=created, id__lt=id))
+
+
+class DeletedItemPagination(LimitOffsetPagination):
+    """ Limit and offset pagination of the deleted items, which pages even
+    without a `limit` get parameter, as deleted items are never cleared.
+    """
+    default_limit = 1000
+    max_limit = 10000
+
+
+class ItemCursorPagination(BasePagination):
+    """ Keyset pagination of items, newest first.
+
+    Each page starts after the (created, id) position of the last item of
+    the previous page, which the opaque `cursor` get parameter encodes.
+    The database seeks straight to that position using the
+    (created, id) index, so deep pages cost as much as the first one,
+    and items committed while paging never shift the following pages.
+
+    Items are given their created time and id when they are saved, not
+    when their transaction commits. So items that an import, say,
+    commits while paging go unlisted if their (created, id) position is
+    past the pages listed already; only those newer than any item listed
+    yet are safely left to a later walk. Walks that must see every item
+    should be followed by a list with modified_since; see
+    rest_api.views.ItemViewSet.get_queryset.
+
+    An empty cursor asks for the first page. The page size is given by the
+    `limit` get parameter. Items are always in this order, whatever the
+    `ordering` get parameter.
+    """
+    cursor_query_param = 'cursor'
+    limit_query_param = 'limit'
+    default_limit = 100
+    ordering = ('-created', '-id')
+    invalid_cursor_message = _('Invalid cursor')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.limit = self.get_limit(request)
+
+        queryset = queryset.order_by(*self.ordering)
+
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded:
+            created, id = self.decode_cursor(encoded)
+            queryset = older_than(queryset, created, id)
+
+        # Fetch one more item to find out if there is a following page
+        results = list(queryset[:self.limit + 1])
+        self.page = results[:self.limit]
+        self.has_next = len(results) > self.limit
+
+        return self.page
+
+    def get_limit(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.limit_query_param],
+                strict=True
+            )
+        except (KeyError, ValueError):
+            return self.default_limit
+
+    def get_next_cursor(self):
+        """ Return the cursor of the page following the current one, or
+        None if this is the last page.
+        """
+        if not self.has_next:
+            return None
+
+        return self.encode_cursor(self.page[-1])
+
+    def get_next_link(self):
+        cursor = self.get_next_cursor()
+        if cursor is None:
+            return None
+
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('cursor', self.get_next_cursor()),
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+    def encode_cursor(self, item):
+        position = '%s|%d' % (item.created.isoformat(), item.id)
+        return urlsafe_b64encode(position.encode('ascii'))
+
+    def decode_cursor(self, encoded):
+        try:
+            position = urlsafe_b64decode(encoded.encode('ascii'))
+            created, id = position.split('|')
+            created = parse_datetime(created)
+            id = int(id)
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if created is None:
+            raise NotFound(self.invalid_cursor_message)
+
+        return (created, id)
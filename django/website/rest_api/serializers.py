@@ -43,12 +43,36 @@ class TermItemCountSerializer(serializers.ModelSerializer):
 
 
 class ItemSerializer(serializers.ModelSerializer):
+    """ Serializes items with their nested terms.
+
+    Takes two optional keyword arguments:
+        fields: Names of the only fields to serialize
+        body_length: If given, the body field is a preview of that many
+            characters, read from the instances' body_preview attribute
+    """
 
     class Meta:
         model = Item
+        fields = ('id', 'created', 'last_modified', 'body', 'timestamp',
+                  'network_provider', 'terms', )
 
     terms = TermSerializer(many=True)
 
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        body_length = kwargs.pop('body_length', None)
+        super(ItemSerializer, self).__init__(*args, **kwargs)
+
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+        if body_length and 'body' in self.fields:
+            self.fields['body'] = serializers.CharField(
+                source='body_preview',
+                read_only=True
+            )
+
     def create(self, validated_data):
         """ Create an item with nested metadata terms
         The validated data looks something like this:
@@ -86,3 +110,72 @@ class ItemSerializer(serializers.ModelSerializer):
         item.save()
 
         return item
+
+
+class ItemTermSerializer(serializers.Serializer):
+    """ A term given by taxonomy slug and name, eg. nested in an item that
+    is being created in bulk.
+
+    This only checks the shape of the data. The terms themselves are
+    looked up together when the items are created.
+    """
+    taxonomy = serializers.SlugField()
+    name = serializers.CharField()
+
+
+class BulkItemListSerializer(serializers.ListSerializer):
+
+    def create(self, validated_data):
+        """ Create the items, with their nested terms, using set-based
+        inserts.
+
+        All the terms are resolved at once (creating missing terms of
+        open taxonomies). Terms can also be given by id, in `term_ids`,
+        eg. as resolved by the terms' resolve action, and are then fetched
+        by primary key. As with Item.apply_terms, an item only keeps the
+        last of several terms given in a taxonomy that is not multiple;
+        terms given by id come after those given by name.
+        """
+        term_lists = [data.pop('terms', []) for data in validated_data]
+        term_id_lists = [data.pop('term_ids', []) for data in validated_data]
+
+        terms_by_name = Term.objects.by_taxonomies(
+            (t['taxonomy'], t['name']) for terms in term_lists for t in terms
+        )
+
+        term_ids = set(id for ids in term_id_lists for id in ids)
+        terms_by_id = Term.objects.select_related('taxonomy').in_bulk(
+            term_ids)
+        if len(terms_by_id) < len(term_ids):
+            raise Term.DoesNotExist("Term matching query does not exist.")
+
+        items_and_terms = []
+        for data, term_data, ids in zip(validated_data, term_lists,
+                                        term_id_lists):
+            given = [terms_by_name[(t['taxonomy'], t['name'])]
+                     for t in term_data]
+            given.extend(terms_by_id[id] for id in ids)
+
+            terms = []
+            for term in given:
+                if not term.taxonomy.is_multiple:
+                    terms = [other for other in terms
+                             if other.taxonomy_id != term.taxonomy_id]
+                terms.append(term)
+            items_and_terms.append((Item(**data), terms))
+
+        return Item.objects.bulk_create_with_terms(items_and_terms)
+
+
+class BulkItemSerializer(ItemSerializer):
+
+    class Meta:
+        model = Item
+        list_serializer_class = BulkItemListSerializer
+
+    terms = ItemTermSerializer(many=True, required=False)
+    term_ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        required=False,
+        write_only=True,
+    )
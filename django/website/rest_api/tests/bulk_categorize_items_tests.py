@@ -0,0 +1,208 @@
+from __future__ import unicode_literals, absolute_import
+
+import pytest
+
+from rest_framework.test import APIRequestFactory
+from rest_framework import status
+
+from data_layer.tests.factories import ItemFactory
+from taxonomies.models import Term
+from taxonomies.tests.factories import TaxonomyFactory, TermFactory
+from ..views import ItemViewSet
+
+
+@pytest.fixture
+def category():
+    return TaxonomyFactory(name="Test Ebola Questions")
+
+
+@pytest.fixture
+def items():
+    return [ItemFactory() for i in range(3)]
+
+
+def bulk_categorize_items(data):
+    request = APIRequestFactory().post("", data, format='json')
+    view = ItemViewSet.as_view(actions={'post': 'bulk_add_terms'})
+    return view(request)
+
+
+def bulk_uncategorize_items(data):
+    request = APIRequestFactory().post("", data, format='json')
+    view = ItemViewSet.as_view(actions={'post': 'bulk_delete_all_terms'})
+    return view(request)
+
+
+@pytest.mark.django_db
+def test_bulk_categorize_adds_term_to_all_items(category, items):
+    term = TermFactory(taxonomy=category)
+
+    response = bulk_categorize_items({
+        'ids': [item.id for item in items],
+        'taxonomy': category.slug,
+        'name': [term.name],
+    })
+
+    assert status.is_success(response.status_code), response.data
+    assert response.data['count'] == 3
+    for item in items:
+        assert list(item.terms.all()) == [term]
+
+
+@pytest.mark.django_db
+def test_bulk_categorize_replaces_term_of_optional_taxonomy(category, items):
+    [old_term, new_term] = [TermFactory(taxonomy=category) for i in range(2)]
+    other_term = TermFactory()
+    for item in items:
+        item.terms.add(old_term, other_term)
+
+    bulk_categorize_items({
+        'ids': [item.id for item in items[:2]],
+        'taxonomy': category.slug,
+        'name': new_term.name,
+    })
+
+    assert set(items[0].terms.all()) == set([new_term, other_term])
+    assert set(items[1].terms.all()) == set([new_term, other_term])
+    assert set(items[2].terms.all()) == set([old_term, other_term])
+
+
+@pytest.mark.django_db
+def test_bulk_categorize_keeps_terms_of_multiple_taxonomy(items):
+    taxonomy = TaxonomyFactory(multiplicity='multiple')
+    [old_term, new_term] = [TermFactory(taxonomy=taxonomy) for i in range(2)]
+    items[0].terms.add(old_term)
+
+    bulk_categorize_items({
+        'ids': [items[0].id],
+        'taxonomy': taxonomy.slug,
+        'name': [new_term.name],
+    })
+
+    assert set(items[0].terms.all()) == set([old_term, new_term])
+
+
+@pytest.mark.django_db
+def test_bulk_categorize_fails_for_many_terms_of_optional_taxonomy(
+        category, items):
+    terms = [TermFactory(taxonomy=category) for i in range(2)]
+
+    response = bulk_categorize_items({
+        'ids': [items[0].id],
+        'taxonomy': category.slug,
+        'name': [t.name for t in terms],
+    })
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert items[0].terms.count() == 0
+
+
+@pytest.mark.django_db
+def test_bulk_categorize_fails_gracefully_if_term_not_found(category, items):
+    response = bulk_categorize_items({
+        'ids': [items[0].id],
+        'taxonomy': category.slug,
+        'name': ['unknown-term'],
+    })
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.data['detail'] == "Term matching query does not exist."
+
+
+@pytest.mark.django_db
+def test_bulk_categorize_ignores_unknown_items(category, items):
+    term = TermFactory(taxonomy=category)
+    unknown_item_id = max(item.id for item in items) + 1
+
+    response = bulk_categorize_items({
+        'ids': [items[0].id, unknown_item_id],
+        'taxonomy': category.slug,
+        'name': [term.name],
+    })
+
+    assert response.data['count'] == 1
+
+
+@pytest.mark.django_db
+def test_bulk_uncategorize_removes_terms_of_taxonomy_only(category, items):
+    term = TermFactory(taxonomy=category)
+    other_term = TermFactory()
+    for item in items:
+        item.terms.add(term, other_term)
+
+    response = bulk_uncategorize_items({
+        'ids': [item.id for item in items[:2]],
+        'taxonomy': category.slug,
+    })
+
+    assert response.data['count'] == 2
+    assert list(items[0].terms.all()) == [other_term]
+    assert list(items[1].terms.all()) == [other_term]
+    assert set(items[2].terms.all()) == set([term, other_term])
+
+
+@pytest.mark.django_db
+def test_bulk_uncategorize_fails_gracefully_if_taxonomy_not_found(items):
+    response = bulk_uncategorize_items({
+        'ids': [items[0].id],
+        'taxonomy': 'unknown-slug',
+    })
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.data['detail'] == (
+        "Taxonomy with slug 'unknown-slug' does not exist.")
+
+
+def miss_first_fetch(monkeypatch):
+    """ Make the first fetch of Terms find none, as if another import
+    inserted them after we looked
+    """
+    fetch = Term.objects._fetch
+    calls = []
+
+    def _fetch(*args, **kwargs):
+        calls.append(args)
+        if len(calls) == 1:
+            return {}
+        return fetch(*args, **kwargs)
+
+    monkeypatch.setattr(Term.objects, '_fetch', _fetch)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bulk_categorize_survives_term_inserted_concurrently(monkeypatch):
+    taxonomy = TaxonomyFactory(vocabulary='open', multiplicity='multiple')
+    item = ItemFactory()
+    concurrent = TermFactory(taxonomy=taxonomy, name="Liberia")
+    miss_first_fetch(monkeypatch)
+
+    response = bulk_categorize_items({
+        'ids': [item.id],
+        'taxonomy': taxonomy.slug,
+        'name': ["Liberia"],
+    })
+
+    assert status.is_success(response.status_code), response.data
+    assert list(item.terms.all()) == [concurrent]
+    assert Term.objects.filter(taxonomy=taxonomy).count() == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bulk_categorize_uses_term_differing_in_case_inserted_concurrently(
+        monkeypatch):
+    taxonomy = TaxonomyFactory(vocabulary='open', multiplicity='multiple')
+    item = ItemFactory()
+    TermFactory(taxonomy=taxonomy, name="liberia")
+    # As on MySQL, whose collation ignores case
+    monkeypatch.setattr(Term.objects, 'names_ignore_case', lambda: True)
+    miss_first_fetch(monkeypatch)
+
+    response = bulk_categorize_items({
+        'ids': [item.id],
+        'taxonomy': taxonomy.slug,
+        'name': ["Liberia", "LIBERIA"],
+    })
+
+    assert status.is_success(response.status_code), response.data
+    # On MySQL this is the existing Term
+    assert [t.name.lower() for t in item.terms.all()] == ["liberia"]
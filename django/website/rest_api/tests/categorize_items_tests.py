@@ -50,7 +50,7 @@ def item():
 def categorize_item(item, term):
     request = APIRequestFactory().post("", term)
     view = ItemViewSet.as_view(actions={'post': 'add_terms'})
-    return view(request, item_pk=item['id'])
+    return view(request, pk=item['id'])
 
 
 @pytest.mark.django_db
@@ -0,0 +1,181 @@
+from __future__ import unicode_literals, absolute_import
+
+from calendar import timegm
+
+import pytest
+
+from django.utils.http import http_date
+from rest_framework.test import APIRequestFactory
+from rest_framework import status
+
+from data_layer.tests.factories import ItemFactory
+from taxonomies.tests.factories import TermFactory
+
+from ..views import ItemViewSet, TaxonomyViewSet
+
+
+def get_items(data=None, **headers):
+    view = ItemViewSet.as_view(actions={'get': 'list'})
+    request = APIRequestFactory().get('/', data, **headers)
+    return view(request)
+
+
+def get_item(pk, **headers):
+    view = ItemViewSet.as_view(actions={'get': 'retrieve'})
+    request = APIRequestFactory().get('/', **headers)
+    return view(request, pk=pk)
+
+
+def get_itemcount(slug, **headers):
+    view = TaxonomyViewSet.as_view(actions={'get': 'itemcount'})
+    request = APIRequestFactory().get('/', **headers)
+    return view(request, slug=slug)
+
+
+@pytest.mark.django_db
+def test_item_list_has_validators():
+    item = ItemFactory()
+
+    response = get_items()
+
+    assert response['ETag']
+    assert response['Last-Modified'] == http_date(
+        timegm(item.last_modified.utctimetuple()))
+
+
+@pytest.mark.django_db
+def test_item_list_not_modified_for_current_etag():
+    ItemFactory()
+    etag = get_items()['ETag']
+
+    response = get_items(HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response['ETag'] == etag
+    assert response.data is None
+
+
+@pytest.mark.django_db
+def test_item_list_etag_changes_with_items():
+    items = [ItemFactory() for i in range(2)]
+    etags = set([get_items()['ETag']])
+
+    items[0].terms.add(TermFactory())
+    etags.add(get_items()['ETag'])
+
+    items[1].delete()
+    etags.add(get_items()['ETag'])
+
+    ItemFactory()
+    etags.add(get_items()['ETag'])
+
+    assert len(etags) == 4
+
+
+@pytest.mark.django_db
+def test_item_list_etag_differs_by_query():
+    ItemFactory()
+
+    etag = get_items()['ETag']
+    response = get_items({'limit': 1}, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response['ETag'] != etag
+
+
+@pytest.mark.django_db
+def test_item_list_not_modified_since_last_modified():
+    ItemFactory()
+    last_modified = get_items()['Last-Modified']
+
+    response = get_items(HTTP_IF_MODIFIED_SINCE=last_modified)
+
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+@pytest.mark.django_db
+def test_item_not_modified_for_current_etag():
+    item = ItemFactory()
+    etag = get_item(item.id)['ETag']
+
+    assert get_item(item.id, HTTP_IF_NONE_MATCH=etag).status_code == \
+        status.HTTP_304_NOT_MODIFIED
+
+    item.body = "Changed"
+    item.save()
+
+    response = get_item(item.id, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['body'] == "Changed"
+
+
+@pytest.mark.django_db
+def test_unknown_item_not_found_without_validators():
+    response = get_item(6, HTTP_IF_NONE_MATCH='*')
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert 'ETag' not in response
+
+
+@pytest.mark.django_db
+def test_itemcount_not_modified_until_terms_change():
+    term = TermFactory()
+    item = ItemFactory()
+    etag = get_itemcount(term.taxonomy.slug)['ETag']
+
+    response = get_itemcount(term.taxonomy.slug, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    item.terms.add(term)
+
+    response = get_itemcount(term.taxonomy.slug, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data[0]['count'] == 1
+
+
+def get_histogram(slug, **headers):
+    view = TaxonomyViewSet.as_view(actions={'get': 'histogram'})
+    request = APIRequestFactory().get('/', **headers)
+    return view(request, slug=slug)
+
+
+@pytest.mark.django_db
+def test_term_counts_modified_by_renamed_terms():
+    term = TermFactory(name="Cholera")
+    item = ItemFactory()
+    item.terms.add(term)
+    slug = term.taxonomy.slug
+    etags = [get_itemcount(slug)['ETag'], get_histogram(slug)['ETag']]
+
+    term.name = "Measles"
+    term.save()
+
+    response = get_itemcount(slug, HTTP_IF_NONE_MATCH=etags[0])
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data[0]['name'] == "Measles"
+
+    response = get_histogram(slug, HTTP_IF_NONE_MATCH=etags[1])
+    assert response.status_code == status.HTTP_200_OK
+
+    etag = get_itemcount(slug)['ETag']
+    term.long_name = "Measles outbreak"
+    term.save()
+
+    response = get_itemcount(slug, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data[0]['long_name'] == "Measles outbreak"
+
+
+@pytest.mark.django_db
+def test_item_modified_by_renamed_term():
+    term = TermFactory(name="Cholera")
+    item = ItemFactory()
+    item.terms.add(term)
+    etag = get_item(item.id)['ETag']
+
+    term.name = "Measles"
+    term.save()
+
+    response = get_item(item.id, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['terms'][0]['name'] == "Measles"
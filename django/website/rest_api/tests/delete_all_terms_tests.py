@@ -18,7 +18,7 @@ from ..views import ItemViewSet
 def remove_categories_from_item(item, taxonomy):
     request = APIRequestFactory().post("", {'taxonomy': taxonomy})
     view = ItemViewSet.as_view(actions={'post': 'delete_all_terms'})
-    return view(request, item_pk=item['id'])
+    return view(request, pk=item['id'])
 
 
 @pytest.mark.django_db
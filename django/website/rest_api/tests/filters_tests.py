@@ -0,0 +1,33 @@
+from __future__ import unicode_literals, absolute_import
+from datetime import datetime, timedelta
+import pytest
+import pytz
+from django.utils import timezone
+
+from ..filters import parse_date_filter
+
+NOW = datetime(2015, 6, 10, 12, 0, tzinfo=pytz.utc)
+
+
+def test_parse_date_filter_parses_relative_dates():
+    assert parse_date_filter('now', now=NOW) == NOW
+    assert parse_date_filter('now-7d', now=NOW) == NOW - timedelta(days=7)
+    assert parse_date_filter('now+12h', now=NOW) == NOW + timedelta(hours=12)
+    assert parse_date_filter('now-2w', now=NOW) == NOW - timedelta(weeks=2)
+
+
+def test_parse_date_filter_parses_iso_dates_and_times():
+    assert parse_date_filter('2015-06-10T12:00:00Z') == NOW
+    assert parse_date_filter('2015-06-10 14:00:00+02:00') == NOW
+
+
+def test_parse_date_filter_makes_dates_midnight_in_current_time_zone():
+    with timezone.override(pytz.utc):
+        assert parse_date_filter('2015-06-10') == \
+            datetime(2015, 6, 10, tzinfo=pytz.utc)
+
+
+def test_parse_date_filter_rejects_invalid_dates():
+    for value in ('yesterday', 'now-7y', '2015-13-01'):
+        with pytest.raises(ValueError):
+            parse_date_filter(value)
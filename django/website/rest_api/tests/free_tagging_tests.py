@@ -25,7 +25,7 @@ def get_item(id):
 def get_add_free_terms_response(item_id, terms):
     request = APIRequestFactory().post('', terms)
     view = ItemViewSet.as_view(actions={'post': 'add_terms'})
-    response = view(request, item_pk=item_id)
+    response = view(request, pk=item_id)
 
     return response
 
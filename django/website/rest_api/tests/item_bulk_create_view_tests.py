@@ -0,0 +1,142 @@
+from __future__ import unicode_literals, absolute_import
+
+import pytest
+
+from rest_framework.test import APIRequestFactory
+from rest_framework import status
+
+from data_layer.models import Item
+from taxonomies.models import Term
+from taxonomies.tests.factories import TaxonomyFactory, TermFactory
+
+from ..views import ItemViewSet
+
+
+def bulk_create_items(items):
+    request = APIRequestFactory().post('/items', items, format='json')
+    view = ItemViewSet.as_view(actions={'post': 'bulk_create'})
+    return view(request)
+
+
+@pytest.mark.django_db
+def test_bulk_create_creates_items():
+    response = bulk_create_items([{'body': 'one'}, {'body': 'two'}])
+
+    assert status.is_success(response.status_code), response.data
+    assert response.data['count'] == 2
+
+    bodies = [Item.objects.get(id=id).body for id in response.data['ids']]
+    assert bodies == ['one', 'two']
+
+
+@pytest.mark.django_db
+def test_bulk_create_adds_nested_terms():
+    terms = [TermFactory() for i in range(2)]
+    term_data = [{'taxonomy': t.taxonomy.slug, 'name': t.name}
+                 for t in terms]
+
+    response = bulk_create_items([
+        {'body': 'one', 'terms': term_data},
+        {'body': 'two', 'terms': term_data[:1]},
+    ])
+
+    assert status.is_success(response.status_code), response.data
+    [one, two] = [Item.objects.get(id=id) for id in response.data['ids']]
+    assert set(one.terms.all()) == set(terms)
+    assert list(two.terms.all()) == terms[:1]
+
+
+@pytest.mark.django_db
+def test_bulk_create_creates_missing_terms_in_open_taxonomies():
+    taxonomy = TaxonomyFactory(vocabulary='open', multiplicity='multiple')
+
+    response = bulk_create_items([
+        {'body': 'one', 'terms': [
+            {'taxonomy': taxonomy.slug, 'name': 'new'},
+            {'taxonomy': taxonomy.slug, 'name': 'newer'},
+        ]},
+    ])
+
+    assert status.is_success(response.status_code), response.data
+    [item] = Item.objects.all()
+    names = sorted(t.name for t in item.terms.all())
+    assert names == ['new', 'newer']
+    assert Term.objects.filter(taxonomy=taxonomy).count() == 2
+
+
+@pytest.mark.django_db
+def test_bulk_create_keeps_last_term_of_optional_taxonomy():
+    taxonomy = TaxonomyFactory(multiplicity='optional')
+    first = TermFactory(taxonomy=taxonomy)
+    second = TermFactory(taxonomy=taxonomy)
+
+    response = bulk_create_items([
+        {'body': 'one', 'terms': [
+            {'taxonomy': taxonomy.slug, 'name': first.name},
+            {'taxonomy': taxonomy.slug, 'name': second.name},
+        ]},
+    ])
+
+    assert status.is_success(response.status_code), response.data
+    [item] = Item.objects.all()
+    assert list(item.terms.all()) == [second]
+
+
+@pytest.mark.django_db
+def test_bulk_create_fails_gracefully_if_term_not_found():
+    taxonomy = TaxonomyFactory()
+
+    response = bulk_create_items([
+        {'body': 'one', 'terms': [
+            {'taxonomy': taxonomy.slug, 'name': 'unknown-term'},
+        ]},
+    ])
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.data['detail'] == "Term matching query does not exist."
+    assert Item.objects.count() == 0
+
+
+@pytest.mark.django_db
+def test_bulk_create_fails_gracefully_if_taxonomy_not_found():
+    response = bulk_create_items([
+        {'body': 'one', 'terms': [
+            {'taxonomy': 'unknown-slug', 'name': 'unknown-term'},
+        ]},
+    ])
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.data['detail'] == "Taxonomy matching query does not exist."
+
+
+@pytest.mark.django_db
+def test_bulk_create_does_not_create_any_item_if_one_is_invalid():
+    response = bulk_create_items([{'body': 'one'}, {}])
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert 'body' in response.data['errors'][1]
+    assert Item.objects.count() == 0
+
+
+@pytest.mark.django_db
+def test_bulk_create_adds_terms_given_by_id():
+    taxonomy = TaxonomyFactory(multiplicity='multiple')
+    terms = [TermFactory(taxonomy=taxonomy) for i in range(2)]
+
+    response = bulk_create_items([
+        {'body': 'one', 'term_ids': [t.id for t in terms]},
+        {'body': 'two', 'term_ids': [terms[0].id]},
+    ])
+
+    assert status.is_success(response.status_code), response.data
+    one, two = [Item.objects.get(id=id) for id in response.data['ids']]
+    assert set(one.terms.all()) == set(terms)
+    assert list(two.terms.all()) == [terms[0]]
+
+
+@pytest.mark.django_db
+def test_bulk_create_with_unknown_term_id_is_bad_request():
+    response = bulk_create_items([{'body': 'one', 'term_ids': [999]}])
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert Item.objects.count() == 0
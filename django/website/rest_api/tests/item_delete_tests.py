@@ -4,6 +4,10 @@ import pytest
 
 from rest_framework.test import APIRequestFactory
 from rest_framework import status
+
+from data_layer.models import Item
+from data_layer.tests.factories import ItemFactory
+from taxonomies.tests.factories import TermFactory
 from ..views import ItemViewSet
 
 from .item_create_view_tests import create_item
@@ -33,3 +37,98 @@ def test_delete_item():
 
     [item] = list_items().data
     assert item['body'] == "test1"
+
+
+def bulk_delete_items(data):
+    request = APIRequestFactory().delete('/', data, format='json')
+    view = ItemViewSet.as_view(actions={'delete': 'bulk_destroy'})
+    return view(request)
+
+
+@pytest.mark.django_db
+def test_bulk_delete_items():
+    create_item(body="test1")
+    ids = [create_item(body="test%d" % i).data['id'] for i in range(2, 5)]
+    assert count_items() == 4
+
+    response = bulk_delete_items({'ids': ids})
+    assert status.is_success(response.status_code)
+    assert response.data['count'] == 3
+
+    [item] = list_items().data
+    assert item['body'] == "test1"
+
+
+@pytest.mark.django_db
+def test_bulk_delete_items_deletes_term_links():
+    item = ItemFactory()
+    item.terms.add(TermFactory())
+    through = Item.terms.through
+
+    response = bulk_delete_items({'ids': [item.id]})
+    assert status.is_success(response.status_code)
+    assert through.objects.filter(message_id=item.id).count() == 0
+
+
+@pytest.mark.django_db
+def test_bulk_delete_without_ids_deletes_nothing():
+    create_item(body="test1")
+
+    response = bulk_delete_items({})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert count_items() == 1
+
+
+def list_deleted(**params):
+    request = APIRequestFactory().get('/', params)
+    view = ItemViewSet.as_view(actions={'get': 'deleted'})
+    return view(request)
+
+
+@pytest.mark.django_db
+def test_deleted_items_are_listed():
+    kept = create_item(body="test1").data['id']
+    deleted_id = create_item(body="test2").data['id']
+    bulk_deleted_ids = [create_item(body="test%d" % i).data['id']
+                        for i in range(3, 5)]
+
+    delete_item(deleted_id)
+    bulk_delete_items({'ids': bulk_deleted_ids})
+
+    response = list_deleted()
+    assert status.is_success(response.status_code)
+    assert response.data['count'] == 3
+    deleted_ids = [d['id'] for d in response.data['results']]
+    assert deleted_ids == [deleted_id] + bulk_deleted_ids
+    assert kept not in deleted_ids
+    assert all(d['deleted'] is not None for d in response.data['results'])
+
+
+@pytest.mark.django_db
+def test_deleted_items_are_listed_since_a_date():
+    first = create_item(body="test1").data['id']
+    second = create_item(body="test2").data['id']
+    delete_item(first)
+    [deleted] = list_deleted().data['results']
+
+    delete_item(second)
+
+    response = list_deleted(modified_since=deleted['deleted'].isoformat())
+    assert [d['id'] for d in response.data['results']] == [second]
+
+
+@pytest.mark.django_db
+def test_deleted_items_are_paginated():
+    ids = [create_item(body="test%d" % i).data['id'] for i in range(3)]
+    bulk_delete_items({'ids': ids})
+
+    response = list_deleted(limit=2, offset=1)
+
+    assert response.data['count'] == 3
+    assert [d['id'] for d in response.data['results']] == ids[1:]
+
+
+@pytest.mark.django_db
+def test_deleted_items_with_invalid_date_is_bad_request():
+    response = list_deleted(modified_since='yesterday-ish')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
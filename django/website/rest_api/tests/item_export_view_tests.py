@@ -0,0 +1,59 @@
+from __future__ import unicode_literals, absolute_import
+import json
+import pytest
+from rest_framework.test import APIRequestFactory
+from data_layer.tests.factories import ItemFactory
+from taxonomies.tests.factories import TermFactory
+
+from ..views import ItemViewSet
+
+
+def export(data=None):
+    view = ItemViewSet.as_view(actions={'get': 'export'})
+    request = APIRequestFactory().get('/', data)
+    return view(request)
+
+
+def read_lines(response):
+    content = b''.join(response.streaming_content)
+    return [json.loads(line) for line in content.splitlines()]
+
+
+@pytest.mark.django_db
+def test_export_streams_items_as_ndjson():
+    term = TermFactory()
+    items = [ItemFactory() for i in range(3)]
+    items[0].terms.add(term)
+
+    response = export()
+
+    assert response.status_code == 200
+    assert response['Content-Type'] == 'application/x-ndjson'
+
+    exported = read_lines(response)
+    assert [i['id'] for i in exported] == [i.id for i in reversed(items)]
+    assert exported[2]['terms'][0]['name'] == term.name
+
+
+@pytest.mark.django_db
+def test_export_pages_through_items_in_chunks(monkeypatch):
+    monkeypatch.setattr(ItemViewSet, 'export_chunk_size', 2)
+    items = [ItemFactory() for i in range(5)]
+
+    response = export()
+    chunks = list(response.streaming_content)
+
+    assert len(chunks) == 3
+    exported = [json.loads(line)['id']
+                for line in b''.join(chunks).splitlines()]
+    assert exported == [i.id for i in reversed(items)]
+
+
+@pytest.mark.django_db
+def test_export_applies_filters():
+    ItemFactory(body="one")
+    ItemFactory(body="two")
+
+    exported = read_lines(export({'body': 'two'}))
+
+    assert [i['body'] for i in exported] == ['two']
@@ -1,7 +1,13 @@
 from __future__ import unicode_literals, absolute_import
+from datetime import datetime
 import pytest
+import pytz
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APIRequestFactory
+from data_layer.models import Item
 from data_layer.tests.factories import ItemFactory
+from taxonomies.models import Term
 from taxonomies.tests.factories import TermFactory
 
 from ..views import ItemViewSet
@@ -128,3 +134,399 @@ def test_item_listed_with_associated_terms():
     assert len(nested_terms) == 3
     term_names = [term.name for term in terms]
     assert all(t['name'] in term_names for t in nested_terms)
+
+
+@pytest.mark.django_db
+def test_items_are_listed_newest_first():
+    items = [create_item(body='item %d' % i).data for i in range(3)]
+
+    payload = get().data
+
+    assert [i['id'] for i in payload] == [i['id'] for i in reversed(items)]
+
+
+@pytest.mark.django_db
+def test_get_items_paginates_with_limit_and_offset():
+    items = [create_item(body='item %d' % i).data for i in range(5)]
+    newest_first = [i['id'] for i in reversed(items)]
+
+    payload = get(data={'limit': 2, 'offset': 1}).data
+
+    assert payload['count'] == 5
+    assert [i['id'] for i in payload['results']] == newest_first[1:3]
+    assert payload['next'] is not None
+    assert payload['previous'] is not None
+
+
+@pytest.mark.django_db
+def test_paginated_count_applies_filters():
+    create_item(body="one")
+    create_item(body="two")
+
+    payload = get(data={'body': 'one', 'limit': 10}).data
+
+    assert payload['count'] == 1
+    assert payload['results'][0]['body'] == 'one'
+
+
+@pytest.mark.django_db
+def test_get_items_paginates_with_cursor():
+    items = [create_item(body='item %d' % i).data for i in range(5)]
+    newest_first = [i['id'] for i in reversed(items)]
+
+    first_page = get(data={'cursor': '', 'limit': 2}).data
+    assert [i['id'] for i in first_page['results']] == newest_first[0:2]
+    assert first_page['next'] is not None
+
+    second_page = get(data={'cursor': first_page['cursor'], 'limit': 2}).data
+    assert [i['id'] for i in second_page['results']] == newest_first[2:4]
+
+    last_page = get(data={'cursor': second_page['cursor'], 'limit': 2}).data
+    assert [i['id'] for i in last_page['results']] == newest_first[4:]
+    assert last_page['cursor'] is None
+    assert last_page['next'] is None
+
+
+@pytest.mark.django_db
+def test_cursor_pages_are_not_shifted_by_new_items():
+    items = [create_item(body='item %d' % i).data for i in range(4)]
+    newest_first = [i['id'] for i in reversed(items)]
+
+    first_page = get(data={'cursor': '', 'limit': 2}).data
+    create_item(body='new item')
+    second_page = get(data={'cursor': first_page['cursor'], 'limit': 2}).data
+
+    assert [i['id'] for i in second_page['results']] == newest_first[2:4]
+
+
+@pytest.mark.django_db
+def test_cursor_pages_break_ties_on_created_by_id():
+    ItemFactory.create_batch(3)
+    Item.objects.update(created=datetime(2015, 1, 1, tzinfo=pytz.utc))
+    newest_first = list(
+        Item.objects.order_by('-id').values_list('id', flat=True))
+
+    first_page = get(data={'cursor': '', 'limit': 2}).data
+    second_page = get(data={'cursor': first_page['cursor'], 'limit': 2}).data
+
+    ids = [i['id'] for i in first_page['results'] + second_page['results']]
+    assert ids == newest_first
+
+
+@pytest.mark.django_db
+def test_get_items_fails_for_invalid_cursor():
+    response = get(data={'cursor': 'invalid'})
+
+    assert response.status_code == 404
+    assert response.data['detail'] == 'Invalid cursor'
+
+
+@pytest.mark.django_db
+def test_get_items_orders_by_given_fields():
+    create_item(body='b', network_provider='x')
+    create_item(body='a', network_provider='y')
+    create_item(body='c', network_provider='x')
+
+    payload = get(data={'ordering': 'body'}).data
+    assert [i['body'] for i in payload] == ['a', 'b', 'c']
+
+    payload = get(data={'ordering': '-network_provider,-body'}).data
+    assert [i['body'] for i in payload] == ['a', 'c', 'b']
+
+
+@pytest.mark.django_db
+def test_get_items_orders_by_term_name():
+    taxonomy = create_taxonomy(name='taxonomy').data
+    terms = [add_term(taxonomy=taxonomy['slug'], name=name).data
+             for name in ('beta', 'alpha')]
+    items = [create_item(body='item %d' % i).data for i in range(3)]
+    categorize_item(items[0], terms[0])
+    categorize_item(items[1], terms[1])
+
+    ordering = '-terms:{}'.format(taxonomy['slug'])
+    payload = get(data={'ordering': ordering, 'limit': 2}).data
+
+    assert payload['count'] == 3
+    assert [i['body'] for i in payload['results']] == ['item 0', 'item 1']
+
+
+@pytest.mark.django_db
+def test_get_items_ignores_unknown_ordering_fields():
+    items = [create_item(body='item %d' % i).data for i in range(2)]
+
+    payload = get(data={'ordering': 'unknown'}).data
+
+    assert [i['id'] for i in payload] == [items[1]['id'], items[0]['id']]
+
+
+@pytest.mark.django_db
+def test_get_items_ignores_fields_with_more_than_one_minus():
+    items = [create_item(body='item %d' % i).data for i in range(2)]
+
+    payload = get(data={'ordering': '--body,---terms:tags'}).data
+
+    assert [i['id'] for i in payload] == [items[1]['id'], items[0]['id']]
+
+
+@pytest.mark.django_db
+def test_get_items_returns_only_requested_fields():
+    create_item(body='test')
+
+    [item] = get(data={'fields': 'body,timestamp'}).data
+
+    assert set(item.keys()) == set(['id', 'body', 'timestamp'])
+
+
+@pytest.mark.django_db
+def test_get_items_omits_excluded_fields():
+    create_item(body='test')
+
+    [item] = get(data={'exclude': ['terms', 'last_modified']}).data
+
+    assert set(item.keys()) == set(
+        ['id', 'created', 'body', 'timestamp', 'network_provider'])
+
+
+@pytest.mark.django_db
+def test_get_items_truncates_body_to_preview_length():
+    create_item(body='a long body text')
+
+    [item] = get(data={'body_length': 6}).data
+
+    assert item['body'] == 'a long'
+
+
+@pytest.mark.django_db
+def test_get_items_only_queries_requested_fields():
+    term = TermFactory()
+    ItemFactory().terms.add(term)
+
+    with CaptureQueriesContext(connection) as queries:
+        [item] = get(data={'fields': 'timestamp'}).data
+
+    # The validators, then the items
+    [validators, query] = queries.captured_queries
+    assert 'body' not in query['sql']
+    assert 'network_provider' not in query['sql']
+    assert 'terms' not in item
+
+
+@pytest.fixture
+def categorized_items():
+    """ Three items and three terms, where item n has terms 0 to n """
+    items = [ItemFactory() for i in range(3)]
+    terms = [TermFactory() for i in range(3)]
+    for i, item in enumerate(items):
+        item.terms.add(*terms[:i + 1])
+
+    return items, ['{}:{}'.format(t.taxonomy.slug, t.name) for t in terms]
+
+
+@pytest.mark.django_db
+def test_filter_by_any_of_terms(categorized_items):
+    items, term_filters = categorized_items
+
+    payload = get(data={
+        'terms_any': [term_filters[2], 'unknown:term'],
+    }).data
+
+    assert [i['id'] for i in payload] == [items[2].id]
+
+
+@pytest.mark.django_db
+def test_filter_by_any_of_unknown_terms_returns_nothing(categorized_items):
+    payload = get(data={'terms_any': ['unknown:term']}).data
+
+    assert payload == []
+
+
+@pytest.mark.django_db
+def test_filter_by_none_of_terms(categorized_items):
+    items, term_filters = categorized_items
+
+    payload = get(data={
+        'terms_none': [term_filters[1], 'unknown:term'],
+    }).data
+
+    assert [i['id'] for i in payload] == [items[0].id]
+
+
+@pytest.mark.django_db
+def test_filter_combines_all_any_and_none_of_terms(categorized_items):
+    items, term_filters = categorized_items
+    # Has all of the terms, but none of the others
+    other_item = ItemFactory()
+    other_item.terms.add(*items[0].terms.all())
+
+    payload = get(data={
+        'terms': [term_filters[0]],
+        'terms_any': [term_filters[1], term_filters[2]],
+        'terms_none': [term_filters[2]],
+    }).data
+
+    assert [i['id'] for i in payload] == [items[1].id]
+
+
+@pytest.mark.django_db
+def test_term_filters_match_names_as_the_database_does():
+    term = TermFactory(name="Liberia")
+    tagged = ItemFactory()
+    tagged.terms.add(term)
+    untagged = ItemFactory()
+    term_filter = '{}:{}'.format(term.taxonomy.slug, "LIBERIA")
+
+    all_of = [i['id'] for i in get(data={'terms': [term_filter]}).data]
+    any_of = [i['id'] for i in get(data={'terms_any': [term_filter]}).data]
+    none_of = [i['id'] for i in get(data={'terms_none': [term_filter]}).data]
+
+    if Term.objects.names_ignore_case():
+        assert all_of == any_of == [tagged.id]
+        assert none_of == [untagged.id]
+    else:
+        assert all_of == any_of == []
+        assert set(none_of) == set([tagged.id, untagged.id])
+
+
+@pytest.mark.django_db
+def test_term_filters_take_a_constant_number_of_queries(categorized_items):
+    items, term_filters = categorized_items
+
+    with CaptureQueriesContext(connection) as queries:
+        get(data={'terms': term_filters[:2], 'fields': 'body'})
+
+    # Term lookup for the validators and the list, validators and
+    # item list
+    assert len(queries.captured_queries) == 4
+
+
+@pytest.mark.django_db
+def test_filter_by_timestamp_range():
+    for day in (1, 2, 3):
+        ItemFactory(timestamp=datetime(2015, 5, day, tzinfo=pytz.utc),
+                    body='day %d' % day)
+
+    payload = get(data={
+        'timestamp_after': '2015-05-02T00:00:00Z',
+        'timestamp_before': '2015-05-03T00:00:00Z',
+    }).data
+
+    assert [i['body'] for i in payload] == ['day 2']
+
+
+@pytest.mark.django_db
+def test_filter_by_relative_created_range():
+    old_item = ItemFactory(body='old')
+    Item.objects.filter(id=old_item.id).update(
+        created=datetime(2015, 1, 1, tzinfo=pytz.utc))
+    ItemFactory(body='new')
+
+    payload = get(data={'created_after': 'now-7d'}).data
+    assert [i['body'] for i in payload] == ['new']
+
+    payload = get(data={'created_before': 'now-7d'}).data
+    assert [i['body'] for i in payload] == ['old']
+
+
+@pytest.mark.django_db
+def test_filter_by_invalid_date_fails():
+    response = get(data={'timestamp_after': 'yesterday'})
+
+    assert response.status_code == 400
+    assert response.data['detail'] == \
+        "Invalid date 'yesterday' for timestamp_after."
+
+
+@pytest.mark.django_db
+def test_filter_by_modified_since_lists_only_changed_items():
+    old_item = ItemFactory(body='old')
+    Item.objects.filter(id=old_item.id).update(
+        last_modified=datetime(2015, 1, 1, tzinfo=pytz.utc))
+    ItemFactory(body='new')
+
+    payload = get(data={'modified_since': '2015-01-01T00:00:00Z'}).data
+    assert [i['body'] for i in payload] == ['new']
+
+    payload = get(data={'modified_since': '2014-12-31T00:00:00Z'}).data
+    assert set(i['body'] for i in payload) == set(['old', 'new'])
+
+
+# The search tests are transactional, as MySQL's text index only sees
+# committed rows. Their words avoid MySQL's stopwords and words of fewer
+# than 3 letters, which it doesn't index, and words found in every item,
+# which it gives no weight to.
+@pytest.mark.django_db(transaction=True)
+def test_search_finds_items_matching_any_word():
+    create_item(body="Water is unsafe to drink")
+    create_item(body="Clinic closed on Sunday")
+    create_item(body="Unrelated message")
+
+    items = get(data={'q': 'water clinic'}).data
+
+    assert set(i['body'] for i in items) == set([
+        "Water is unsafe to drink", "Clinic closed on Sunday"])
+
+
+@pytest.mark.django_db(transaction=True)
+def test_search_lists_best_matches_first():
+    create_item(body="Broken pump at the well")
+    create_item(body="Pump broken, pump handle missing, pump parts needed")
+    create_item(body="Clinic closed on Sunday")
+
+    items = get(data={'q': 'pump'}).data
+
+    assert items[0]['body'] == (
+        "Pump broken, pump handle missing, pump parts needed")
+
+
+@pytest.mark.django_db(transaction=True)
+def test_search_can_be_ordered():
+    ItemFactory(body="Water pump", timestamp=datetime(2015, 1, 1, tzinfo=pytz.utc))
+    ItemFactory(body="Water", timestamp=datetime(2015, 1, 2, tzinfo=pytz.utc))
+    ItemFactory(body="Clinic closed")
+
+    items = get(data={'q': 'water pump', 'ordering': '-timestamp'}).data
+
+    assert [i['body'] for i in items] == ["Water", "Water pump"]
+
+
+@pytest.mark.skipif(connection.vendor != 'sqlite',
+                    reason="Quoting of FTS5 query syntax, used on SQLite")
+@pytest.mark.django_db
+def test_search_ignores_query_syntax():
+    create_item(body='Ask "NEAR" the clinic')
+
+    items = get(data={'q': '"NEAR* AND ( clinic'}).data
+
+    assert [i['body'] for i in items] == ['Ask "NEAR" the clinic']
+
+
+@pytest.mark.django_db(transaction=True)
+def test_search_combines_with_filters_and_pagination():
+    term = TermFactory()
+    for i in range(3):
+        item = ItemFactory(body="Water %d" % i)
+        item.terms.add(term)
+    ItemFactory(body="Water elsewhere")
+    ItemFactory(body="Clinic closed")
+
+    term_filter = '{}:{}'.format(term.taxonomy.slug, term.name)
+    payload = get(data={'q': 'water', 'terms': term_filter, 'limit': 2}).data
+
+    assert payload['count'] == 3
+    assert len(payload['results']) == 2
+
+
+@pytest.mark.django_db(transaction=True)
+def test_search_finds_updated_bodies_only():
+    item = ItemFactory(body="Cholera outbreak")
+    ItemFactory(body="Cholera vaccine")
+
+    item.body = "Measles outbreak"
+    item.save()
+
+    assert [i['id'] for i in get(data={'q': 'measles'}).data] == [item.id]
+    assert item.id not in [i['id'] for i in get(data={'q': 'cholera'}).data]
+
+    item.delete()
+
+    assert get(data={'q': 'measles'}).data == []
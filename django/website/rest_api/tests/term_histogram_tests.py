@@ -0,0 +1,217 @@
+from __future__ import unicode_literals, absolute_import
+
+from datetime import datetime
+
+import pytest
+import pytz
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory
+from rest_framework import status
+
+from data_layer.models import Item
+from data_layer.tests.factories import ItemFactory
+from taxonomies.tests.factories import TaxonomyFactory, TermFactory
+
+from ..histogram import term_histogram
+from ..views import TaxonomyViewSet
+
+
+def get_term_histogram_response(taxonomy_slug, get_params=None):
+    request = APIRequestFactory().get("", data=get_params)
+    view = TaxonomyViewSet.as_view(actions={'get': 'histogram'})
+
+    return view(request, slug=taxonomy_slug)
+
+
+def get_term_histogram(taxonomy_slug, get_params=None):
+    response = get_term_histogram_response(taxonomy_slug, get_params)
+    assert status.is_success(response.status_code), response.data
+
+    return {term['name']: term['counts'] for term in response.data}
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=pytz.utc)
+
+
+@pytest.fixture
+def taxonomy():
+    return TaxonomyFactory(name="Questions")
+
+
+@pytest.fixture
+def terms(taxonomy):
+    return [
+        TermFactory(taxonomy=taxonomy, name="Origins"),
+        TermFactory(taxonomy=taxonomy, name="Victims"),
+    ]
+
+
+def item_at(timestamp, *terms):
+    item = ItemFactory(timestamp=timestamp)
+    for term in terms:
+        item.terms.add(term)
+    return item
+
+
+@pytest.fixture
+def items(terms):
+    origins, victims = terms
+    return [
+        # A Saturday and a Sunday
+        item_at(utc(2015, 8, 1, 9, 30), origins),
+        item_at(utc(2015, 8, 2, 9, 45), origins, victims),
+        # The following Monday
+        item_at(utc(2015, 8, 3, 10, 15), origins),
+        item_at(utc(2015, 8, 3, 10, 45), origins),
+    ]
+
+
+@pytest.fixture
+def in_utc(request):
+    timezone.activate(pytz.utc)
+    request.addfinalizer(timezone.deactivate)
+
+
+@pytest.mark.django_db
+def test_histogram_counts_terms_per_day(taxonomy, items, in_utc):
+    histogram = get_term_histogram(taxonomy.slug)
+
+    assert histogram["Origins"] == [
+        {'start': utc(2015, 8, 1), 'count': 1},
+        {'start': utc(2015, 8, 2), 'count': 1},
+        {'start': utc(2015, 8, 3), 'count': 2},
+    ]
+    assert histogram["Victims"] == [
+        {'start': utc(2015, 8, 2), 'count': 1},
+    ]
+
+
+@pytest.mark.django_db
+def test_histogram_counts_terms_per_hour(taxonomy, items, in_utc):
+    histogram = get_term_histogram(taxonomy.slug, {'interval': 'hour'})
+
+    assert histogram["Origins"] == [
+        {'start': utc(2015, 8, 1, 9), 'count': 1},
+        {'start': utc(2015, 8, 2, 9), 'count': 1},
+        {'start': utc(2015, 8, 3, 10), 'count': 2},
+    ]
+
+
+@pytest.mark.django_db
+def test_histogram_counts_terms_per_week_from_monday(taxonomy, items, in_utc):
+    histogram = get_term_histogram(taxonomy.slug, {'interval': 'week'})
+
+    assert histogram["Origins"] == [
+        {'start': utc(2015, 7, 27), 'count': 2},
+        {'start': utc(2015, 8, 3), 'count': 2},
+    ]
+
+
+@pytest.mark.django_db
+def test_histogram_counts_terms_per_month(taxonomy, items, in_utc):
+    histogram = get_term_histogram(taxonomy.slug, {'interval': 'month'})
+
+    assert histogram["Origins"] == [{'start': utc(2015, 8, 1), 'count': 4}]
+    assert histogram["Victims"] == [{'start': utc(2015, 8, 1), 'count': 1}]
+
+
+@pytest.mark.django_db
+def test_histogram_uses_the_current_time_zone(taxonomy, terms):
+    item_at(utc(2015, 8, 1, 23, 30), terms[0])
+
+    with timezone.override(pytz.timezone('Africa/Addis_Ababa')):
+        histogram = get_term_histogram(taxonomy.slug)
+
+    [count] = histogram["Origins"]
+    assert count['start'] == utc(2015, 8, 1, 21)
+
+
+@pytest.mark.django_db
+def test_histogram_does_not_need_the_database_to_convert_time_zones(
+        taxonomy, items, monkeypatch):
+    # As MySQL without its time zone tables, whose CONVERT_TZ gives NULL
+    monkeypatch.setattr(connection.ops, 'datetime_trunc_sql',
+                        lambda *args: ('NULL', []))
+
+    with timezone.override(pytz.timezone('Europe/London')):
+        histogram = get_term_histogram(taxonomy.slug, {'interval': 'hour'})
+
+    assert histogram["Origins"][0] == {
+        'start': utc(2015, 8, 1, 9), 'count': 1}
+
+
+@pytest.mark.django_db
+def test_histogram_lists_terms_without_items(taxonomy, terms, in_utc):
+    assert get_term_histogram(taxonomy.slug) == {"Origins": [], "Victims": []}
+
+
+@pytest.mark.django_db
+def test_histogram_filters_items_as_item_list(
+        taxonomy, terms, items, in_utc):
+    origins, victims = terms
+    get_params = {
+        'terms_none': '{}:{}'.format(taxonomy.slug, victims.name),
+        'timestamp_after': '2015-08-01T12:00:00Z',
+    }
+
+    histogram = get_term_histogram(taxonomy.slug, get_params)
+
+    assert histogram["Origins"] == [{'start': utc(2015, 8, 3), 'count': 2}]
+    assert histogram["Victims"] == []
+
+
+@pytest.mark.django_db
+def test_histogram_counts_in_one_query(taxonomy, items, in_utc):
+    with CaptureQueriesContext(connection) as queries:
+        get_term_histogram(taxonomy.slug, {'interval': 'week'})
+
+    # The validators, the taxonomy, the counts and the terms
+    assert len(queries) == 5
+
+
+@pytest.mark.django_db
+def test_histogram_error_for_invalid_interval(taxonomy):
+    response = get_term_histogram_response(taxonomy.slug, {'interval': 'year'})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.data['detail'] == \
+        "Invalid interval 'year', expected one of hour, day, week, month."
+
+
+@pytest.mark.django_db
+def test_histogram_error_for_non_existent_taxonomy():
+    response = get_term_histogram_response('a-taxonomy-that-does-not-exist')
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.data['detail'] == "Taxonomy with slug 'a-taxonomy-that-does-not-exist' does not exist."
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('interval', ['day', 'week', 'month'])
+def test_histogram_of_whole_days_read_from_daily_counts(
+        taxonomy, terms, interval):
+    origins, victims = terms
+    # Around midnight and the end of a month in the default time zone
+    for timestamp in (utc(2015, 7, 31, 22, 30), utc(2015, 7, 31, 23, 30),
+                      utc(2015, 8, 1, 0, 30), utc(2015, 8, 9, 12)):
+        item_at(timestamp, origins, victims)
+    item_at(None, origins)
+    get_params = {'interval': interval, 'timestamp_after': '2015-07-31'}
+
+    with CaptureQueriesContext(connection) as queries:
+        histogram = get_term_histogram(taxonomy.slug, get_params)
+
+    assert not any('data_layer_message_terms' in q['sql'] for q in queries)
+
+    items = Item.objects.filter(
+        timestamp__gte=timezone.make_aware(
+            datetime(2015, 7, 31), timezone.get_default_timezone()))
+    live = {
+        term['name']: term['counts']
+        for term in term_histogram(taxonomy, items, interval)
+    }
+    assert histogram == live
@@ -1,9 +1,11 @@
 from __future__ import unicode_literals, absolute_import
 
-from datetime import timedelta
+from datetime import datetime, timedelta
 
 import pytest
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from rest_framework.test import APIRequestFactory
 from rest_framework import status
@@ -166,9 +168,128 @@ def test_items_in_date_range_returned(questions_category_slug):
     assert term['count'] == 2
 
 
+@pytest.mark.django_db
+def test_terms_without_items_in_date_range_counted_as_zero(
+        questions_category_slug):
+    now = timezone.now().replace(
+        microsecond=0  # MySQL discards microseconds
+    )
+
+    item_too_recent = create_item(
+        body="Where did ebola came from?",
+        timestamp=now
+    ).data
+    origins = add_term(taxonomy=questions_category_slug, name="Test Origins").data
+    add_term(taxonomy=questions_category_slug, name="Test Victims")
+    categorize_item(item_too_recent, origins)
+
+    get_params = {
+        'start_time': now - timedelta(weeks=1),
+        'end_time': now - timedelta(days=1)}
+
+    with CaptureQueriesContext(connection) as queries:
+        terms = get_term_itemcount(questions_category_slug, get_params).data
+
+    counts = {term['name']: term['count'] for term in terms}
+    assert counts == {"Test Origins": 0, "Test Victims": 0}
+    # Two for the validators, one for the taxonomy, one for the counts
+    assert len(queries) == 4
+
+
+@pytest.mark.django_db
+def test_whole_days_counted_as_items_in_range(questions_category_slug):
+    midnight = timezone.make_aware(
+        datetime(2015, 8, 3), timezone.get_default_timezone())
+    origins = add_term(taxonomy=questions_category_slug, name="Test Origins").data
+    add_term(taxonomy=questions_category_slug, name="Test Victims")
+
+    # Before, at the start, inside, at the (included) end and after
+    for timestamp in (midnight - timedelta(seconds=1), midnight,
+                      midnight + timedelta(days=1, hours=12),
+                      midnight + timedelta(days=2),
+                      midnight + timedelta(days=2, seconds=1)):
+        item = create_item(body="Is ebola here?", timestamp=timestamp).data
+        categorize_item(item, origins)
+
+    get_params = {
+        'start_time': midnight,
+        'end_time': midnight + timedelta(days=2)}
+
+    with CaptureQueriesContext(connection) as queries:
+        terms = get_term_itemcount(questions_category_slug, get_params).data
+
+    counts = {term['name']: term['count'] for term in terms}
+    assert counts == {"Test Origins": 3, "Test Victims": 0}
+    # Read from the daily counts, but for the items at the very end
+    assert len([q for q in queries
+                if 'data_layer_message_terms' in q['sql']]) == 1
+
+
 @pytest.mark.django_db
 def test_error_for_non_existent_taxonomy():
     response = get_term_itemcount_response('a-taxonomy-that-does-not-exist')
 
     assert response.status_code == status.HTTP_400_BAD_REQUEST
     assert response.data['detail'] == "Taxonomy with slug 'a-taxonomy-that-does-not-exist' does not exist."
+
+
+def get_term_itemcounts_response(get_params=None):
+    request = APIRequestFactory().get("", data=get_params)
+    view = TaxonomyViewSet.as_view(actions={'get': 'itemcounts'})
+
+    return view(request)
+
+
+@pytest.mark.django_db
+def test_term_itemcounts_returns_counts_by_taxonomy(
+        questions_category_slug, regions_category):
+    item1 = create_item(body="What was the caused of ebola outbreak in liberia?").data
+    item2 = create_item(body="Is Ebola a man made sickness").data
+
+    origins = add_term(taxonomy=questions_category_slug, name="Test Origins").data
+    add_term(taxonomy=questions_category_slug, name="Test Victims")
+    monrovia = add_term(taxonomy=regions_category['slug'], name="Monrovia").data
+
+    categorize_item(item1, origins)
+    categorize_item(item2, origins)
+    categorize_item(item1, monrovia)
+
+    slugs = ','.join([questions_category_slug, regions_category['slug']])
+    response = get_term_itemcounts_response({'slugs': slugs})
+    assert status.is_success(response.status_code), response.data
+
+    counts = response.data
+    assert list(counts.keys()) == [
+        questions_category_slug, regions_category['slug']]
+    assert sorted(counts[questions_category_slug]) == sorted(
+        get_term_itemcount(questions_category_slug).data)
+    assert counts[regions_category['slug']] == \
+        get_term_itemcount(regions_category['slug']).data
+
+
+@pytest.mark.django_db
+def test_term_itemcounts_uses_one_query_for_counts(
+        questions_category_slug, regions_category):
+    item = create_item(body="Is Ebola a man made sickness").data
+    origins = add_term(taxonomy=questions_category_slug, name="Test Origins").data
+    monrovia = add_term(taxonomy=regions_category['slug'], name="Monrovia").data
+    categorize_item(item, origins)
+    categorize_item(item, monrovia)
+
+    get_params = {'slugs': [questions_category_slug, regions_category['slug']]}
+    with CaptureQueriesContext(connection) as queries:
+        response = get_term_itemcounts_response(get_params)
+
+    assert status.is_success(response.status_code), response.data
+    # Two for the validators, one for the taxonomies, one for the counts
+    assert len(queries) == 4
+
+
+@pytest.mark.django_db
+def test_term_itemcounts_error_for_non_existent_taxonomy(
+        questions_category_slug):
+    slugs = questions_category_slug + ',a-taxonomy-that-does-not-exist'
+    response = get_term_itemcounts_response({'slugs': slugs})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.data['detail'] == "Taxonomy with slug 'a-taxonomy-that-does-not-exist' does not exist."
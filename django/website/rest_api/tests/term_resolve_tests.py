@@ -0,0 +1,54 @@
+from __future__ import unicode_literals, absolute_import
+
+import pytest
+
+from rest_framework.test import APIRequestFactory
+from rest_framework import status
+
+from taxonomies.models import Term
+from taxonomies.tests.factories import TaxonomyFactory, TermFactory
+
+from ..views import TermViewSet
+
+
+def resolve_terms(terms):
+    request = APIRequestFactory().post('/terms/resolve', terms, format='json')
+    view = TermViewSet.as_view(actions={'post': 'resolve'})
+    return view(request)
+
+
+@pytest.mark.django_db
+def test_resolve_returns_term_ids_in_order():
+    terms = [TermFactory() for i in range(2)]
+
+    response = resolve_terms([
+        {'taxonomy': t.taxonomy.slug, 'name': t.name} for t in terms[::-1]
+    ])
+
+    assert status.is_success(response.status_code), response.data
+    assert [t['id'] for t in response.data] == [t.id for t in terms[::-1]]
+    assert response.data[0]['name'] == terms[1].name
+
+
+@pytest.mark.django_db
+def test_resolve_creates_missing_terms_of_open_taxonomies():
+    taxonomy = TaxonomyFactory(vocabulary='open')
+
+    response = resolve_terms([
+        {'taxonomy': taxonomy.slug, 'name': name} for name in ('a', 'b')
+    ])
+
+    assert status.is_success(response.status_code), response.data
+    created = Term.objects.filter(taxonomy=taxonomy)
+    assert set(created.values_list('id', 'name')) == set(
+        (t['id'], t['name']) for t in response.data)
+
+
+@pytest.mark.django_db
+def test_resolve_unknown_term_of_closed_taxonomy_is_bad_request():
+    taxonomy = TaxonomyFactory(vocabulary='closed')
+
+    response = resolve_terms([{'taxonomy': taxonomy.slug, 'name': 'new'}])
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.data['detail'] == "Term matching query does not exist."
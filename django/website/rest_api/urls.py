@@ -1,3 +1,5 @@
+import copy
+
 from django.conf import settings
 from rest_framework import routers
 
@@ -8,7 +10,16 @@ from .views import (
     TermViewSet,
 )
 
-router = routers.SimpleRouter()
+
+class Router(routers.SimpleRouter):
+    """ A SimpleRouter that also routes DELETE requests on the list URL to
+    the view set's bulk_destroy action, where there is one.
+    """
+    routes = copy.deepcopy(routers.SimpleRouter.routes)
+    routes[0].mapping['delete'] = 'bulk_destroy'
+
+
+router = Router()
 router.register(
     r'items',
     ItemViewSet,
@@ -24,4 +35,4 @@ router.register(
 )
 
 
-urlpatterns = router.urls if settings.DEBUG else []
+urlpatterns = router.urls if settings.REST_API_ENABLED else []
@@ -1,112 +1,672 @@
-from django.db.models import Count
+from collections import OrderedDict
+import json
+
+from django.db import transaction
+from django.db.models import Case, Count, IntegerField, Q, Sum, When
+from django.db.models.functions import Coalesce, Substr
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from django.utils.translation import ugettext as _
 
 from rest_framework import viewsets, status
 from rest_framework_bulk.mixins import BulkDestroyModelMixin
-from rest_framework.decorators import detail_route
+from rest_framework.decorators import detail_route, list_route
+from rest_framework.exceptions import ParseError
+from rest_framework.pagination import LimitOffsetPagination, _positive_int
 from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
 
 from data_layer.models import (
+    DeletedItem,
     Item,
 )
+from data_layer.search import search
 
+from taxonomies.exceptions import TermException
 from taxonomies.models import (
     Taxonomy,
     Term,
 )
 
+from .conditional import conditional, items_state, terms_state
+from .filters import midnight_date, parse_date_filter
+from .histogram import (
+    DAILY_COUNT_INTERVALS,
+    HISTOGRAM_INTERVALS,
+    term_histogram,
+    term_histogram_from_daily_counts,
+)
+from .pagination import (
+    DeletedItemPagination, ItemCursorPagination, older_than
+)
 from .serializers import (
+    BulkItemSerializer,
     ItemSerializer,
+    ItemTermSerializer,
     TaxonomySerializer,
     TermSerializer,
     TermItemCountSerializer,
 )
 
 
+# The name of an item's term in a given taxonomy (by slug). Optional
+# taxonomies have at most one term per item; for others, this is the
+# first name alphabetically.
+TERM_NAME_SQL = """
+    SELECT MIN({term}.name)
+    FROM {item_terms}
+    INNER JOIN {term} ON {term}.id = {item_terms}.term_id
+    INNER JOIN {taxonomy} ON {taxonomy}.id = {term}.taxonomy_id
+    WHERE {item_terms}.message_id = {item}.id
+    AND {taxonomy}.slug = %s
+""".format(
+    item=Item._meta.db_table,
+    item_terms=Item.terms.through._meta.db_table,
+    term=Term._meta.db_table,
+    taxonomy=Taxonomy._meta.db_table,
+)
+
+
 class ItemViewSet(viewsets.ModelViewSet, BulkDestroyModelMixin):
     serializer_class = ItemSerializer
     filter_fields = ('created', 'body', 'timestamp', )
+    ordering_fields = ('created', 'timestamp', 'body', 'network_provider',
+                       'last_modified', )
+    pagination_class = LimitOffsetPagination
+    export_chunk_size = 1000
+    # Date range get parameters, and the lookups they filter on. Ranges
+    # include their start, and exclude their end.
+    date_range_filters = {
+        'timestamp_after': 'timestamp__gte',
+        'timestamp_before': 'timestamp__lt',
+        'created_after': 'created__gte',
+        'created_before': 'created__lt',
+        'modified_since': 'last_modified__gt',
+    }
+    # Actions whose responses can be limited to some fields
+    read_actions = ('list', 'retrieve', 'export', )
+
+    @property
+    def paginator(self):
+        """ Page with a cursor if the request has a `cursor` get parameter,
+        even an empty one, or otherwise with limit and offset.
+        """
+        if not hasattr(self, '_paginator'):
+            if self.request.query_params.get('cursor') is not None:
+                self._paginator = ItemCursorPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
 
     def get_queryset(self):
         """ Return the queryset for this view.
 
-        This accepts two get parameters for filtering:
+        Items are listed newest first. Lists are paginated when a `limit`
+        get parameter is given, and start at the `offset` get parameter;
+        the response then includes the total number of matching items.
+        Alternatively lists are paginated with a `cursor` get parameter,
+        see ItemCursorPagination. The fields of the items listed are
+        limited by the `fields`, `exclude` and `body_length` get
+        parameters, see get_item_fields and get_body_length.
+
+        This accepts these get parameters for filtering:
             ids: A list of ids
+            q: Words to search item bodies for. Only items
+                matching at least one of the words are returned,
+                best matches first unless ordered otherwise.
             terms: A list of strings formatted as
-                <taxonomy slug>:<term name>.
-
-                Notes:
-
-                - Only items that have all the given
-                  terms are returned;
-                - taxonomy slugs do not allow ':'
-                  characters, so no escaping is
-                  needed.
+                <taxonomy slug>:<term name>. Only items
+                that have all the given terms are returned.
+            terms_any: Likewise, but only items that have
+                at least one of the given terms are returned.
+            terms_none: Likewise, but only items that have
+                none of the given terms are returned.
+            timestamp_after, timestamp_before, created_after,
+            created_before: Only items whose timestamp or
+                creation date is at or after, or before, the given
+                date are returned; see date_range_filters.
+            modified_since: Only items modified (including their
+                terms) after the given date are returned. With
+                `deleted`, this lets copies of the items be synced
+                with only the changes since the last sync. Items are
+                stamped when they are saved, not when their
+                transaction commits, so a change can appear after
+                later ones have been listed: syncs should ask for
+                changes since some minutes before the newest change
+                they have seen, longer than any transaction takes to
+                commit, and expect to see some changes again.
+
+                Note taxonomy slugs do not allow ':'
+                characters, so no escaping is needed.
 
         Returns:
             QuerySet: The filtered list of items
         """
-        items = Item.objects.prefetch_related('terms', 'terms__taxonomy').all()
+        items = self.filter_items(self._select_fields(Item.objects.all()))
+
+        return self._order_items(items)
+
+    @conditional('_get_list_state')
+    def list(self, request, *args, **kwargs):
+        """ List the items, see get_queryset.
+
+        Responses have ETag and Last-Modified headers, derived from the
+        matching items' latest modification and count, and requests with
+        current If-None-Match or If-Modified-Since headers get a 304
+        response without the items being fetched.
+        """
+        return super(ItemViewSet, self).list(request, *args, **kwargs)
+
+    def _get_list_state(self, request, *args, **kwargs):
+        return items_state(self.filter_queryset(self.get_queryset()))
 
+    @conditional('_get_item_state')
+    def retrieve(self, request, *args, **kwargs):
+        """ Return an item, answering conditional requests as list does """
+        return super(ItemViewSet, self).retrieve(request, *args, **kwargs)
+
+    def _get_item_state(self, request, pk, *args, **kwargs):
+        try:
+            last_modified = list(Item.objects.filter(pk=pk).values_list(
+                'last_modified', flat=True))
+        except ValueError:
+            last_modified = None
+
+        # Unknown items get the view's own error response
+        if not last_modified:
+            return None
+
+        return (last_modified[0], terms_state(Term.objects.filter(items=pk)))
+
+    def filter_items(self, items):
+        """ Filter the items on the get parameters of the request, as
+        described in get_queryset.
+
+        Args:
+            items (QuerySet): The items to filter
+        Returns:
+            QuerySet: The filtered items
+        """
         # Filter on ids
-        ids = self.request.query_params.getlist('ids')
+        ids = self._get_ids()
         if ids:
             items = items.filter(id__in=ids)
 
-        # Filter on terms
-        terms = self.request.query_params.getlist('terms', [])
-        for taxonomy_and_term in terms:
-            (taxonomy, term) = taxonomy_and_term.split(':', 1)
-            matches = Term.objects.filter(
-                name=term, taxonomy__slug=taxonomy
+        items = self._filter_terms(items)
+        items = self._filter_dates(items)
+        return self._search(items)
+
+    def _search(self, items):
+        """ Filter the items on the words of the `q` get parameter, using
+        the database's full text index; see data_layer.search.
+
+        Args:
+            items (QuerySet): The items to filter
+        Returns:
+            QuerySet: The matching items, with their `search_rank`
+        """
+        text = self.request.query_params.get('q', '').strip()
+        if not text:
+            return items
+
+        return search(items, text)
+
+    def _filter_dates(self, items):
+        """ Filter the items on the date range get parameters.
+
+        Dates are ISO 8601 dates or dates and times, or relative to the
+        current time, eg. "now-7d"; see parse_date_filter.
+
+        Args:
+            items (QuerySet): The items to filter
+        Returns:
+            QuerySet: The filtered items
+        Raises:
+            ParseError: If a date is invalid
+        """
+        filters = {}
+        for param, lookup in self.date_range_filters.items():
+            value = self._get_date_param(param)
+            if value is not None:
+                filters[lookup] = value
+
+        return items.filter(**filters)
+
+    def _get_date_param(self, param):
+        """ Return the date of the given get parameter, or None if missing
+
+        Raises:
+            ParseError: If the date is invalid
+        """
+        value = self.request.query_params.get(param)
+        if not value:
+            return None
+
+        try:
+            return parse_date_filter(value)
+        except ValueError:
+            raise ParseError(
+                _("Invalid date '%(value)s' for %(param)s.") %
+                {'value': value, 'param': param}
             )
-            if len(matches) == 0:
-                # If the term doesn't exist, there can be no matches
-                return Item.objects.none()
 
-            items = items.filter(terms__id=matches[0].id)
+    def _filter_terms(self, items):
+        """ Filter the items on the terms, terms_any and terms_none get
+        parameters.
+
+        All the terms are looked up in one query, and each parameter
+        becomes a single subquery on the item/term links, however many
+        terms it lists.
+
+        Args:
+            items (QuerySet): The items to filter
+        Returns:
+            QuerySet: The filtered items
+        """
+        params = self.request.query_params
+        all_of = set(params.getlist('terms', []))
+        any_of = set(params.getlist('terms_any', []))
+        none_of = set(params.getlist('terms_none', []))
+
+        wanted = all_of | any_of | none_of
+        if not wanted:
+            return items
+
+        pairs = {t: tuple(t.split(':', 1)) for t in wanted}
+        query = Q()
+        for taxonomy, term in pairs.values():
+            query |= Q(taxonomy__slug=taxonomy, name=term)
+        # Matched as the database matched them, ignoring case on MySQL
+        found = Term.objects.match(
+            Term.objects.filter(query).select_related('taxonomy'),
+            pairs.values())
+        term_ids = {t: found[pair].id for t, pair in pairs.items()
+                    if pair in found}
+
+        links = Item.terms.through.objects
+
+        if all_of:
+            if not all_of.issubset(term_ids):
+                # If a term doesn't exist, there can be no matches
+                return items.none()
+
+            having_all = links.filter(
+                term_id__in=[term_ids[t] for t in all_of]
+            ).values('message_id').annotate(
+                term_count=Count('term_id')
+            ).filter(term_count=len(all_of)).values('message_id')
+            items = items.filter(id__in=having_all)
+
+        if any_of:
+            any_of_ids = [term_ids[t] for t in any_of if t in term_ids]
+            if not any_of_ids:
+                return items.none()
+
+            having_any = links.filter(
+                term_id__in=any_of_ids
+            ).values('message_id')
+            items = items.filter(id__in=having_any)
+
+        none_of_ids = [term_ids[t] for t in none_of if t in term_ids]
+        if none_of_ids:
+            having_none = links.filter(
+                term_id__in=none_of_ids
+            ).values('message_id')
+            items = items.exclude(id__in=having_none)
 
         return items
 
+    def get_item_fields(self):
+        """ Return the names of the item fields requested by the `fields`
+        and `exclude` get parameters.
+
+        Each is a list of field names, comma separated or given as
+        repeated parameters. Unknown fields are ignored. All fields are
+        returned by default, and the id always is.
+
+        Returns:
+            list of str: The field names, in ItemSerializer's order
+        """
+        def get_names(param):
+            values = self.request.query_params.getlist(param)
+            return set(n for value in values for n in value.split(','))
+
+        fields = ItemSerializer.Meta.fields
+        requested = get_names('fields') & set(fields)
+        excluded = get_names('exclude')
+
+        return [f for f in fields
+                if f == 'id' or
+                ((not requested or f in requested) and f not in excluded)]
+
+    def get_body_length(self):
+        """ Return the length of body preview asked for by the
+        `body_length` get parameter, or None for the whole body.
+        """
+        try:
+            return _positive_int(
+                self.request.query_params['body_length'], strict=True)
+        except (KeyError, ValueError):
+            return None
+
+    def get_serializer(self, *args, **kwargs):
+        if self.action in self.read_actions:
+            kwargs.setdefault('fields', self.get_item_fields())
+            kwargs.setdefault('body_length', self.get_body_length())
+
+        return super(ItemViewSet, self).get_serializer(*args, **kwargs)
+
+    def _select_fields(self, items):
+        """ Only select and prefetch the columns and terms of the requested
+        item fields, and a preview of the body if one is requested.
+        """
+        if self.action not in self.read_actions:
+            return items.prefetch_related('terms', 'terms__taxonomy')
+
+        fields = self.get_item_fields()
+        columns = set(fields) - set(['terms'])
+
+        if 'terms' in fields:
+            items = items.prefetch_related('terms', 'terms__taxonomy')
+
+        body_length = self.get_body_length()
+        if body_length and 'body' in columns:
+            columns.remove('body')
+            items = items.annotate(
+                body_preview=Substr('body', 1, body_length))
+
+        # Items are paged by their creation date
+        columns.add('created')
+
+        return items.only(*columns)
+
+    def _order_items(self, items):
+        """ Order the items as given by the `ordering` get parameter, newest
+        first by default.
+
+        This is a comma separated list of fields, each optionally prefixed
+        with '-' for descending order. The fields are those in
+        ordering_fields, or terms:<taxonomy slug> for the name of the
+        item's term in that taxonomy. Unknown fields are ignored. Items
+        found by searching are listed best match first by default. The id
+        breaks any ties, so that pages never overlap.
+
+        Args:
+            items (QuerySet): The items to order
+        Returns:
+            QuerySet: The ordered items
+        """
+        ordering = []
+        fields = self.request.query_params.get('ordering', '').split(',')
+        for field in fields:
+            descending = field.startswith('-')
+            name = field[1:] if descending else field
+
+            if name in self.ordering_fields:
+                ordering.append(('-' if descending else '') + name)
+            elif name.startswith('terms:'):
+                taxonomy_slug = name.split(':', 1)[1]
+                alias = 'ordering_term_%d' % len(ordering)
+                items = items.extra(
+                    select={alias: TERM_NAME_SQL},
+                    select_params=(taxonomy_slug,)
+                )
+                ordering.append('-' + alias if descending else alias)
+
+        if not ordering:
+            if self.request.query_params.get('q', '').strip():
+                ordering = ['-search_rank', '-created']
+            else:
+                ordering = ['-created']
+
+        return items.order_by(*(ordering + ['-id']))
+
+    def _get_ids(self):
+        """ Return the ids given in the request.
+
+        Bulk deletes may list the ids in the request body instead of
+        the query string, as there can be too many for a URL.
+        """
+        ids = self.request.query_params.getlist('ids')
+        if not ids and self.request.method == 'DELETE':
+            ids = self.request.data.get('ids', [])
+
+        return ids
+
+    def allow_bulk_destroy(self, qs, filtered):
+        """ Only allow bulk deletes of explicitly listed items """
+        return len(self._get_ids()) > 0
+
+    def perform_bulk_destroy(self, objects):
+        """ Delete the given items, and their links to terms, with
+        set-based deletes in one transaction.
+
+        Returns:
+            int: The number of items deleted
+        """
+        ids = Item.objects.bulk_delete(objects.values_list('id', flat=True))
+
+        return len(ids)
+
+    def bulk_destroy(self, request, *args, **kwargs):
+        """ Delete all the items whose ids are listed in the request
+
+        Returns:
+            Response: The number of items deleted
+        """
+        qs = self.get_queryset()
+
+        filtered = self.filter_queryset(qs)
+        if not self.allow_bulk_destroy(qs, filtered):
+            data = {'detail': _("No item ids given.")}
+            return Response(data, status=status.HTTP_400_BAD_REQUEST)
+
+        count = self.perform_bulk_destroy(filtered)
+
+        return Response({'count': count}, status=status.HTTP_200_OK)
+
+    @list_route(methods=['post'])
+    def bulk_create(self, request):
+        """ Create many items, with their nested terms, in one
+        transaction.
+
+        The request data is a list of items, eg:
+            [{"body": "some text",
+              "terms": [{"taxonomy": "tags", "name": "foo"}, ...]},
+             ...]
+
+        Returns:
+            Response: The number of items created and their ids
+        """
+        serializer = BulkItemSerializer(data=request.data, many=True)
+        if not serializer.is_valid():
+            data = {
+                'detail': _("Invalid items."),
+                'errors': serializer.errors,
+            }
+            return Response(data, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            # The terms created for open taxonomies too
+            with transaction.atomic():
+                items = serializer.save()
+        except (Taxonomy.DoesNotExist, Term.DoesNotExist) as e:
+            data = {'detail': e.message}
+            return Response(data, status=status.HTTP_400_BAD_REQUEST)
+
+        data = {
+            'count': len(items),
+            'ids': [item.id for item in items],
+        }
+        return Response(data, status=status.HTTP_201_CREATED)
+
+    @list_route(methods=['get'])
+    def deleted(self, request):
+        """ List the ids of the deleted items, and when they were deleted,
+        oldest first.
+
+        With a `modified_since` get parameter, only the items deleted after
+        that date are listed. Copies of the items can be kept in sync by
+        listing the items and the deleted items modified since the last
+        sync, rather than all the items; as for the items, with some
+        overlap, see get_queryset.
+
+        The list is paginated by the `limit` and `offset` get parameters,
+        a page of DeletedItemPagination.default_limit deleted items by
+        default.
+
+        Returns:
+            Response: The total `count` of deleted items, the `next` and
+                `previous` page links, and the page's `results`, a list of
+                dictionaries with the `id` of each deleted item and when
+                it was `deleted`
+        """
+        deleted = DeletedItem.objects.order_by('deleted', 'id')
+
+        since = self._get_date_param('modified_since')
+        if since is not None:
+            deleted = deleted.filter(deleted__gt=since)
+
+        paginator = DeletedItemPagination()
+        page = paginator.paginate_queryset(
+            deleted.values_list('item_id', 'deleted'), request, view=self)
+
+        data = [
+            OrderedDict([('id', item_id), ('deleted', when)])
+            for item_id, when in page
+        ]
+
+        return paginator.get_paginated_response(data)
+
+    @list_route(methods=['get'])
+    def export(self, request):
+        """ Stream all the items matching the request's filters, newest
+        first, as newline-delimited JSON: one serialized item per line.
+
+        Items are fetched export_chunk_size at a time, paging through them
+        by their (created, id) position, so that exports of any size
+        take the same memory.
+
+        Returns:
+            StreamingHttpResponse: The items
+        """
+        items = self.filter_queryset(self.get_queryset())
+
+        response = StreamingHttpResponse(
+            self._export_chunks(items),
+            content_type='application/x-ndjson',
+        )
+        response['Content-Disposition'] = 'attachment; filename=items.ndjson'
+        return response
+
+    def _export_chunks(self, items):
+        items = items.order_by('-created', '-id')
+
+        chunk = list(items[:self.export_chunk_size])
+        while chunk:
+            serializer = self.get_serializer(chunk, many=True)
+            yield ''.join(
+                json.dumps(item, cls=JSONEncoder) + '\n'
+                for item in serializer.data
+            )
+
+            last = chunk[-1]
+            following = older_than(items, last.created, last.id)
+            chunk = list(following[:self.export_chunk_size])
+
     @detail_route(methods=['post'])
-    def add_terms(self, request, item_pk):
+    def add_terms(self, request, pk):
         try:
-            item = Item.objects.get(pk=item_pk)
+            item = Item.objects.get(pk=pk)
         except Item.DoesNotExist as e:
             data = {'detail': e.message}
             return Response(data, status=status.HTTP_404_NOT_FOUND)
 
         term_data = request.data
         try:
-            taxonomy = Taxonomy.objects.get(slug=term_data['taxonomy'])
+            item.apply_term_names(term_data['taxonomy'],
+                                  term_data.getlist('name'))
+        except (Taxonomy.DoesNotExist, Term.DoesNotExist) as e:
+            data = {'detail': e.message}
+            return Response(data, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = ItemSerializer(item)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    @list_route(methods=['post'])
+    def bulk_add_terms(self, request):
+        """ Add named terms within a taxonomy to many items at once.
+
+        The request data is eg:
+            {"ids": [1, 2, 3], "taxonomy": "ebola-questions",
+             "name": ["Vaccine"]}
+
+        As with add_terms, if the taxonomy only supports one term per item
+        the item's existing term is replaced.
+
+        Returns:
+            Response: The number of items updated
+        """
+        term_data = request.data
+        ids = term_data.get('ids', [])
+        names = term_data.get('name', [])
+        if isinstance(names, basestring):
+            names = [names]
+
+        try:
+            taxonomy = Taxonomy.objects.get(slug=term_data.get('taxonomy'))
         except Taxonomy.DoesNotExist as e:
             data = {'detail': e.message}
             return Response(data, status=status.HTTP_400_BAD_REQUEST)
 
-        terms = []
-        for term_name in term_data.getlist('name'):
-            try:
-                term = Term.objects.by_taxonomy(
-                    taxonomy=taxonomy,
-                    name=term_name,
-                )
-            except Term.DoesNotExist as e:
-                data = {'detail': e.message}
-                return Response(data, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            # Names differing in case only may give the same Term
+            terms = list(set(Term.objects.by_taxonomies(
+                (taxonomy.slug, name) for name in names
+            ).values()))
+            if len(terms) == 0:
+                raise Term.DoesNotExist("Term matching query does not exist.")
+
+            updated = Item.objects.bulk_apply_terms(ids, terms)
+        except (Term.DoesNotExist, TermException) as e:
+            data = {'detail': e.message}
+            return Response(data, status=status.HTTP_400_BAD_REQUEST)
 
-            terms.append(term)
+        return Response({'count': len(updated)}, status=status.HTTP_200_OK)
 
-        item.apply_terms(terms)
+    @list_route(methods=['post'])
+    def bulk_delete_all_terms(self, request):
+        """ Remove all terms of a taxonomy from many items at once.
 
-        serializer = ItemSerializer(item)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        The request data is eg:
+            {"ids": [1, 2, 3], "taxonomy": "ebola-questions"}
+
+        Returns:
+            Response: The number of items updated
+        """
+        taxonomy_slug = request.data.get('taxonomy')
+
+        try:
+            taxonomy = Taxonomy.objects.get(slug=taxonomy_slug)
+        except Taxonomy.DoesNotExist as e:
+            message = _("Taxonomy with slug '%s' does not exist.") % (
+                taxonomy_slug,
+            )
+
+            data = {'detail': message}
+            return Response(data, status=status.HTTP_400_BAD_REQUEST)
+
+        updated = Item.objects.bulk_delete_all_terms(
+            request.data.get('ids', []), taxonomy)
+
+        return Response({'count': len(updated)}, status=status.HTTP_200_OK)
 
     @detail_route(methods=['post'])
-    def delete_all_terms(self, request, item_pk):
+    def delete_all_terms(self, request, pk):
         taxonomy_slug = request.data['taxonomy']
 
         try:
-            item = Item.objects.get(pk=item_pk)
+            item = Item.objects.get(pk=pk)
         except Item.DoesNotExist as e:
             data = {'detail': e.message}
             return Response(data, status=status.HTTP_404_NOT_FOUND)
@@ -136,6 +696,7 @@ class TaxonomyViewSet(viewsets.ModelViewSet):
     lookup_field = 'slug'
 
     @detail_route(methods=['get'])
+    @conditional('_get_count_state')
     def itemcount(self, request, slug):
         try:
             taxonomy = Taxonomy.objects.get(slug=slug)
@@ -145,23 +706,210 @@ class TaxonomyViewSet(viewsets.ModelViewSet):
             data = {'detail': message}
             return Response(data, status=status.HTTP_400_BAD_REQUEST)
 
-        terms = self._get_terms(request, taxonomy)
+        terms = self._get_terms(request, [taxonomy])
 
         data = TermItemCountSerializer(terms, many=True).data
 
         return Response(data, status=status.HTTP_200_OK)
 
-    def _get_terms(self, request, taxonomy):
-        start_time = request.query_params.get('start_time', None)
-        end_time = request.query_params.get('end_time', None)
+    @detail_route(methods=['get'])
+    @conditional('_get_histogram_state')
+    def histogram(self, request, slug):
+        """ Count the items of each term of the taxonomy per hour, day,
+        week or month, given by the `interval` get parameter ('day' by
+        default).
 
-        filters = {'taxonomy': taxonomy}
+        The items counted are filtered by the same get parameters as the
+        item list, eg. terms, timestamp_after and timestamp_before; see
+        ItemViewSet.get_queryset.
 
-        if start_time is not None and end_time is not None:
-            filters['items__timestamp__range'] = [start_time, end_time]
+        Returns:
+            Response: The terms' counts per interval, see
+                rest_api.histogram.term_histogram
+        """
+        try:
+            taxonomy = Taxonomy.objects.get(slug=slug)
+        except Taxonomy.DoesNotExist:
+            message = _("Taxonomy with slug '%s' does not exist.") % (slug)
 
-        return Term.objects.filter(**filters).annotate(
-            count=Count('items'))
+            data = {'detail': message}
+            return Response(data, status=status.HTTP_400_BAD_REQUEST)
+
+        interval = request.query_params.get('interval', 'day')
+        if interval not in HISTOGRAM_INTERVALS:
+            raise ParseError(
+                _("Invalid interval '%(interval)s', expected one of "
+                  "%(intervals)s.") % {
+                    'interval': interval,
+                    'intervals': ', '.join(HISTOGRAM_INTERVALS),
+                }
+            )
+
+        days = self._get_histogram_days(request, interval)
+        if days is not None:
+            data = term_histogram_from_daily_counts(taxonomy, interval, *days)
+        else:
+            item_view = ItemViewSet(request=request, format_kwarg=None)
+            items = item_view.filter_items(Item.objects.all())
+
+            data = term_histogram(taxonomy, items, interval)
+
+        return Response(data, status=status.HTTP_200_OK)
+
+    def _get_histogram_days(self, request, interval):
+        """ Return the range of days to read a histogram from, if it can be
+        read from the daily term counts, or None if the items need to be
+        counted themselves.
+
+        That is for intervals of whole days, in the time zone items are
+        counted per day in, of items filtered only by timestamp_after and
+        timestamp_before at midnight.
+
+        Returns:
+            tuple: The first day, and the day after the last one,
+                either of which is None if unbounded
+        """
+        if interval not in DAILY_COUNT_INTERVALS:
+            return None
+
+        if (timezone.get_current_timezone_name() !=
+                timezone.get_default_timezone_name()):
+            return None
+
+        params = set(request.query_params) - set(['interval', 'format'])
+        if not params <= set(['timestamp_after', 'timestamp_before']):
+            return None
+
+        days = []
+        for param in ('timestamp_after', 'timestamp_before'):
+            value = request.query_params.get(param)
+            day = midnight_date(value) if value else None
+            if value and day is None:
+                return None
+            days.append(day)
+
+        return tuple(days)
+
+    @list_route(methods=['get'])
+    @conditional('_get_count_state')
+    def itemcounts(self, request):
+        """ Count the items of each term of several taxonomies, in one
+        query.
+
+        The taxonomies are given by their slugs in the `slugs` get
+        parameter, comma separated or repeated. As for itemcount, counts
+        are restricted to a time range by the `start_time` and `end_time`
+        get parameters.
+
+        Like itemcount, this answers conditional requests, see
+        ItemViewSet.list.
+
+        Returns:
+            Response: A dictionary of the terms' counts by taxonomy slug,
+                each as itemcount returns them
+        """
+        slugs = self._get_slugs(request)
+
+        taxonomies = Taxonomy.objects.filter(slug__in=slugs)
+        slugs_by_id = {t.id: t.slug for t in taxonomies}
+
+        missing = [s for s in slugs if s not in slugs_by_id.values()]
+        if missing:
+            message = _("Taxonomy with slug '%s' does not exist.") % (
+                missing[0])
+
+            data = {'detail': message}
+            return Response(data, status=status.HTTP_400_BAD_REQUEST)
+
+        terms = list(self._get_terms(request, taxonomies))
+        counts = TermItemCountSerializer(terms, many=True).data
+
+        data = OrderedDict((slug, []) for slug in slugs)
+        for term, count in zip(terms, counts):
+            data[slugs_by_id[term.taxonomy_id]].append(count)
+
+        return Response(data, status=status.HTTP_200_OK)
+
+    def _get_slugs(self, request):
+        """ Return the taxonomy slugs of the `slugs` get parameter, which
+        are comma separated or repeated
+        """
+        slugs = []
+        for value in request.query_params.getlist('slugs'):
+            slugs.extend(s for s in value.split(',') if s)
+        return slugs
+
+    def _get_count_state(self, request, slug=None):
+        """ Return the state that counts of terms depend on, for answering
+        conditional requests; see rest_api.conditional.
+
+        Changes to the terms of items update their last_modified, and
+        the terms' names and deletes are in the state of the terms of
+        the taxonomies counted.
+        """
+        slugs = [slug] if slug is not None else self._get_slugs(request)
+        terms = Term.objects.filter(taxonomy__slug__in=slugs)
+
+        return items_state(Item.objects.all()) + (terms_state(terms), )
+
+    def _get_histogram_state(self, request, slug):
+        # Date ranges may be relative to the current time, so the state
+        # is that of the items counted
+        item_view = ItemViewSet(request=request, format_kwarg=None)
+        items = item_view.filter_items(Item.objects.all())
+        terms = Term.objects.filter(taxonomy__slug=slug)
+
+        return items_state(items) + (terms_state(terms), )
+
+    def _get_terms(self, request, taxonomies):
+        """ Return all the terms of the given taxonomies, annotated with
+        their count of items in the time range of the request, if any.
+
+        Terms without items in the range are counted as 0. Items are
+        counted from the daily term counts, unless the range does not
+        start and end on whole days; then only the items in the range
+        are counted, left joined to the terms.
+        """
+        start_time = request.query_params.get('start_time', None)
+        end_time = request.query_params.get('end_time', None)
+
+        terms = Term.objects.filter(taxonomy__in=taxonomies)
+
+        if start_time is None or end_time is None:
+            return terms.annotate(
+                count=Coalesce(Sum('daily_counts__count'), 0))
+
+        start_day = midnight_date(start_time)
+        end_day = midnight_date(end_time)
+        if start_day is None or end_day is None:
+            return terms.annotate(count=Count(Case(When(
+                items__timestamp__range=[start_time, end_time],
+                then='items'
+            ))))
+
+        terms = list(terms.annotate(count=Coalesce(Sum(Case(
+            When(
+                daily_counts__day__gte=start_day,
+                daily_counts__day__lt=end_day,
+                then='daily_counts__count'
+            ),
+            output_field=IntegerField()
+        )), 0)))
+
+        # The range includes its end, which is not in the days counted
+        end = parse_date_filter(end_time)
+        if start_day <= end_day:
+            at_end = dict(Item.terms.through.objects.filter(
+                term__in=terms,
+                message__timestamp=end,
+            ).values('term_id').annotate(
+                count=Count('id')
+            ).values_list('term_id', 'count'))
+
+            for term in terms:
+                term.count += at_end.get(term.id, 0)
+
+        return terms
 
 
 class TermViewSet(viewsets.ModelViewSet):
@@ -196,3 +944,42 @@ class TermViewSet(viewsets.ModelViewSet):
             items = items.filter(taxonomy__slug=taxonomy_slug)
 
         return items
+
+    @list_route(methods=['post'])
+    def resolve(self, request):
+        """ Return the ids of many terms, given by taxonomy slug and name,
+        creating the missing terms of open taxonomies in one bulk insert;
+        see Term.objects.by_taxonomies.
+
+        The request data is a list of terms, eg:
+            [{"taxonomy": "tags", "name": "foo"}, ...]
+
+        Returns:
+            Response: The terms, in the same order, with their ids
+        """
+        serializer = ItemTermSerializer(data=request.data, many=True)
+        if not serializer.is_valid():
+            data = {
+                'detail': _("Invalid terms."),
+                'errors': serializer.errors,
+            }
+            return Response(data, status=status.HTTP_400_BAD_REQUEST)
+
+        pairs = [(t['taxonomy'], t['name'])
+                 for t in serializer.validated_data]
+        try:
+            with transaction.atomic():
+                terms = Term.objects.by_taxonomies(pairs)
+        except (Taxonomy.DoesNotExist, Term.DoesNotExist) as e:
+            data = {'detail': e.message}
+            return Response(data, status=status.HTTP_400_BAD_REQUEST)
+
+        data = [
+            OrderedDict([
+                ('taxonomy', slug),
+                ('name', name),
+                ('id', terms[(slug, name)].id),
+            ])
+            for slug, name in pairs
+        ]
+        return Response(data, status=status.HTTP_200_OK)
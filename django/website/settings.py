@@ -288,6 +288,35 @@ REST_FRAMEWORK = {
 }
 ########## END DJANGO REST FRAMEWORK
 
+########## TRANSPORT
+# How the transport package reaches the data layer API:
+#  - 'transport.backends.api.ApiBackend' dispatches requests to the API
+#    views in-process;
+#  - 'transport.backends.direct.DirectBackend' queries the models directly
+#    for the most frequent requests, skipping the request/response cycle;
+#  - 'transport.backends.http.HttpBackend' calls the API of a separate data
+#    layer host over HTTP, as configured by TRANSPORT_HTTP_OPTIONS.
+TRANSPORT_BACKEND = 'transport.backends.api.ApiBackend'
+
+TRANSPORT_HTTP_OPTIONS = {
+    # Base URL of the data layer API, eg. 'http://data.example.org/api/'
+    'URL': None,
+    # Seconds to wait to connect, and then for a response
+    'CONNECT_TIMEOUT': 3.05,
+    'READ_TIMEOUT': 30,
+    # Number of times to retry requests that fail to connect, and
+    # idempotent requests that fail with a connection error
+    'RETRIES': 2,
+    # Number of keep-alive connections kept open to the API
+    'POOL_SIZE': 10,
+    # Extra headers sent with every request, eg. for authentication
+    'HEADERS': {},
+    # Number of get responses remembered with their ETag, so that repeat
+    # requests only transfer a 304 Not Modified response if unchanged
+    'VALIDATOR_CACHE_SIZE': 100,
+}
+########## END TRANSPORT
+
 ########## BINDER STUFF
 # Usually included by adding intranet_binder as a git submodule
 # The name of the class to use to run the test suite
@@ -365,6 +394,15 @@ if DEBUG is False:
     ]
     ########## END SITE CONFIGURATION
 
+########## REST API
+# Whether the data layer API is served over HTTP (at /api/). This must be
+# enabled on the data layer hosts when the front end uses
+# transport.backends.http.HttpBackend, and those hosts should then only be
+# reachable by the front end hosts.
+if 'REST_API_ENABLED' not in globals():
+    REST_API_ENABLED = DEBUG
+########## END REST API
+
 ########## TEMPLATE CONFIGURATION
 # See: https://docs.djangoproject.com/en/dev/ref/settings/#template-context-processors
 TEMPLATE_CONTEXT_PROCESSORS = (
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import IntegrityError, connections, models, transaction
 from django.utils.text import slugify
 from django.utils.translation import ugettext_lazy as _
 
@@ -102,6 +102,158 @@ class TermManager(models.Manager):
 
         return term
 
+    def by_taxonomies(self, taxonomy_term_names):
+        """ Fetch many Terms by their Taxonomy slug and name in a handful
+        of queries.
+
+        args:
+            taxonomy_term_names: iterable of (taxonomy slug, term name) pairs
+
+        returns:
+            A dictionary mapping each (taxonomy slug, term name) pair to
+            its Term.
+
+        throws:
+            DoesNotExist if any of the Taxonomies does not exist
+            DoesNotExist if any named Term does not exist in a Taxonomy whose
+            vocabulary is not open. Missing Terms of open Taxonomies are
+            created with a single bulk insert, see _bulk_create_missing.
+
+        Names are matched the way the unique key on name and taxonomy
+        matches them, see match. On MySQL that ignores case, so asking for
+        "Liberia" gives the existing "liberia" Term rather than failing its
+        insert; elsewhere they are distinct Terms.
+        """
+        wanted = set(taxonomy_term_names)
+        if not wanted:
+            return {}
+
+        slugs = set(slug for slug, _ in wanted)
+        taxonomies = {t.slug: t for t in Taxonomy.objects.filter(slug__in=slugs)}
+        if len(taxonomies) < len(slugs):
+            raise Taxonomy.DoesNotExist(
+                "Taxonomy matching query does not exist.")
+
+        # The insert of missing Terms rolls back to a savepoint and does a
+        # locking read if it loses a race, which both need a transaction
+        with transaction.atomic():
+            terms = self._fetch(taxonomies, wanted)
+
+            missing = wanted - set(terms)
+            if missing:
+                if not all(taxonomies[slug].is_open for slug, _ in missing):
+                    raise Term.DoesNotExist(
+                        "Term matching query does not exist.")
+
+                terms.update(self._bulk_create_missing(taxonomies, missing))
+
+        return terms
+
+    def names_ignore_case(self):
+        """ Return whether the database matches Term names ignoring case,
+        as the default collations of MySQL do.
+        """
+        return connections[self.db].vendor == 'mysql'
+
+    def _name_key(self, name):
+        return name.lower() if self.names_ignore_case() else name
+
+    def match(self, terms, wanted):
+        """ Match Terms found by name to the wanted (taxonomy slug, name)
+        pairs, the way the database matched them.
+
+        If the database ignores case, it finds Terms whose names differ
+        from the wanted ones in case only. These are matched case-folded,
+        when no Term has the exact wanted name.
+
+        args:
+            terms: iterable of the Terms found, with their Taxonomies
+            wanted: iterable of (taxonomy slug, term name) pairs
+
+        returns:
+            A dictionary mapping each wanted pair that was found to its Term
+        """
+        terms = list(terms)
+        exact = {(t.taxonomy.slug, t.name): t for t in terms}
+        folded = {(t.taxonomy.slug, self._name_key(t.name)): t for t in terms}
+
+        matched = {}
+        for slug, name in wanted:
+            term = exact.get((slug, name),
+                             folded.get((slug, self._name_key(name))))
+            if term is not None:
+                matched[(slug, name)] = term
+
+        return matched
+
+    def _fetch(self, taxonomies, wanted, queryset=None):
+        """ Fetch the wanted (taxonomy slug, name) Terms that exist, by
+        (taxonomy slug, name); see match.
+        """
+        if queryset is None:
+            queryset = self.all()
+
+        names = set(name for _, name in wanted)
+        found = queryset.select_related('taxonomy').filter(
+            taxonomy__in=taxonomies.values(),
+            name__in=names,
+        )
+        return self.match(found, wanted)
+
+    # Number of times to insert the Terms that are still missing after
+    # another connection inserted some of them first
+    bulk_create_attempts = 3
+
+    def _bulk_create_missing(self, taxonomies, missing):
+        """ Create missing Terms of open Taxonomies in one bulk insert, and
+        return them by (taxonomy slug, name).
+
+        Another connection, eg. a concurrent import, may insert some of the
+        same Terms first, which fails the insert on the unique name and
+        taxonomy. The insert is rolled back to a savepoint, and the Terms
+        that are still missing are inserted again.
+
+        Names that differ in case only are inserted once if the database
+        ignores case, as they would clash on the unique key.
+
+        Must be called in a transaction.
+
+        throws:
+            IntegrityError if the Terms can't be inserted after
+            bulk_create_attempts tries
+        """
+        created = {}
+        for attempt in range(self.bulk_create_attempts):
+            to_insert = {}
+            for slug, name in sorted(missing):
+                to_insert.setdefault((slug, self._name_key(name)),
+                                     (slug, name))
+
+            try:
+                with transaction.atomic():
+                    self.bulk_create(
+                        Term(taxonomy=taxonomies[slug], name=name)
+                        for slug, name in to_insert.values()
+                    )
+            except IntegrityError:
+                if attempt == self.bulk_create_attempts - 1:
+                    raise
+
+                # A locking read, so that MySQL sees the Terms the other
+                # connection committed since our transaction started
+                inserted = self._fetch(taxonomies, missing,
+                                       self.select_for_update())
+                created.update(inserted)
+                missing = missing - set(inserted)
+                if not missing:
+                    break
+            else:
+                # Bulk inserts don't give us primary keys back
+                created.update(self._fetch(taxonomies, missing))
+                break
+
+        return created
+
 
 class Term(models.Model):
 
@@ -1,6 +1,7 @@
 from __future__ import unicode_literals, absolute_import
 
 import pytest
+from django.db import connection
 
 from ..models import Term
 from .factories import TermFactory, TaxonomyFactory
@@ -61,3 +62,92 @@ def test_unknown_term_by_taxonomy_throws_exception_if_not_open():
         )
 
     assert excinfo.value.message == "Term matching query does not exist."
+
+
+@pytest.mark.django_db
+def test_by_taxonomies_creates_missing_terms_of_open_taxonomies():
+    taxonomy = TaxonomyFactory(vocabulary='open')
+    existing = TermFactory(taxonomy=taxonomy, name="old")
+
+    terms = Term.objects.by_taxonomies(
+        [(taxonomy.slug, "old"), (taxonomy.slug, "new")])
+
+    assert terms[(taxonomy.slug, "old")] == existing
+    assert terms[(taxonomy.slug, "new")].name == "new"
+    assert Term.objects.filter(taxonomy=taxonomy).count() == 2
+
+
+@pytest.mark.django_db
+def test_bulk_create_missing_survives_terms_inserted_concurrently():
+    taxonomy = TaxonomyFactory(vocabulary='open')
+    # As if another import inserted it after we found it missing
+    concurrent = TermFactory(taxonomy=taxonomy, name="Liberia")
+
+    terms = Term.objects._bulk_create_missing(
+        {taxonomy.slug: taxonomy},
+        set([(taxonomy.slug, "Liberia"), (taxonomy.slug, "Geopoll")]),
+    )
+
+    assert terms[(taxonomy.slug, "Liberia")] == concurrent
+    assert terms[(taxonomy.slug, "Geopoll")].name == "Geopoll"
+    assert Term.objects.filter(taxonomy=taxonomy).count() == 2
+
+
+@pytest.mark.django_db
+def test_by_taxonomies_inserts_case_variants_once_if_case_is_ignored(
+        monkeypatch):
+    # As on MySQL
+    monkeypatch.setattr(Term.objects, 'names_ignore_case', lambda: True)
+    taxonomy = TaxonomyFactory(vocabulary='open')
+
+    terms = Term.objects.by_taxonomies(
+        [(taxonomy.slug, "Liberia"), (taxonomy.slug, "liberia")])
+
+    assert terms[(taxonomy.slug, "Liberia")] == terms[(taxonomy.slug, "liberia")]
+    assert Term.objects.filter(taxonomy=taxonomy).count() == 1
+
+
+@pytest.mark.django_db
+def test_by_taxonomies_keeps_case_variants_apart_if_case_matters(
+        monkeypatch):
+    # As on SQLite and PostgreSQL
+    monkeypatch.setattr(Term.objects, 'names_ignore_case', lambda: False)
+    taxonomy = TaxonomyFactory(vocabulary='open')
+    existing = TermFactory(taxonomy=taxonomy, name="liberia")
+
+    terms = Term.objects.by_taxonomies(
+        [(taxonomy.slug, "Liberia"), (taxonomy.slug, "liberia")])
+
+    assert terms[(taxonomy.slug, "liberia")] == existing
+    assert terms[(taxonomy.slug, "Liberia")].name == "Liberia"
+    assert Term.objects.filter(taxonomy=taxonomy).count() == 2
+
+
+def test_names_ignore_case_only_on_mysql():
+    assert Term.objects.names_ignore_case() == (connection.vendor == 'mysql')
+
+
+@pytest.mark.django_db
+def test_match_prefers_exact_names_then_folds_case_if_case_is_ignored(
+        monkeypatch):
+    monkeypatch.setattr(Term.objects, 'names_ignore_case', lambda: True)
+    taxonomy = TaxonomyFactory()
+    lower = TermFactory(taxonomy=taxonomy, name="liberia")
+    title = TermFactory(taxonomy=taxonomy, name="Liberia")
+    slug = taxonomy.slug
+
+    matched = Term.objects.match(
+        [lower, title],
+        [(slug, "liberia"), (slug, "Liberia"), (slug, "LIBERIA"),
+         (slug, "Guinea")])
+
+    assert matched == {
+        (slug, "liberia"): lower,
+        (slug, "Liberia"): title,
+        (slug, "LIBERIA"): matched[(slug, "LIBERIA")],
+    }
+    assert matched[(slug, "LIBERIA")] in (lower, title)
+
+    monkeypatch.setattr(Term.objects, 'names_ignore_case', lambda: False)
+    assert (slug, "LIBERIA") not in Term.objects.match(
+        [lower, title], [(slug, "LIBERIA")])
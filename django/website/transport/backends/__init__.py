@@ -0,0 +1,44 @@
+from collections import namedtuple
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+DEFAULT_BACKEND = 'transport.backends.api.ApiBackend'
+
+# What backends return. This has the same status_code and data
+# attributes as the Response objects returned by the API views.
+TransportResponse = namedtuple('TransportResponse', ('status_code', 'data'))
+
+_backends = {}
+
+
+def iter_lines(chunks):
+    """ Split an iterable of chunks of text into its lines, without the
+    line endings, as the chunks arrive.
+    """
+    pending = ''
+    for chunk in chunks:
+        lines = (pending + chunk).split('\n')
+        pending = lines.pop()
+        for line in lines:
+            yield line
+
+    if pending:
+        yield pending
+
+
+def get_backend():
+    """ Return the transport backend selected by settings.TRANSPORT_BACKEND
+
+    Backends are created once and then shared.
+
+    Returns:
+        object: The backend. This has `request` and `stream` methods, see
+            ApiBackend
+    """
+    path = getattr(settings, 'TRANSPORT_BACKEND', DEFAULT_BACKEND)
+    if path not in _backends:
+        _backends[path] = import_string(path)()
+
+    return _backends[path]
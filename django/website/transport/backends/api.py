@@ -0,0 +1,75 @@
+from rest_framework import status
+from rest_framework.test import APIRequestFactory
+
+from rest_api.views import (
+    ItemViewSet,
+    TaxonomyViewSet,
+    TermViewSet,
+)
+
+from . import TransportResponse, iter_lines
+
+
+class ApiBackend(object):
+    """ Transport backend that dispatches requests in-process to the
+    REST API views, with requests built by APIRequestFactory.
+    """
+    viewsets = {
+        'items': ItemViewSet,
+        'taxonomies': TaxonomyViewSet,
+        'terms': TermViewSet,
+    }
+
+    def __init__(self):
+        self.request_factory = APIRequestFactory()
+
+    def request(self, resource, method, action, data=None, format=None,
+                **kwargs):
+        """ Make a request to the API
+
+        Args:
+            resource (str): 'items', 'taxonomies' or 'terms'
+            method (str): HTTP method, eg. 'get'
+            action (str): View set action, eg. 'list'
+            data (dict): The query parameters of 'get' requests,
+                or the request body of other requests
+            format (str): Format of the request body, eg. 'json'.
+                Defaults to multipart.
+            **kwargs: URL keyword arguments, eg. pk
+        Returns:
+            Response: An object with the response's status_code and data
+        """
+        view = self.viewsets[resource].as_view({method: action})
+
+        if method == 'get':
+            request = self.request_factory.get('', data)
+        else:
+            build = getattr(self.request_factory, method)
+            request = build('', data, format=format)
+
+        return view(request, **kwargs)
+
+    def stream(self, resource, action, data=None, **kwargs):
+        """ Make a get request to an API action that streams its response
+        as lines of text, eg. the items export
+
+        Args:
+            resource (str): 'items', 'taxonomies' or 'terms'
+            action (str): View set action, eg. 'export'
+            data (dict): The query parameters
+            **kwargs: URL keyword arguments, eg. pk
+        Returns:
+            TransportResponse: The response's status_code, with data
+                that is an iterator over the lines of the response on
+                success, or the error details otherwise
+        """
+        view = self.viewsets[resource].as_view({'get': action})
+        response = view(self.request_factory.get('', data), **kwargs)
+
+        if not status.is_success(response.status_code):
+            return TransportResponse(response.status_code, response.data)
+
+        return TransportResponse(
+            response.status_code,
+            iter_lines(response.streaming_content)
+        )
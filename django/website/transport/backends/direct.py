@@ -0,0 +1,164 @@
+from django.http import HttpRequest, QueryDict
+from django.utils.http import urlencode
+from django.utils.translation import ugettext as _
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotFound
+from rest_framework.request import Request
+
+from data_layer.models import Item
+from rest_api.pagination import ItemCursorPagination
+from rest_api.serializers import ItemSerializer
+from rest_api.views import ItemViewSet, TaxonomyViewSet
+from taxonomies.models import Taxonomy, Term
+
+from . import TransportResponse
+from .api import ApiBackend
+
+
+def _term_to_dict(term):
+    return {
+        'taxonomy': term.taxonomy.slug,
+        'name': term.name,
+        'long_name': term.long_name,
+    }
+
+
+def _item_to_dict(item, fields):
+    """ Build the same dictionary as ItemSerializer, with the given fields,
+    but keep the dates as datetime objects.
+    """
+    data = {}
+    for name in fields:
+        if name == 'terms':
+            data[name] = [_term_to_dict(t) for t in item.terms.all()]
+        elif name == 'body':
+            # The body is deferred when there is a preview
+            data[name] = (item.body_preview if hasattr(item, 'body_preview')
+                          else item.body)
+        else:
+            data[name] = getattr(item, name)
+
+    return data
+
+
+class DirectBackend(ApiBackend):
+    """ Transport backend that answers the most frequent requests by
+    querying the models in-process, without building requests, running
+    the views and serializing the results.
+
+    The data returned has the same shape as the API's, except that dates
+    are datetime objects rather than ISO strings. Filtering reuses the
+    view sets' own get_queryset and filter_queryset, so it behaves
+    exactly as the API does. Requests that are not handled here are
+    dispatched to the API views as ApiBackend does.
+    """
+
+    def request(self, resource, method, action, data=None, format=None,
+                **kwargs):
+        handler = getattr(self, '_%s_%s' % (resource, action), None)
+        if handler is None:
+            return super(DirectBackend, self).request(
+                resource, method, action, data, format=format, **kwargs)
+
+        try:
+            return handler(data or {}, **kwargs)
+        except APIException as e:
+            # As the API's exception handler would respond
+            return TransportResponse(e.status_code, {'detail': e.detail})
+
+    def _get_view(self, viewset, action, params):
+        """ Return a view set instance set up for a GET request with the
+        given query parameters, which can be used to build querysets.
+        """
+        http_request = HttpRequest()
+        http_request.method = 'GET'
+        # Encoded as APIRequestFactory does, so values are interpreted
+        # the same way as by the API
+        http_request.GET = QueryDict(urlencode(params, doseq=True))
+
+        return viewset(
+            request=Request(http_request),
+            action=action,
+            args=(),
+            kwargs={},
+            format_kwarg=None,
+        )
+
+    def _items_list(self, params):
+        view = self._get_view(ItemViewSet, 'list', params)
+        items = view.filter_queryset(view.get_queryset())
+
+        fields = view.get_item_fields()
+
+        page = view.paginate_queryset(items)
+        if page is None:
+            data = [_item_to_dict(item, fields) for item in items]
+        # No links to other pages, as there are no URLs to link to
+        elif isinstance(view.paginator, ItemCursorPagination):
+            data = {
+                'cursor': view.paginator.get_next_cursor(),
+                'results': [_item_to_dict(item, fields) for item in page],
+            }
+        else:
+            data = {
+                'count': view.paginator.count,
+                'results': [_item_to_dict(item, fields) for item in page],
+            }
+        return TransportResponse(status.HTTP_200_OK, data)
+
+    def _items_retrieve(self, params, pk):
+        view = self._get_view(ItemViewSet, 'retrieve', params)
+        try:
+            item = view.get_queryset().get(pk=pk)
+        except (Item.DoesNotExist, ValueError):
+            data = {'detail': NotFound.default_detail}
+            return TransportResponse(status.HTTP_404_NOT_FOUND, data)
+
+        data = _item_to_dict(item, view.get_item_fields())
+        return TransportResponse(status.HTTP_200_OK, data)
+
+    def _items_add_terms(self, term_data, pk):
+        try:
+            item = Item.objects.get(pk=pk)
+        except Item.DoesNotExist as e:
+            data = {'detail': e.message}
+            return TransportResponse(status.HTTP_404_NOT_FOUND, data)
+
+        names = term_data['name']
+        if isinstance(names, basestring):
+            names = [names]
+
+        try:
+            item.apply_term_names(term_data['taxonomy'], names)
+        except (Taxonomy.DoesNotExist, Term.DoesNotExist) as e:
+            data = {'detail': e.message}
+            return TransportResponse(status.HTTP_400_BAD_REQUEST, data)
+
+        item = Item.objects.prefetch_related(
+            'terms', 'terms__taxonomy').get(pk=item.pk)
+        data = _item_to_dict(item, ItemSerializer.Meta.fields)
+        return TransportResponse(status.HTTP_200_OK, data)
+
+    def _taxonomies_itemcount(self, params, slug):
+        try:
+            taxonomy = Taxonomy.objects.get(slug=slug)
+        except Taxonomy.DoesNotExist:
+            message = _("Taxonomy with slug '%s' does not exist.") % (slug)
+
+            data = {'detail': message}
+            return TransportResponse(status.HTTP_400_BAD_REQUEST, data)
+
+        view = self._get_view(TaxonomyViewSet, 'itemcount', params)
+        terms = view._get_terms(view.request, [taxonomy])
+
+        data = [
+            {'name': t.name, 'long_name': t.long_name, 'count': t.count}
+            for t in terms
+        ]
+        return TransportResponse(status.HTTP_200_OK, data)
+
+    def _taxonomies_itemcounts(self, params):
+        view = self._get_view(TaxonomyViewSet, 'itemcounts', params)
+        response = TaxonomyViewSet.itemcounts.unconditional(view, view.request)
+
+        return TransportResponse(response.status_code, response.data)
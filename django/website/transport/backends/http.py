@@ -0,0 +1,203 @@
+from collections import OrderedDict
+import json
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import status
+from rest_framework.utils.encoders import JSONEncoder
+import requests
+from requests.adapters import HTTPAdapter
+from requests.packages.urllib3.util.retry import Retry
+
+from . import TransportResponse
+from ..exceptions import TransportException
+
+DEFAULT_OPTIONS = {
+    'URL': None,
+    'CONNECT_TIMEOUT': 3.05,
+    'READ_TIMEOUT': 30,
+    'RETRIES': 2,
+    'POOL_SIZE': 10,
+    'HEADERS': {},
+    'VALIDATOR_CACHE_SIZE': 100,
+}
+
+# Actions routed to the list URL (eg. /items/) and the detail
+# URL (eg. /items/6/) rather than to a URL of their own
+LIST_ACTIONS = ('list', 'create', 'bulk_destroy')
+DETAIL_ACTIONS = ('retrieve', 'update', 'destroy')
+
+
+class HttpBackend(object):
+    """ Transport backend that calls the REST API of a separate data layer
+    host over HTTP, as configured by settings.TRANSPORT_HTTP_OPTIONS.
+
+    Connections are kept alive and reused from a pool. Requests that fail
+    to connect are retried, as are idempotent requests that fail on a
+    connection error. The API's error responses are returned just as the
+    in-process backends return them; failures to reach the API at all
+    raise a TransportException with a 503 status code.
+
+    The most recent get responses are remembered with their ETag and
+    Last-Modified validators. Repeat requests send them, and if the API
+    answers 304 Not Modified the remembered response is returned.
+    """
+
+    def __init__(self, options=None):
+        self.options = dict(DEFAULT_OPTIONS)
+        self.options.update(
+            options or getattr(settings, 'TRANSPORT_HTTP_OPTIONS', {}))
+
+        if not self.options['URL']:
+            raise ImproperlyConfigured(
+                "TRANSPORT_HTTP_OPTIONS['URL'] must be set to use the "
+                "HTTP transport backend")
+
+        self.base_url = self.options['URL'].rstrip('/') + '/'
+        self.timeout = (
+            self.options['CONNECT_TIMEOUT'],
+            self.options['READ_TIMEOUT'],
+        )
+
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=self.options['POOL_SIZE'],
+            max_retries=Retry(
+                total=self.options['RETRIES'],
+                read=self.options['RETRIES'],
+                connect=self.options['RETRIES'],
+                backoff_factor=0.1,
+            ),
+        )
+        self.session = requests.Session()
+        self.session.headers.update(self.options['HEADERS'])
+        self.session.headers['Accept'] = 'application/json'
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        # Remembered get responses by URL, least recently used first
+        self.validated = OrderedDict()
+
+    def get_url(self, resource, action, **kwargs):
+        """ Return the URL the API's router gives to the given action
+
+        Args:
+            resource (str): 'items', 'taxonomies' or 'terms'
+            action (str): View set action, eg. 'list'
+            **kwargs: URL keyword arguments, ie. the object's pk
+                or slug for detail actions
+        Returns:
+            str: The absolute URL
+        """
+        parts = [resource]
+        parts.extend(unicode(value) for value in kwargs.values())
+        if action not in LIST_ACTIONS + DETAIL_ACTIONS:
+            parts.append(action)
+
+        return self.base_url + '/'.join(parts) + '/'
+
+    def request(self, resource, method, action, data=None, format=None,
+                **kwargs):
+        """ Make a request to the API. See ApiBackend.request """
+        url = self.get_url(resource, action, **kwargs)
+        request_kwargs = {'timeout': self.timeout}
+
+        if method == 'get':
+            return self._get(url, data, request_kwargs)
+        elif format == 'json':
+            request_kwargs['data'] = json.dumps(data, cls=JSONEncoder)
+            request_kwargs['headers'] = {'Content-Type': 'application/json'}
+        else:
+            request_kwargs['data'] = data
+
+        try:
+            response = self.session.request(method, url, **request_kwargs)
+        except requests.RequestException as e:
+            raise TransportException({
+                'detail': unicode(e),
+                'status_code': status.HTTP_503_SERVICE_UNAVAILABLE,
+            })
+
+        return TransportResponse(
+            response.status_code, self._get_data(response))
+
+    def _get(self, url, params, request_kwargs):
+        """ Make a get request, conditional on the response remembered for
+        the same URL and parameters if any.
+        """
+        # Sorted so that the same parameters always give the same URL
+        params = sorted((params or {}).items())
+        full_url = requests.Request('GET', url, params=params).prepare().url
+
+        remembered = self.validated.get(full_url)
+        if remembered is not None:
+            request_kwargs['headers'] = remembered['headers']
+
+        try:
+            response = self.session.get(full_url, **request_kwargs)
+        except requests.RequestException as e:
+            raise TransportException({
+                'detail': unicode(e),
+                'status_code': status.HTTP_503_SERVICE_UNAVAILABLE,
+            })
+
+        if (remembered is not None and
+                response.status_code == status.HTTP_304_NOT_MODIFIED):
+            self.validated[full_url] = self.validated.pop(full_url)
+            # Parsed again so callers can't alter the remembered data
+            return TransportResponse(
+                status.HTTP_200_OK, json.loads(remembered['content']))
+
+        self._remember(full_url, response)
+
+        return TransportResponse(
+            response.status_code, self._get_data(response))
+
+    def _remember(self, url, response):
+        self.validated.pop(url, None)
+
+        headers = {}
+        if 'ETag' in response.headers:
+            headers['If-None-Match'] = response.headers['ETag']
+        if 'Last-Modified' in response.headers:
+            headers['If-Modified-Since'] = response.headers['Last-Modified']
+
+        size = self.options['VALIDATOR_CACHE_SIZE']
+        if not headers or not response.ok or not size:
+            return
+
+        self.validated[url] = {'headers': headers, 'content': response.content}
+        while len(self.validated) > size:
+            self.validated.popitem(last=False)
+
+    def _get_data(self, response):
+        if not response.content:
+            return None
+
+        try:
+            return response.json()
+        except ValueError:
+            # Not from the API itself, eg. a proxy's error page
+            return {'detail': response.reason}
+
+    def stream(self, resource, action, data=None, **kwargs):
+        """ Make a streaming get request to the API. See ApiBackend.stream """
+        url = self.get_url(resource, action, **kwargs)
+
+        try:
+            response = self.session.get(
+                url, params=data, timeout=self.timeout, stream=True)
+        except requests.RequestException as e:
+            raise TransportException({
+                'detail': unicode(e),
+                'status_code': status.HTTP_503_SERVICE_UNAVAILABLE,
+            })
+
+        if not status.is_success(response.status_code):
+            return TransportResponse(
+                response.status_code, self._get_data(response))
+
+        return TransportResponse(
+            response.status_code,
+            response.iter_lines()
+        )
@@ -1,50 +1,114 @@
+import json
+
 from django.utils.dateparse import parse_datetime
-from rest_framework.test import APIRequestFactory
 from rest_framework import status
-from rest_api.views import ItemViewSet
 
+from .backends import get_backend
 from .exceptions import TransportException
 
-request_factory = APIRequestFactory()
-
 
-def get_view(actions):
-    return ItemViewSet.as_view(actions=actions)
+def _request(method, action, data=None, format=None, **kwargs):
+    """ Make a request for the Item API through the transport backend """
+    return get_backend().request(
+        'items', method, action, data, format=format, **kwargs)
 
 
 def _parse_date_fields(item):
     date_fields = ('created', 'timestamp', 'last_modified', )
     item_dict = dict(item)
     for date_field in date_fields:
+        # Not all fields may have been asked for
+        if date_field not in item_dict:
+            continue
         value = item_dict[date_field]
-        if value is not None:
+        # Some backends already give us datetimes
+        if isinstance(value, basestring):
             item_dict[date_field] = parse_datetime(value)
     return item_dict
 
 
 def list(**kwargs):
-    """ Return a list of Items
-
-    If keyword arguments are given, they are used
-    to filter the Items.
+    """ Return a list of Items, newest first
+
+    If keyword arguments are given, they are used to filter the Items,
+    eg. terms, terms_any, terms_none and modified_since; see
+    rest_api.views.ItemViewSet.get_queryset. An `ordering` keyword
+    argument orders them instead, see
+    rest_api.views.ItemViewSet._order_items. `fields` and
+    `exclude` keyword arguments, lists of field names, limit the fields of
+    the Items returned; a `body_length` keyword argument limits their
+    body to a preview of that many characters. A `q` keyword argument
+    searches the Items' bodies for its words, using the database's full
+    text index, and lists the best matches first.
+
+    Items are stamped as modified when they are saved, not when their
+    transaction commits, so syncs with modified_since should ask for the
+    changes since some minutes before the newest change they have seen,
+    and expect to see some changes again.
+
+    If a `limit` keyword argument is given, only that many Items are
+    fetched, starting at the `offset` keyword argument (0 by default),
+    and a dictionary is returned instead of a list:
+
+        {'count': <total number of matching Items>,
+         'results': <list of Items>}
+
+    If a `cursor` keyword argument is given, Items are fetched a page of
+    `limit` Items at a time by cursor instead, which stays fast however
+    deep the page is. A cursor of None fetches the first page. This
+    returns a dictionary holding the cursor of the following page, or
+    None if this is the last one:
+
+        {'cursor': <cursor of the following page>,
+         'results': <list of Items>}
     """
-    # FIXME: currently only body exact filtering is supported
-    view = get_view({'get': 'list'})
-    request = request_factory.get("", kwargs)
+    # The filters are passed through to the API as they are. An empty
+    # cursor asks it for the first page
+    if 'cursor' in kwargs and kwargs['cursor'] is None:
+        kwargs['cursor'] = ''
 
-    items = view(request).data
+    response = _request('get', 'list', kwargs)
+    if not status.is_success(response.status_code):
+        response.data['status_code'] = response.status_code
+        raise TransportException(response.data)
+
+    paginated = 'cursor' in kwargs or 'limit' in kwargs
+    items = response.data['results'] if paginated else response.data
 
     for item in items:
         item.update(_parse_date_fields(item))
 
+    if 'cursor' in kwargs:
+        return {'cursor': response.data['cursor'], 'results': items}
+    elif paginated:
+        return {'count': response.data['count'], 'results': items}
+
     return items
 
 
+def iter_all(**kwargs):
+    """ Generate all the Items, newest first, streaming them from the API
+    so that they take the same memory however many there are.
+
+    If keyword arguments are given, they are used
+    to filter the Items, as for `list`.
+
+    raises:
+       TransportException, once iterated, if the export fails
+    """
+    response = get_backend().stream('items', 'export', kwargs)
+    if not status.is_success(response.status_code):
+        response.data['status_code'] = response.status_code
+        raise TransportException(response.data)
+
+    for line in response.data:
+        if line:
+            yield _parse_date_fields(json.loads(line))
+
+
 def get(id):
     """ Return a single item specified by its id """
-    view = ItemViewSet.as_view(actions={'get': 'retrieve'})
-    request = request_factory.get("")
-    response = view(request, pk=id)
+    response = _request('get', 'retrieve', pk=id)
     if status.is_success(response.status_code):
         item = response.data
         item.update(_parse_date_fields(item))
@@ -57,9 +121,29 @@ def get(id):
 
 def create(item):
     """ Create an Item from the given dict """
-    view = get_view({'post': 'create'})
-    request = request_factory.post("", item)
-    response = view(request)
+    response = _request('post', 'create', item)
+    if status.is_success(response.status_code):
+        return response.data
+    else:
+        response.data['status_code'] = response.status_code
+        raise TransportException(response.data)
+
+
+def bulk_create(items):
+    """ Create many Items, with their nested terms, in one transaction
+
+    args:
+        items: list of item dicts. Each may have a 'terms' list of
+            {'taxonomy': <taxonomy slug>, 'name': <term name>} dicts
+
+    returns:
+        dict with the number of items created as 'count' and their
+        ids, in the order given, as 'ids'
+
+    raises:
+       TransportException on failure, in which case no items are created
+    """
+    response = _request('post', 'bulk_create', items, format='json')
     if status.is_success(response.status_code):
         return response.data
     else:
@@ -69,9 +153,7 @@ def create(item):
 
 def update(id, item):
     """ Update an Item from the given dict """
-    view = get_view({'put': 'update'})
-    request = request_factory.put("", item)
-    response = view(request, pk=id)
+    response = _request('put', 'update', item, pk=id)
     if status.is_success(response.status_code):
         return response.data
     else:
@@ -80,18 +162,79 @@ def update(id, item):
 
 
 def delete(id):
-    """ Delete the Item with the given ID """
-    view = get_view({'delete': 'destroy'})
-    request = request_factory.delete("")
-    return view(request, pk=id)
+    """ Delete the Item with the given ID
+
+    Its deletion is recorded, see list_deleted.
+    """
+    return _request('delete', 'destroy', pk=id)
+
+
+def list_deleted(**kwargs):
+    """ Return the ids of deleted Items, and when they were deleted,
+    oldest first
+
+    Together with list(modified_since=...), this lets copies of the
+    Items elsewhere be synced with only the changes since the last sync,
+    with the same overlap as list.
+
+    The deleted Items are fetched a page at a time.
+
+    args:
+        modified_since: If given, only the Items deleted after this date
+            are listed
+
+    returns:
+        A list of dictionaries with the 'id' of each deleted Item, and
+        the datetime it was 'deleted'
+
+    raises:
+       TransportException on failure
+    """
+    listed = []
+    while True:
+        params = dict(kwargs, offset=len(listed))
+        response = _request('get', 'deleted', params)
+        if not status.is_success(response.status_code):
+            response.data['status_code'] = response.status_code
+            raise TransportException(response.data)
+
+        page = response.data['results']
+        listed.extend(page)
+        if not page or len(listed) >= response.data['count']:
+            break
+
+    for deleted in listed:
+        # Some backends already give us datetimes
+        if isinstance(deleted['deleted'], basestring):
+            deleted['deleted'] = parse_datetime(deleted['deleted'])
+
+    return listed
 
 
 def bulk_delete(ids):
-    """ Delete all Items whose ids appear in the given list """
-    # DELETE http requests appear not to send query parameters so
-    # for the moment I'm mapping this onto multiple calls to delete()
-    for id in ids:
-        delete(id)
+    """ Delete all Items whose ids appear in the given list
+
+    The Items and their links to terms are deleted in one transaction,
+    and their deletion is recorded, see list_deleted.
+
+    returns:
+        dict with the number of items deleted as 'count'
+
+    raises:
+       TransportException on failure
+    """
+    if len(ids) == 0:
+        return {'count': 0}
+
+    # The ids go in the request body, as there may be too many of them
+    # for a query string
+    response = _request('delete', 'bulk_destroy', {'ids': ids},
+                        format='json')
+    if status.is_success(response.status_code):
+        return response.data
+    else:
+        response.data['status_code'] = response.status_code
+        raise TransportException(response.data)
 
 
 def add_terms(item_id, taxonomy_slug, names):
@@ -112,11 +255,8 @@ def add_terms(item_id, taxonomy_slug, names):
     The taxonomy must already exist. If the taxonomy is open, any terms that
     do not exist will be created, otherwise an exception will be raised.
     """
-    view = get_view({'post': 'add_terms'})
-
     terms = {'taxonomy': taxonomy_slug, 'name': names}
-    request = request_factory.post('', terms)
-    response = view(request, item_pk=item_id)
+    response = _request('post', 'add_terms', terms, pk=item_id)
 
     if status.is_success(response.status_code):
         return response.data
@@ -130,11 +270,59 @@ def add_terms(item_id, taxonomy_slug, names):
 
 
 def delete_all_terms(item_id, taxonomy_slug):
-    view = get_view({'post': 'delete_all_terms'})
-
     taxonomy = {'taxonomy': taxonomy_slug}
-    request = request_factory.post("", taxonomy)
-    response = view(request, item_pk=item_id)
+    response = _request('post', 'delete_all_terms', taxonomy,
+                        pk=item_id)
+
+    if not status.is_success(response.status_code):
+        response.data['status_code'] = response.status_code
+        raise TransportException(response.data)
+
+    return response.data
+
+
+def bulk_add_terms(item_ids, taxonomy_slug, names):
+    """ Add named terms `names` within the Taxonomy with `taxonomy_slug` to
+    all the Items with ids in `item_ids`, in one request.
+
+    args:
+        item_ids: e.g. [67, 68]
+        taxonomy_slug: e.g. 'ebola-questions'
+        names: name or list of names of terms in the Taxonomy
+
+    returns:
+        dict with the number of items updated as 'count'
+
+    raises:
+       TransportException on failure
+
+    As with add_terms, the taxonomy must already exist, and terms of
+    taxonomies that only allow one term per item are replaced.
+    """
+    terms = {'ids': item_ids, 'taxonomy': taxonomy_slug, 'name': names}
+    response = _request('post', 'bulk_add_terms', terms, format='json')
+
+    if not status.is_success(response.status_code):
+        response.data['status_code'] = response.status_code
+        response.data['terms'] = terms
+        raise TransportException(response.data)
+
+    return response.data
+
+
+def bulk_delete_all_terms(item_ids, taxonomy_slug):
+    """ Remove all terms of the Taxonomy with `taxonomy_slug` from all the
+    Items with ids in `item_ids`, in one request.
+
+    returns:
+        dict with the number of items updated as 'count'
+
+    raises:
+       TransportException on failure
+    """
+    taxonomy = {'ids': item_ids, 'taxonomy': taxonomy_slug}
+    response = _request('post', 'bulk_delete_all_terms', taxonomy,
+                        format='json')
 
     if not status.is_success(response.status_code):
         response.data['status_code'] = response.status_code
@@ -0,0 +1,89 @@
+from __future__ import unicode_literals, absolute_import
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+
+from data_layer.models import Item
+from taxonomies.models import Taxonomy, Term
+import transport
+
+BACKENDS = (
+    ('api', 'transport.backends.api.ApiBackend'),
+    ('direct', 'transport.backends.direct.DirectBackend'),
+)
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = """Compares the speed of the transport backends on list, get,
+    itemcount and add_terms. The test data is created in a transaction
+    which is rolled back at the end."""
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=1000,
+                            help='Number of items to create')
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Number of times each operation is run')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._benchmark(options['items'], options['repeat'])
+                raise Rollback()
+        except Rollback:
+            pass
+
+    def _create_data(self, count):
+        taxonomy = Taxonomy.objects.create(name='Benchmark Categories')
+        terms = [Term.objects.create(taxonomy=taxonomy, name='Term %d' % i)
+                 for i in range(5)]
+        items = Item.objects.bulk_create_with_terms([
+            (Item(body='Benchmark item %d' % i), [terms[i % len(terms)]])
+            for i in range(count)
+        ])
+        return taxonomy, terms, items
+
+    def _time(self, repeat, function, *args, **kwargs):
+        best = None
+        for i in range(repeat):
+            start = time.time()
+            function(*args, **kwargs)
+            elapsed = time.time() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    def _benchmark(self, count, repeat):
+        taxonomy, terms, items = self._create_data(count)
+        item_id = items[0].id
+
+        operations = (
+            ('list', transport.items.list, (), {}),
+            ('get', transport.items.get, (item_id, ), {}),
+            ('itemcount', transport.taxonomies.term_itemcount,
+             (taxonomy.slug, ), {}),
+            ('itemcounts', transport.taxonomies.term_itemcounts,
+             ([taxonomy.slug], ), {}),
+            ('add_terms', transport.items.add_terms,
+             (item_id, taxonomy.slug, terms[1].name), {}),
+        )
+
+        self.stdout.write('%d items, best of %d runs (seconds)' % (
+            count, repeat))
+        self.stdout.write('%-12s%12s%12s%10s' % (
+            'operation', 'api', 'direct', 'speedup'))
+
+        for name, function, args, kwargs in operations:
+            timings = []
+            for label, backend in BACKENDS:
+                with override_settings(TRANSPORT_BACKEND=backend):
+                    timings.append(
+                        self._time(repeat, function, *args, **kwargs))
+
+            self.stdout.write('%-12s%12.4f%12.4f%9.1fx' % (
+                name, timings[0], timings[1], timings[0] / timings[1]))
@@ -1,15 +1,14 @@
-from rest_api.views import TaxonomyViewSet
-from rest_framework.test import APIRequestFactory
+from django.utils.dateparse import parse_datetime
 from rest_framework import status
 
+from .backends import get_backend
 from .exceptions import TransportException
-from .terms import list as terms_list
 
-request_factory = APIRequestFactory()
 
-
-def get_view(actions):
-    return TaxonomyViewSet.as_view(actions)
+def _request(method, action, data=None, format=None, **kwargs):
+    """ Make a request for the Taxonomy API through the transport backend """
+    return get_backend().request(
+        'taxonomies', method, action, data, format=format, **kwargs)
 
 
 def list(**kwargs):
@@ -19,42 +18,94 @@ def list(**kwargs):
     to filter the Taxonomies.
     """
 
-    view = get_view(actions={'get': 'list'})
-    request = request_factory.get("", kwargs)
-    return view(request).data
+    return _request('get', 'list', kwargs).data
 
 
-def _add_zero_counts_for_missing_terms(slug, itemcounts):
-    # We want to return zero counts for terms that fall outside the date range,
-    # which the API doesn't do for us. So we need to get all the terms for the
-    # taxonomy and set any that aren't in the date range results to count: 0
-    all_terms = terms_list(taxonomy=slug)
+def term_itemcount(slug, **kwargs):
+    """ Return the count of items of each term of a taxonomy
 
-    itemcounts_by_name = {t['name']: t for t in itemcounts}
+    If `start_time` and `end_time` keyword arguments are given, only
+    the items whose timestamp is in that range are counted. Every term
+    of the taxonomy is listed, with a count of 0 if it has no items.
 
-    new_itemcounts = []
+    args:
+        slug: The slug of the taxonomy
 
-    for term in all_terms:
-        if term['name'] not in itemcounts_by_name:
-            term['count'] = 0
-        else:
-            term = itemcounts_by_name[term['name']]
+    returns:
+        A list of dictionaries holding each term's name, long_name and
+        count
 
-        new_itemcounts.append(term)
+    raises:
+        TransportException if the taxonomy does not exist
+    """
+    response = _request('get', 'itemcount', kwargs, slug=slug)
 
-    return new_itemcounts
+    if not status.is_success(response.status_code):
+        response.data['status_code'] = response.status_code
+        raise TransportException(response.data)
 
+    return response.data
 
-def term_itemcount(slug, **kwargs):
-    view = get_view(actions={'get': 'itemcount'})
-    request = request_factory.get("", kwargs)
-    response = view(request, slug=slug)
+
+def term_itemcounts(slugs, **kwargs):
+    """ Return the count of items of each term of several taxonomies
+
+    The counts are all computed by one request and query. Keyword
+    arguments are as for term_itemcount, eg. start_time and end_time.
+
+    args:
+        slugs: The slugs of the taxonomies
+
+    returns:
+        A dictionary of the taxonomies' item counts, as term_itemcount
+        returns them, by taxonomy slug
+
+    raises:
+        TransportException if any of the taxonomies does not exist
+    """
+    params = dict(kwargs, slugs=','.join(slugs))
+    response = _request('get', 'itemcounts', params)
+
+    if not status.is_success(response.status_code):
+        response.data['status_code'] = response.status_code
+        raise TransportException(response.data)
+
+    return response.data
+
+
+def term_histogram(slug, interval='day', **kwargs):
+    """ Return the count of items of each term of a taxonomy per hour,
+    day, week or month
+
+    The counts are computed by one request and query. Other keyword
+    arguments filter the items counted as for transport.items.list, eg.
+    terms, timestamp_after and timestamp_before.
+
+    args:
+        slug: The slug of the taxonomy
+        interval: 'hour', 'day', 'week' or 'month'
+
+    returns:
+        A list of dictionaries holding each term's name, long_name and
+        counts. The counts are a list of dictionaries holding the start
+        datetime of each interval with items, and their count, oldest
+        first.
+
+    raises:
+        TransportException if the taxonomy does not exist, or the
+        interval is invalid
+    """
+    params = dict(kwargs, interval=interval)
+    response = _request('get', 'histogram', params, slug=slug)
 
     if not status.is_success(response.status_code):
         response.data['status_code'] = response.status_code
         raise TransportException(response.data)
 
-    if 'start_time' not in kwargs or 'end_time' not in kwargs:
-        return response.data
+    for term in response.data:
+        for count in term['counts']:
+            # Some backends already give us datetimes
+            if isinstance(count['start'], basestring):
+                count['start'] = parse_datetime(count['start'])
 
-    return _add_zero_counts_for_missing_terms(slug, response.data)
+    return response.data
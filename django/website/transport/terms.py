@@ -1,23 +1,20 @@
-from rest_api.views import TermViewSet
-from rest_framework.test import APIRequestFactory
 from rest_framework import status
 
+from .backends import get_backend
 from .exceptions import TransportException
 
 
-request_factory = APIRequestFactory()
-
-
-def get_view(actions):
-    """ Return the view to perform the given action.
+def _request(method, action, data=None, format=None, **kwargs):
+    """ Make a request for the Term API through the transport backend.
 
     Args:
-        actions (dict): Dictionary of actions, eg.
-            {'get': 'list'}
+        method (str): HTTP method, eg. 'get'
+        action (str): View set action, eg. 'list'
     Returns:
-        View: A view object
+        Response: The response, with status_code and data
     """
-    return TermViewSet.as_view(actions)
+    return get_backend().request(
+        'terms', method, action, data, format=format, **kwargs)
 
 
 def list(**kwargs):
@@ -36,12 +33,64 @@ def list(**kwargs):
             'status_code' is set to the response
             status code.
     """
-    view = get_view(actions={'get': 'list'})
-    request = request_factory.get("", kwargs)
-    response = view(request)
+    response = _request('get', 'list', kwargs)
 
     if not status.is_success(response.status_code):
         response.data['status_code'] = response.status_code
         raise TransportException(response.data)
 
     return response.data
+
+
+def resolve(taxonomy_term_names):
+    """ Return the ids of many Terms, given by taxonomy slug and name
+
+    Missing Terms of open taxonomies are created in one bulk insert.
+
+    Args:
+        taxonomy_term_names: iterable of (taxonomy slug, term name) pairs
+    Returns:
+        dict: The id of each (taxonomy slug, term name) pair's Term
+    Raises:
+        TransportException: On transport failure, eg. if a Taxonomy,
+            or a Term of a Taxonomy that is not open, does not exist.
+            'status_code' is set to the response status code.
+    """
+    data = [{'taxonomy': slug, 'name': name}
+            for slug, name in set(taxonomy_term_names)]
+    if not data:
+        return {}
+
+    response = _request('post', 'resolve', data, format='json')
+
+    if not status.is_success(response.status_code):
+        response.data['status_code'] = response.status_code
+        raise TransportException(response.data)
+
+    return {(t['taxonomy'], t['name']): t['id'] for t in response.data}
+
+
+class TermResolver(object):
+    """ Resolve Terms to their ids, remembering them, so that each Term is
+    looked up (or created) once however often it is resolved; eg. the same
+    few Terms of every row of an import.
+
+    The ids are remembered for the life of the resolver, so one resolver
+    should be used per import, or similar unit of work.
+    """
+
+    def __init__(self):
+        self.ids = {}
+
+    def resolve(self, taxonomy_term_names):
+        """ Return the ids of the Terms of (taxonomy slug, term name) pairs,
+        asking for only those not resolved before in one request; see
+        resolve.
+
+        Raises:
+            TransportException: As resolve
+        """
+        wanted = set(taxonomy_term_names)
+        self.ids.update(resolve(wanted - set(self.ids)))
+
+        return {pair: self.ids[pair] for pair in wanted}
@@ -0,0 +1,168 @@
+from __future__ import unicode_literals, absolute_import
+
+from datetime import datetime
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from data_layer.tests.factories import ItemFactory
+from taxonomies.tests.factories import TermFactory
+import transport
+from ..backends import get_backend
+from ..backends.api import ApiBackend
+from ..backends.direct import DirectBackend
+from ..exceptions import TransportException
+
+API_BACKEND = 'transport.backends.api.ApiBackend'
+DIRECT_BACKEND = 'transport.backends.direct.DirectBackend'
+
+
+@pytest.fixture
+def term():
+    return TermFactory()
+
+
+@pytest.fixture
+def items(term):
+    items = [ItemFactory() for i in range(3)]
+    items[0].terms.add(term)
+    return items
+
+
+def with_backend(settings, backend, function, *args, **kwargs):
+    settings.TRANSPORT_BACKEND = backend
+    return function(*args, **kwargs)
+
+
+def test_backend_is_selected_by_setting(settings):
+    settings.TRANSPORT_BACKEND = API_BACKEND
+    assert type(get_backend()) is ApiBackend
+
+    settings.TRANSPORT_BACKEND = DIRECT_BACKEND
+    assert type(get_backend()) is DirectBackend
+
+
+# Transactional, as MySQL's text index only sees committed rows
+@pytest.mark.django_db(transaction=True)
+def test_backends_list_the_same_items(settings, items, term):
+    term_filter = '{}:{}'.format(term.taxonomy.slug, term.name)
+
+    for filters in ({}, {'terms': [term_filter]}, {'body': items[1].body},
+                    {'limit': 2, 'offset': 1}, {'cursor': None, 'limit': 2},
+                    {'fields': ['body', 'terms'], 'body_length': 3},
+                    {'q': items[2].body}):
+        api_items = with_backend(
+            settings, API_BACKEND, transport.items.list, **filters)
+        direct_items = with_backend(
+            settings, DIRECT_BACKEND, transport.items.list, **filters)
+
+        assert direct_items == api_items
+
+
+@pytest.mark.django_db
+def test_direct_backend_lists_body_previews_in_one_query(settings, items):
+    settings.TRANSPORT_BACKEND = DIRECT_BACKEND
+
+    with CaptureQueriesContext(connection) as queries:
+        listed = transport.items.list(fields=['body'], body_length=3)
+
+    assert len(queries) == 1
+    assert set(i['body'] for i in listed) == set(
+        item.body[:3] for item in items)
+
+
+@pytest.mark.django_db
+def test_direct_backend_gives_native_datetimes(settings, items):
+    settings.TRANSPORT_BACKEND = DIRECT_BACKEND
+
+    item = transport.items.get(items[0].id)
+
+    assert isinstance(item['created'], datetime)
+    assert item['created'] == items[0].created
+
+
+@pytest.mark.django_db
+def test_backends_get_the_same_item(settings, items):
+    api_item = with_backend(
+        settings, API_BACKEND, transport.items.get, items[0].id)
+    direct_item = with_backend(
+        settings, DIRECT_BACKEND, transport.items.get, items[0].id)
+
+    assert direct_item == api_item
+
+
+@pytest.mark.django_db
+def test_direct_backend_get_fails_for_unknown_id(settings):
+    settings.TRANSPORT_BACKEND = DIRECT_BACKEND
+    UNKNOWN_ITEM_ID = 6
+
+    with pytest.raises(TransportException) as excinfo:
+        transport.items.get(UNKNOWN_ITEM_ID)
+
+    error = excinfo.value.message
+    assert error['status_code'] == 404
+    assert error['detail'] == 'Not found.'
+
+
+@pytest.mark.django_db
+def test_backends_count_the_same_terms(settings, items, term):
+    api_counts = with_backend(
+        settings, API_BACKEND,
+        transport.taxonomies.term_itemcount, term.taxonomy.slug)
+    direct_counts = with_backend(
+        settings, DIRECT_BACKEND,
+        transport.taxonomies.term_itemcount, term.taxonomy.slug)
+
+    assert direct_counts == api_counts
+    assert direct_counts[0]['count'] == 1
+
+
+@pytest.mark.django_db
+def test_backends_count_the_same_terms_of_many_taxonomies(
+        settings, items, term):
+    slugs = [term.taxonomy.slug, TermFactory().taxonomy.slug]
+
+    api_counts = with_backend(
+        settings, API_BACKEND, transport.taxonomies.term_itemcounts, slugs)
+    direct_counts = with_backend(
+        settings, DIRECT_BACKEND, transport.taxonomies.term_itemcounts, slugs)
+
+    assert direct_counts == api_counts
+
+
+@pytest.mark.django_db
+def test_direct_backend_itemcount_fails_for_unknown_taxonomy(settings):
+    settings.TRANSPORT_BACKEND = DIRECT_BACKEND
+
+    with pytest.raises(TransportException) as excinfo:
+        transport.taxonomies.term_itemcount('unknown-slug')
+
+    error = excinfo.value.message
+    assert error['status_code'] == 400
+    assert error['detail'] == "Taxonomy with slug 'unknown-slug' does not exist."
+
+
+@pytest.mark.django_db
+def test_direct_backend_adds_terms(settings, items):
+    settings.TRANSPORT_BACKEND = DIRECT_BACKEND
+    term = TermFactory()
+
+    item = transport.items.add_terms(
+        items[1].id, term.taxonomy.slug, term.name)
+
+    assert [t['name'] for t in item['terms']] == [term.name]
+    assert list(items[1].terms.all()) == [term]
+
+
+@pytest.mark.django_db
+def test_direct_backend_add_terms_fails_for_unknown_term(settings, items):
+    settings.TRANSPORT_BACKEND = DIRECT_BACKEND
+    term = TermFactory()
+
+    with pytest.raises(TransportException) as excinfo:
+        transport.items.add_terms(items[1].id, term.taxonomy.slug, 'unknown')
+
+    error = excinfo.value.message
+    assert error['status_code'] == 400
+    assert error['detail'] == "Term matching query does not exist."
+    assert error['item_id'] == items[1].id
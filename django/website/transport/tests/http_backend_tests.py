@@ -0,0 +1,207 @@
+from __future__ import unicode_literals, absolute_import
+
+import socket
+
+import pytest
+
+from django.core.exceptions import ImproperlyConfigured
+
+from data_layer.models import Item
+from data_layer.tests.factories import ItemFactory
+from taxonomies.tests.factories import TermFactory
+import transport
+from .. import backends
+from ..backends.http import HttpBackend
+from ..exceptions import TransportException
+
+HTTP_BACKEND = 'transport.backends.http.HttpBackend'
+
+
+@pytest.fixture
+def http_backend(live_server, settings, monkeypatch):
+    backend = HttpBackend({'URL': live_server.url + '/api/'})
+
+    settings.TRANSPORT_BACKEND = HTTP_BACKEND
+    monkeypatch.setitem(backends._backends, HTTP_BACKEND, backend)
+
+    return backend
+
+
+def unused_port():
+    sock = socket.socket()
+    sock.bind(('localhost', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+
+    return port
+
+
+def test_http_backend_needs_url():
+    with pytest.raises(ImproperlyConfigured):
+        HttpBackend({'URL': None})
+
+
+def test_http_backend_builds_router_urls():
+    backend = HttpBackend({'URL': 'http://data.example.com/api'})
+
+    assert backend.get_url('items', 'list') == \
+        'http://data.example.com/api/items/'
+    assert backend.get_url('items', 'retrieve', pk=6) == \
+        'http://data.example.com/api/items/6/'
+    assert backend.get_url('items', 'add_terms', pk=6) == \
+        'http://data.example.com/api/items/6/add_terms/'
+    assert backend.get_url('items', 'bulk_add_terms') == \
+        'http://data.example.com/api/items/bulk_add_terms/'
+    assert backend.get_url('taxonomies', 'itemcount', slug='ebola') == \
+        'http://data.example.com/api/taxonomies/ebola/itemcount/'
+
+
+@pytest.mark.django_db(transaction=True)
+def test_http_backend_lists_items(http_backend):
+    term = TermFactory()
+    items = [ItemFactory() for i in range(3)]
+    items[0].terms.add(term)
+
+    listed = transport.items.list()
+    assert set(i['id'] for i in listed) == set(i.id for i in items)
+
+    term_filter = '{}:{}'.format(term.taxonomy.slug, term.name)
+    [listed] = transport.items.list(terms=[term_filter])
+    assert listed['id'] == items[0].id
+
+
+@pytest.mark.django_db(transaction=True)
+def test_http_backend_creates_and_gets_item(http_backend):
+    created = transport.items.create({'body': "Text over HTTP"})
+
+    item = transport.items.get(created['id'])
+
+    assert item['body'] == "Text over HTTP"
+
+
+@pytest.mark.django_db(transaction=True)
+def test_http_backend_get_fails_for_unknown_id(http_backend):
+    UNKNOWN_ITEM_ID = 6
+
+    with pytest.raises(TransportException) as excinfo:
+        transport.items.get(UNKNOWN_ITEM_ID)
+
+    error = excinfo.value.message
+    assert error['status_code'] == 404
+    assert error['detail'] == 'Not found.'
+
+
+@pytest.mark.django_db(transaction=True)
+def test_http_backend_adds_terms(http_backend):
+    item = ItemFactory()
+    term = TermFactory()
+
+    updated = transport.items.add_terms(
+        item.id, term.taxonomy.slug, term.name)
+
+    assert [t['name'] for t in updated['terms']] == [term.name]
+    assert list(item.terms.all()) == [term]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_http_backend_add_terms_fails_for_unknown_term(http_backend):
+    item = ItemFactory()
+    term = TermFactory()
+
+    with pytest.raises(TransportException) as excinfo:
+        transport.items.add_terms(item.id, term.taxonomy.slug, 'unknown')
+
+    error = excinfo.value.message
+    assert error['status_code'] == 400
+    assert error['detail'] == "Term matching query does not exist."
+    assert error['item_id'] == item.id
+
+
+@pytest.mark.django_db(transaction=True)
+def test_http_backend_bulk_deletes_items(http_backend):
+    items = [ItemFactory() for i in range(3)]
+
+    result = transport.items.bulk_delete([items[0].id, items[1].id])
+
+    assert result['count'] == 2
+    assert list(Item.objects.all()) == [items[2]]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_http_backend_counts_terms(http_backend):
+    term = TermFactory()
+    item = ItemFactory()
+    item.terms.add(term)
+
+    [count] = transport.taxonomies.term_itemcount(term.taxonomy.slug)
+
+    assert count['name'] == term.name
+    assert count['count'] == 1
+
+    counts = transport.taxonomies.term_itemcounts([term.taxonomy.slug])
+
+    assert counts == {term.taxonomy.slug: [count]}
+
+    [histogram] = transport.taxonomies.term_histogram(term.taxonomy.slug)
+
+    assert [c['count'] for c in histogram['counts']] == [1]
+    assert histogram['counts'][0]['start'] <= item.timestamp
+
+
+@pytest.mark.django_db(transaction=True)
+def test_http_backend_itemcount_fails_for_unknown_taxonomy(http_backend):
+    with pytest.raises(TransportException) as excinfo:
+        transport.taxonomies.term_itemcount('unknown-slug')
+
+    error = excinfo.value.message
+    assert error['status_code'] == 400
+    assert error['detail'] == "Taxonomy with slug 'unknown-slug' does not exist."
+
+
+def test_http_backend_raises_503_when_api_unreachable(settings, monkeypatch):
+    url = 'http://localhost:{}/api/'.format(unused_port())
+    backend = HttpBackend({'URL': url, 'RETRIES': 0})
+
+    settings.TRANSPORT_BACKEND = HTTP_BACKEND
+    monkeypatch.setitem(backends._backends, HTTP_BACKEND, backend)
+
+    with pytest.raises(TransportException) as excinfo:
+        transport.items.get(6)
+
+    error = excinfo.value.message
+    assert error['status_code'] == 503
+
+
+@pytest.mark.django_db(transaction=True)
+def test_http_backend_streams_all_items(http_backend):
+    items = [ItemFactory() for i in range(3)]
+
+    generated = list(transport.items.iter_all())
+
+    assert [i['id'] for i in generated] == [i.id for i in reversed(items)]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_http_backend_remembers_unchanged_responses(http_backend):
+    item = ItemFactory()
+    session_get = http_backend.session.get
+    responses = []
+
+    def get(*args, **kwargs):
+        response = session_get(*args, **kwargs)
+        responses.append(response)
+        return response
+
+    http_backend.session.get = get
+
+    first = transport.items.list(ids=[item.id])
+    second = transport.items.list(ids=[item.id])
+
+    assert [r.status_code for r in responses] == [200, 304]
+    assert second == first
+
+    transport.items.update(item.id, {'body': "Changed"})
+    [changed] = transport.items.list(ids=[item.id])
+
+    assert responses[-1].status_code == 200
+    assert changed['body'] == "Changed"
@@ -0,0 +1,49 @@
+from __future__ import unicode_literals, absolute_import
+import pytest
+
+from data_layer.models import Item
+from taxonomies.tests.factories import TaxonomyFactory, TermFactory
+from transport import items
+from ..exceptions import TransportException
+
+
+@pytest.fixture
+def item_ids():
+    return [items.create({'body': "Item %d" % i})['id'] for i in range(3)]
+
+
+@pytest.mark.django_db
+def test_terms_can_be_added_to_many_items(item_ids):
+    term = TermFactory()
+
+    response = items.bulk_add_terms(item_ids, term.taxonomy.slug, term.name)
+
+    assert response['count'] == 3
+    for item in Item.objects.filter(id__in=item_ids):
+        assert list(item.terms.all()) == [term]
+
+
+@pytest.mark.django_db
+def test_terms_can_be_removed_from_many_items(item_ids):
+    term = TermFactory()
+    items.bulk_add_terms(item_ids, term.taxonomy.slug, term.name)
+
+    response = items.bulk_delete_all_terms(item_ids, term.taxonomy.slug)
+
+    assert response['count'] == 3
+    for item in Item.objects.filter(id__in=item_ids):
+        assert item.terms.count() == 0
+
+
+@pytest.mark.django_db
+def test_bulk_add_terms_fails_if_term_does_not_exist(item_ids):
+    taxonomy = TaxonomyFactory()
+
+    with pytest.raises(TransportException) as excinfo:
+        items.bulk_add_terms(item_ids, taxonomy.slug, "unknown term name")
+
+    error = excinfo.value.message
+
+    assert error['status_code'] == 400
+    assert error['detail'] == "Term matching query does not exist."
+    assert error['terms']['name'] == "unknown term name"
@@ -0,0 +1,40 @@
+from __future__ import unicode_literals, absolute_import
+import pytest
+
+from taxonomies.tests.factories import TermFactory
+from transport import items
+from ..exceptions import TransportException
+
+
+@pytest.mark.django_db
+def test_bulk_create_creates_items_with_terms():
+    term = TermFactory()
+    term_data = {'taxonomy': term.taxonomy.slug, 'name': term.name}
+
+    response = items.bulk_create([
+        {'body': "one", 'terms': [term_data]},
+        {'body': "two", 'terms': [term_data]},
+    ])
+
+    assert response['count'] == 2
+    listed = items.list()
+    assert len(listed) == 2
+    for item in listed:
+        [item_term] = item['terms']
+        assert item_term['taxonomy'] == term.taxonomy.slug
+        assert item_term['name'] == term.name
+
+
+@pytest.mark.django_db
+def test_bulk_create_throws_exception_for_unknown_term():
+    term = TermFactory()
+
+    with pytest.raises(TransportException) as excinfo:
+        items.bulk_create([{
+            'body': "one",
+            'terms': [{'taxonomy': term.taxonomy.slug, 'name': 'unknown'}],
+        }])
+
+    error = excinfo.value.message
+    assert error['status_code'] == 400
+    assert error['detail'] == "Term matching query does not exist."
@@ -2,6 +2,7 @@ from __future__ import unicode_literals, absolute_import
 import pytest
 
 from data_layer.tests.factories import ItemFactory
+from rest_api.pagination import DeletedItemPagination
 from transport import items
 
 
@@ -22,6 +23,42 @@ def test_bulk_delete():
     ids = [ItemFactory().id for i in range(10)]
     assert len(items.list()) == 11
 
-    items.bulk_delete(ids)
+    response = items.bulk_delete(ids)
 
+    assert response['count'] == 10
     assert len(items.list()) == 1
+
+
+@pytest.mark.django_db
+def test_bulk_delete_of_no_ids_deletes_nothing():
+    ItemFactory()
+
+    response = items.bulk_delete([])
+
+    assert response['count'] == 0
+    assert len(items.list()) == 1
+
+
+@pytest.mark.django_db
+def test_deleted_items_are_listed():
+    ItemFactory()
+    deleted = ItemFactory().id
+    bulk_deleted = [ItemFactory().id for i in range(2)]
+
+    items.delete(deleted)
+    items.bulk_delete(bulk_deleted)
+
+    listed = items.list_deleted()
+    assert [d['id'] for d in listed] == [deleted] + bulk_deleted
+
+    since = items.list_deleted(modified_since=listed[0]['deleted'].isoformat())
+    assert [d['id'] for d in since] == bulk_deleted
+
+
+@pytest.mark.django_db
+def test_deleted_items_are_listed_a_page_at_a_time(monkeypatch):
+    monkeypatch.setattr(DeletedItemPagination, 'default_limit', 2)
+    deleted = [ItemFactory().id for i in range(5)]
+    items.bulk_delete(deleted)
+
+    assert [d['id'] for d in items.list_deleted()] == deleted
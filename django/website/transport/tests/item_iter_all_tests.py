@@ -0,0 +1,47 @@
+from __future__ import unicode_literals, absolute_import
+
+from datetime import datetime
+import types
+
+import pytest
+
+from data_layer.tests.factories import ItemFactory
+from taxonomies.tests.factories import TermFactory
+import transport
+from ..backends import iter_lines
+
+
+@pytest.mark.django_db
+def test_iter_all_is_a_generator():
+    ItemFactory()
+
+    assert isinstance(transport.items.iter_all(), types.GeneratorType)
+
+
+@pytest.mark.django_db
+def test_iter_all_generates_all_items():
+    term = TermFactory()
+    items = [ItemFactory() for i in range(3)]
+    items[1].terms.add(term)
+
+    generated = list(transport.items.iter_all())
+
+    assert [i['id'] for i in generated] == [i.id for i in reversed(items)]
+    assert isinstance(generated[0]['created'], datetime)
+    assert generated[1]['terms'][0]['name'] == term.name
+
+
+@pytest.mark.django_db
+def test_iter_all_filters_items():
+    ItemFactory(body="one")
+    ItemFactory(body="two")
+
+    generated = list(transport.items.iter_all(body="one"))
+
+    assert [i['body'] for i in generated] == ["one"]
+
+
+def test_iter_lines_splits_lines_across_chunks():
+    chunks = ['{"a": 1}\n{"b"', ': 2}\n', '{"c": 3}']
+
+    assert list(iter_lines(chunks)) == ['{"a": 1}', '{"b": 2}', '{"c": 3}']
@@ -2,9 +2,12 @@ from __future__ import unicode_literals, absolute_import
 
 from datetime import datetime
 import pytest
+import pytz
 
 from data_layer.tests.factories import ItemFactory
+from taxonomies.tests.factories import TermFactory
 import transport
+from ..exceptions import TransportException
 
 
 @pytest.mark.django_db
@@ -62,3 +65,86 @@ def test_null_date_field_not_converted_to_datetime():
     [retrieved_item] = retrieved_items
 
     assert retrieved_item['timestamp'] is None
+
+
+@pytest.mark.django_db
+def test_list_items_returns_page_and_count_given_limit():
+    items = [ItemFactory(body="item %d" % i) for i in range(5)]
+
+    page = transport.items.list(limit=2, offset=2)
+
+    assert page['count'] == 5
+    assert [i['id'] for i in page['results']] == [items[2].id, items[1].id]
+    assert isinstance(page['results'][0]['created'], datetime)
+
+
+@pytest.mark.django_db
+def test_list_items_walks_all_pages_by_cursor():
+    items = [ItemFactory(body="item %d" % i) for i in range(5)]
+
+    listed = []
+    cursor = None
+    while True:
+        page = transport.items.list(cursor=cursor, limit=2)
+        listed.extend(i['id'] for i in page['results'])
+        cursor = page['cursor']
+        if cursor is None:
+            break
+
+    assert listed == [i.id for i in reversed(items)]
+
+
+@pytest.mark.django_db
+def test_list_items_returns_only_requested_fields():
+    ItemFactory(body="a long body text")
+
+    [item] = transport.items.list(fields=['body', 'created'], body_length=6)
+
+    assert item['body'] == "a long"
+    assert isinstance(item['created'], datetime)
+    assert 'timestamp' not in item
+
+
+@pytest.mark.django_db
+def test_list_items_filters_by_any_and_none_of_terms():
+    terms = [TermFactory() for i in range(2)]
+    items = [ItemFactory() for i in range(3)]
+    items[0].terms.add(terms[0])
+    items[1].terms.add(terms[0], terms[1])
+    term_filters = ['{}:{}'.format(t.taxonomy.slug, t.name) for t in terms]
+
+    listed = transport.items.list(
+        terms_any=term_filters, terms_none=term_filters[1:])
+
+    assert [i['id'] for i in listed] == [items[0].id]
+
+
+@pytest.mark.django_db
+def test_list_items_filters_by_date_range():
+    for day in (1, 2, 3):
+        ItemFactory(timestamp=datetime(2015, 5, day, tzinfo=pytz.utc),
+                    body="day %d" % day)
+
+    listed = transport.items.list(
+        timestamp_after=datetime(2015, 5, 2, tzinfo=pytz.utc))
+
+    assert [i['body'] for i in listed] == ["day 3", "day 2"]
+
+
+@pytest.mark.django_db
+def test_list_items_fails_for_invalid_date():
+    with pytest.raises(TransportException) as excinfo:
+        transport.items.list(created_before='never')
+
+    error = excinfo.value.message
+    assert error['status_code'] == 400
+
+
+@pytest.mark.django_db(transaction=True)
+def test_list_items_searches_bodies():
+    ItemFactory(body="Where is the clinic")
+    ItemFactory(body="The water is dirty")
+
+    items = transport.items.list(q='clinic')
+
+    assert [i['body'] for i in items] == ["Where is the clinic"]
@@ -120,3 +120,82 @@ def test_term_itemcount_returns_zero_term_counts_for_range(
         end_time=one_day_ago)
 
     assert term['count'] == 0
+
+
+@pytest.mark.django_db
+def test_term_itemcounts_returns_counts_for_each_taxonomy(
+        item_data, questions_category, questions_term):
+    regions_term = TermFactory()
+    transport.items.add_terms(item_data['id'],
+                              questions_category.slug,
+                              questions_term.name)
+
+    slugs = [questions_category.slug, regions_term.taxonomy.slug]
+    counts = transport.taxonomies.term_itemcounts(slugs)
+
+    assert counts == {
+        slug: transport.taxonomies.term_itemcount(slug) for slug in slugs
+    }
+    [term] = counts[questions_category.slug]
+    assert term['count'] == 1
+
+
+@pytest.mark.django_db
+def test_term_itemcounts_returns_zero_term_counts_for_range(
+        questions_category, questions_term):
+    now = time_now()
+    item = item_data(timestamp=now)
+    transport.items.add_terms(item['id'],
+                              questions_category.slug,
+                              questions_term.name)
+
+    counts = transport.taxonomies.term_itemcounts(
+        [questions_category.slug],
+        start_time=now - timedelta(weeks=1),
+        end_time=now - timedelta(days=1))
+
+    [term] = counts[questions_category.slug]
+    assert term['count'] == 0
+
+
+@pytest.mark.django_db
+def test_term_itemcounts_fails_if_taxonomy_does_not_exist(
+        questions_category):
+    with pytest.raises(TransportException) as excinfo:
+        transport.taxonomies.term_itemcounts(
+            [questions_category.slug, 'a-taxonomy-that-does-not-exist'])
+
+    error = excinfo.value.message
+
+    assert error['status_code'] == 400
+    assert error['detail'] == "Taxonomy with slug 'a-taxonomy-that-does-not-exist' does not exist."
+
+
+@pytest.mark.django_db
+def test_term_histogram_returns_counts_per_interval(
+        questions_category, questions_term):
+    now = time_now()
+    for days in (0, 0, 1):
+        item = item_data(timestamp=now - timedelta(days=days))
+        transport.items.add_terms(item['id'],
+                                  questions_category.slug,
+                                  questions_term.name)
+
+    [term] = transport.taxonomies.term_histogram(
+        questions_category.slug, interval='day',
+        timestamp_after=now - timedelta(days=1))
+
+    assert term['name'] == questions_term.name
+    assert [c['count'] for c in term['counts']] == [1, 2]
+    assert term['counts'][1]['start'] <= now
+
+
+@pytest.mark.django_db
+def test_term_histogram_fails_for_invalid_interval(questions_category):
+    with pytest.raises(TransportException) as excinfo:
+        transport.taxonomies.term_histogram(
+            questions_category.slug, interval='fortnight')
+
+    error = excinfo.value.message
+
+    assert error['status_code'] == 400
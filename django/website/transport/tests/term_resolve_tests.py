@@ -0,0 +1,48 @@
+from __future__ import unicode_literals, absolute_import
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+import pytest
+
+from taxonomies.models import Term
+from taxonomies.tests.factories import TaxonomyFactory, TermFactory
+import transport
+from transport.exceptions import TransportException
+
+
+@pytest.mark.django_db
+def test_resolve_returns_ids_of_terms():
+    term = TermFactory()
+    taxonomy = TaxonomyFactory(vocabulary='open')
+
+    ids = transport.terms.resolve(
+        [(term.taxonomy.slug, term.name), (taxonomy.slug, 'new')])
+
+    new = Term.objects.get(taxonomy=taxonomy, name='new')
+    assert ids == {
+        (term.taxonomy.slug, term.name): term.id,
+        (taxonomy.slug, 'new'): new.id,
+    }
+
+
+@pytest.mark.django_db
+def test_resolve_unknown_taxonomy_fails():
+    with pytest.raises(TransportException) as excinfo:
+        transport.terms.resolve([('no-such-taxonomy', 'name')])
+
+    assert excinfo.value.message['status_code'] == 400
+
+
+@pytest.mark.django_db
+def test_term_resolver_resolves_each_term_once():
+    terms = [TermFactory() for i in range(2)]
+    pairs = [(t.taxonomy.slug, t.name) for t in terms]
+    resolver = transport.terms.TermResolver()
+
+    assert resolver.resolve(pairs[:1]) == {pairs[0]: terms[0].id}
+
+    with CaptureQueriesContext(connection) as queries:
+        assert resolver.resolve(pairs[:1]) == {pairs[0]: terms[0].id}
+    assert len(queries) == 0
+
+    assert resolver.resolve(pairs) == {
+        pairs[0]: terms[0].id, pairs[1]: terms[1].id}